@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+## @package batch
+# process saved projects without the graphical user interface, making video
+# statistics, html reports and region videos for many projects at once.
+#
+# usage: python -m cgt.batch [-s] [-r] [-v] [-x] [-w] [-j JOBS] project_dir [project_dir ...]
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+
+import os
+import sys
+import argparse
+import pathlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# no display is needed, unless the user has chosen a platform
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# pylint: disable = wrong-import-position
+import PyQt5.QtGui as qg
+
+from cgt.gui.penstore import PenStore
+from cgt.io import readcsvreports, writecsvreports
+from cgt.io.htmlreport import ReportMaker
+from cgt.io.regionvideocopy import RegionVideoCopy
+from cgt.io.videoanalyser import VideoAnalyser
+from cgt.io.videosource import VideoSource
+from cgt.io.probecache import get_probe_cache
+from cgt.io.seekindex import get_seek_index_store
+from cgt.io.rawframestore import get_raw_frame_stores
+from cgt.io.proxytranscoder import ProxyTranscoder, make_proxy_path, make_proxy_size
+from cgt.model.cgtproject import CGTProject
+from cgt.model.videoanalysisresultsstore import VideoAnalysisResultsStore
+from cgt.util import config
+
+class BatchDataSource():
+    """
+    holder of the project, video reader and pens, standing in for the main
+    window as the data source of a report
+    """
+
+    def __init__(self, project, pens):
+        """
+        set up the object
+            Args:
+                project (CGTProject): the project
+                pens (PenStore): the pens
+        """
+        ## the project
+        self._project = project
+
+        ## the pens
+        self._pens = pens
+
+        ## the reader of the enhanced video, made when first needed
+        self._enhanced_video_reader = None
+
+    def get_project(self):
+        """
+        getter for the project
+        """
+        return self._project
+
+    def get_results(self):
+        """
+        getter for the results
+        """
+        return self._project["results"]
+
+    def get_pens(self):
+        """
+        getter for the pens
+        """
+        return self._pens
+
+    def get_enhanced_reader(self):
+        """
+        getter for the enhanced video reader
+        """
+        if self._enhanced_video_reader is None:
+            self._enhanced_video_reader = VideoSource(str(self._project["enhanced_video"]),
+                                                      float(self._project["frame_rate"]))
+
+        return self._enhanced_video_reader
+
+    def close(self):
+        """
+        stop the reader's ffmpeg processes
+        """
+        if self._enhanced_video_reader is not None:
+            self._enhanced_video_reader.close()
+            self._enhanced_video_reader = None
+
+def read_project(dir_name, pens):
+    """
+    read a saved project, which is marked unchanged so it is only saved
+    again if a task changes it
+        Args:
+            dir_name (pathlib.Path): the project directory
+            pens (PenStore): the pens
+        Returns:
+            (CGTProject)
+        Throws:
+            IOError if the project cannot be read
+    """
+    project = CGTProject()
+    project["results"] = VideoAnalysisResultsStore(None)
+    readcsvreports.read_csv_project(dir_name, project, pens)
+
+    # outputs are written to the directory read, even if the project has been moved
+    project["proj_full_path"] = str(dir_name)
+    project.reset_changed()
+    get_probe_cache().set_directory(dir_name)
+    get_seek_index_store().set_directory(dir_name)
+    get_raw_frame_stores().set_directory(dir_name)
+
+    return project
+
+def make_statistics(project):
+    """
+    find the intensity statistics of the project's video
+        Args:
+            project (CGTProject): the project
+    """
+    video = project["enhanced_video"]
+    if project["raw_video"] is not None and not project["stats_from_enhanced"]:
+        video = project["raw_video"]
+
+    analyser = VideoAnalyser(str(video))
+    analyser.stats_whole_film()
+    project["results"].set_video_statistics(analyser.get_stats())
+
+def make_proxy_video(project, source):
+    """
+    make the all intra frame proxy used to display the project's video, if
+    it has not already been made
+        Args:
+            project (CGTProject): the project
+            source (BatchDataSource): the source of the video reader
+    """
+    video = str(project["enhanced_video"])
+    proxy_file = make_proxy_path(project["proj_full_path"], video)
+    if proxy_file.exists():
+        return
+
+    size = make_proxy_size(source.get_enhanced_reader().get_video_data())
+    ProxyTranscoder(video, proxy_file, size).transcode()
+
+def make_raw_frames(project, source):
+    """
+    decode the project's video into the raw frame store used for display, if
+    it has not already been made and is not too big
+        Args:
+            project (CGTProject): the project
+            source (BatchDataSource): the source of the video reader
+    """
+    store = get_raw_frame_stores().get_store(str(project["enhanced_video"]),
+                                             source.get_enhanced_reader().get_video_data(),
+                                             VideoSource.PIX_FMT[0])
+    if store is not None and not store.is_complete():
+        store.build()
+
+def process_project(dir_name, tasks, region_dir=None):
+    """
+    run the tasks on one project, run in a worker process
+        Args:
+            dir_name (str): the project directory
+            tasks (argparse.Namespace): flags stats, replace_stats, report, regions, proxy,
+                                        raw_frames
+            region_dir (str): the directory for region videos, None for the
+                              project's region_videos directory
+        Returns:
+            (str, str) the directory and None if successful, else an error message,
+                       no exception is raised so one project can not stop the batch
+    """
+    # each process needs its own application for images and fonts
+    application = qg.QGuiApplication.instance()
+    if application is None:
+        application = qg.QGuiApplication([sys.argv[0]])
+
+    dir_name = pathlib.Path(dir_name)
+    pens = PenStore()
+    source = None
+
+    # with raw frames the statistics and region videos also read the stores
+    if tasks.raw_frames:
+        config.USE_RAW_FRAME_STORE = True
+
+    try:
+        project = read_project(dir_name, pens)
+        results = project["results"]
+        source = BatchDataSource(project, pens)
+
+        if tasks.raw_frames:
+            make_raw_frames(project, source)
+
+        if tasks.stats and (tasks.replace_stats or results.get_video_statistics() is None):
+            make_statistics(project)
+
+        if tasks.report:
+            ReportMaker().save_html_report(source)
+
+        if tasks.regions and len(results.get_regions()) > 0:
+            if region_dir is None:
+                out_dir = dir_name.joinpath("region_videos")
+            else:
+                out_dir = pathlib.Path(region_dir).joinpath(dir_name.name)
+
+            out_dir.mkdir(parents=True, exist_ok=True)
+            RegionVideoCopy(project).copy_region_videos(out_dir)
+
+        if tasks.proxy:
+            make_proxy_video(project, source)
+
+        if project.has_been_changed():
+            writecsvreports.save_csv_project(project)
+
+    except Exception as error: # pylint: disable = broad-except
+        return str(dir_name), f"{type(error).__name__}: {error}"
+
+    finally:
+        if source is not None:
+            source.close()
+
+    return str(dir_name), None
+
+def run_batch(dir_names, tasks, jobs, region_dir=None):
+    """
+    process many projects, concurrently in a pool of processes
+        Args:
+            dir_names ([str]): the project directories
+            tasks (argparse.Namespace): flags stats, replace_stats, report, regions, proxy,
+                                        raw_frames
+            jobs (int): the number of projects processed at once
+            region_dir (str): the directory for region videos, or None
+        Returns:
+            [(str, str)] the directory and error message, None if successful,
+                         in order of completion
+    """
+    outcomes = []
+
+    if jobs < 2 or len(dir_names) < 2:
+        for dir_name in dir_names:
+            outcomes.append(process_project(dir_name, tasks, region_dir))
+            print_outcome(*outcomes[-1])
+        return outcomes
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs,
+                             mp_context=context,
+                             initializer=init_worker,
+                             initargs=(config.USE_FFMPEG_LOG,)) as pool:
+        futures = {pool.submit(process_project, x, tasks, region_dir): x for x in dir_names}
+        for future in as_completed(futures):
+            # a worker that dies, or an unpicklable result, fails only its project
+            try:
+                outcomes.append(future.result())
+            except Exception as error: # pylint: disable = broad-except
+                outcomes.append((str(futures[future]), f"{type(error).__name__}: {error}"))
+            print_outcome(*outcomes[-1])
+
+    return outcomes
+
+def init_worker(use_ffmpeg_log):
+    """
+    set up a worker process, the projects already share the cores so each
+    project is processed serially
+        Args:
+            use_ffmpeg_log (bool): if True ffmpeg logs are written
+    """
+    config.USE_FFMPEG_LOG = use_ffmpeg_log
+    config.STATS_WORKERS = 1
+    config.GROWTH_RATE_WORKERS = 1
+    config.REPORT_ENCODE_WORKERS = 1
+    config.REGION_ENCODE_WORKERS = 1
+
+def print_outcome(dir_name, error):
+    """
+    print the outcome of processing a project
+        Args:
+            dir_name (str): the project directory
+            error (str): the error message, or None if successful
+    """
+    if error is None:
+        print(f"done   {dir_name}")
+    else:
+        print(f"failed {dir_name}: {error}")
+
+def get_arguments(args=None):
+    """
+    get command line arguments
+        Args:
+            args ([str]): the arguments, None for those of the command line
+        Returns:
+            (argparse.Namespace)
+    """
+    parser = argparse.ArgumentParser(prog="python -m cgt.batch",
+                                     description="process CrystalGrowthTracker projects "
+                                                 "without the user interface, if no task "
+                                                 "is chosen all but --proxy and --raw_frames "
+                                                 "are run")
+
+    parser.add_argument("projects",
+                        type=str,
+                        nargs='+',
+                        help="project directory paths")
+
+    parser.add_argument("-s",
+                        "--stats",
+                        action='store_true',
+                        help="find the video statistics of projects without them")
+
+    parser.add_argument("--replace_stats",
+                        action='store_true',
+                        help="with --stats replace existing video statistics")
+
+    parser.add_argument("-r",
+                        "--report",
+                        action='store_true',
+                        help="make the html report")
+
+    parser.add_argument("-v",
+                        "--regions",
+                        action='store_true',
+                        help="save a video of each region")
+
+    parser.add_argument("-x",
+                        "--proxy",
+                        action='store_true',
+                        help="make the all intra frame proxy used to display the video")
+
+    parser.add_argument("-w",
+                        "--raw_frames",
+                        action='store_true',
+                        help="decode the video once to raw frames, read by the display, "
+                             "statistics and region videos without decoding")
+
+    parser.add_argument("-o",
+                        "--region_dir",
+                        type=str,
+                        required=False,
+                        help="directory for region videos, default project/region_videos")
+
+    parser.add_argument("-j",
+                        "--jobs",
+                        type=int,
+                        default=os.cpu_count(),
+                        help="number of projects processed at once, default number of cores")
+
+    parser.add_argument("-f",
+                        "--log_ffmpeg",
+                        action='store_true',
+                        help="if set write ffmpeg log files to file")
+
+    args = parser.parse_args(args)
+
+    if not (args.stats or args.report or args.regions or args.proxy or args.raw_frames):
+        args.stats = args.report = args.regions = True
+
+    return args
+
+def main():
+    """
+    run the batch
+        Returns:
+            (int) 0 if all projects succeeded, else 1
+    """
+    args = get_arguments()
+    config.USE_FFMPEG_LOG = args.log_ffmpeg
+
+    tasks = argparse.Namespace(stats=args.stats,
+                               replace_stats=args.replace_stats,
+                               report=args.report,
+                               regions=args.regions,
+                               proxy=args.proxy,
+                               raw_frames=args.raw_frames)
+
+    outcomes = run_batch(args.projects, tasks, args.jobs, args.region_dir)
+    failed = [x for x in outcomes if x[1] is not None]
+    print(f"{len(outcomes) - len(failed)} of {len(outcomes)} projects processed")
+
+    return 0 if len(failed) == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,8 @@ import PyQt5.QtWidgets as qw
 import PyQt5.QtCore as qc
 
 from cgt.gui.crystalgrowthtrackermain import CrystalGrowthTrackerMain
+from cgt.util.startuptimer import startup_timer
+from cgt.util import config
 
 class CGTApplication(qw.QApplication):
     """
@@ -57,11 +59,25 @@ class CGTApplication(qw.QApplication):
         for translator in translators:
             qc.QCoreApplication.installTranslator(translator)
 
+        startup_timer.mark("language selected")
+
         window = CrystalGrowthTrackerMain(config_args=python_args)
         window.show()
+        startup_timer.mark("main window shown")
+
+        if python_args is not None and vars(python_args).get("timing"):
+            qc.QTimer.singleShot(0, report_startup)
 
         self.exec_()    # enter event loop
 
+def report_startup():
+    """
+    print the start-up times, once the event loop is running, and append them to the log
+    """
+    startup_timer.mark("event loop started")
+    print(startup_timer.make_report())
+    startup_timer.save_report(config.STARTUP_TIMING_LOG)
+
 def select_translator():
     """
     give the user the option to choose the language other than default English
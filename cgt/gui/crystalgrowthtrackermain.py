@@ -45,10 +45,9 @@ from cgt.gui.videoregionselectionwidget import VideoRegionSelectionWidget
 from cgt.gui.editnotesdialog import EditNotesDialog
 from cgt.gui.markupwidget import MarkUpWidget
 from cgt.gui.reportwidget import ReportWidget
-from cgt.gui.videostatisticswidget import VideoStatisticsWidget
 from cgt.gui.penstore import PenStore
-from cgt.gui.resultswidget import ResultsWidget
 from cgt.util import config
+from cgt.util.startuptimer import startup_timer
 
 from cgt.io import (writecsvreports, readcsvreports)
 from cgt.io.htmlreport import ReportMaker
@@ -56,6 +55,10 @@ from cgt.io.htmlreport import ReportMaker
 from cgt.io.videosource import VideoSource
 from cgt.io.videoanalyser import VideoAnalyser
 from cgt.io.regionvideocopy import RegionVideoCopy
+from cgt.io.probecache import get_probe_cache
+from cgt.io.seekindex import get_seek_index_store
+from cgt.io.rawframestore import get_raw_frame_stores
+from cgt.io.proxytranscoder import ProxyTranscoder, make_proxy_path, make_proxy_size
 
 from cgt.model.cgtproject import CGTProject
 from cgt.model.videoanalysisresultsstore import VideoAnalysisResultsStore
@@ -87,6 +90,24 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         ## pointer for the thread
         self._thread = None
 
+        ## pointer for the region video copier
+        self._region_copy = None
+
+        ## pointer for the thread running the region video copier
+        self._region_thread = None
+
+        ## error messages of regions whose videos could not be saved
+        self._region_errors = []
+
+        ## pointer for the proxy video transcoder
+        self._proxy_transcoder = None
+
+        ## pointer for the thread running the proxy video transcoder
+        self._proxy_thread = None
+
+        ## the proxy video being transcoded
+        self._proxy_file = None
+
         ## the name in the current translation
         self._translated_name = self.tr("CrystalGrowthTracker")
 
@@ -102,6 +123,12 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         ## the pens
         self._pens = PenStore()
 
+        ## the video statistics widget, made when its tab is first shown
+        self._videoStatsWidget = None
+
+        ## the results widget, made when its tab is first shown
+        self._resultsWidget = None
+
         self.setup_tabs()
         self._tabWidget.setCurrentIndex(0)
 
@@ -110,11 +137,16 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             args = vars(config_args)
             if args.get("log_ffmpeg") is not None and args.get("log_ffmpeg"):
                 config.USE_FFMPEG_LOG = True
+            if args.get("proxy_video") is not None and args.get("proxy_video"):
+                config.USE_PROXY_VIDEO = True
+            if args.get("raw_frames") is not None and args.get("raw_frames"):
+                config.USE_RAW_FRAME_STORE = True
             if args.get("project") is not None:
                 self.read_project_directory(args.get("project"))
 
         self._progressBar.hide()
         self.set_title()
+        startup_timer.mark("main window made")
 
     def setup_tabs(self):
         """
@@ -140,13 +172,7 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
 
         # Video Statistics
         ###################
-        tab = self._tabWidget.widget(2)
-
-        ## the region selection widget
-        self._videoStatsWidget = VideoStatisticsWidget(tab, self)
-        self._videoStatsWidget.setup_video_widget()
-        self._videoStatsWidget.enable(False)
-        self.setup_tab(tab, self._videoStatsWidget)
+        # made by setup_video_statistics_tab when first shown
 
         # User markup of video features
         ###############################
@@ -160,11 +186,7 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
 
         # Results
         ###########
-        tab = self._tabWidget.widget(4)
-
-        ## results widget
-        self._resultsWidget = ResultsWidget(tab, self)
-        self.setup_tab(tab, self._resultsWidget)
+        # made by setup_results_tab when first shown
 
         # Report results
         #################
@@ -174,6 +196,69 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         self._reportWidget = ReportWidget(tab, self)
         self.setup_tab(tab, self._reportWidget)
 
+    def setup_video_statistics_tab(self):
+        """
+        make the video statistics widget, which holds matplotlib canvases, so is
+        only made, and matplotlib imported, when the tab is first shown
+        """
+        # pylint: disable = import-outside-toplevel
+        from cgt.gui.videostatisticswidget import VideoStatisticsWidget
+
+        tab = self._videoStatsTab
+
+        self._videoStatsWidget = VideoStatisticsWidget(tab, self)
+        self._videoStatsWidget.setup_video_widget()
+        self._videoStatsWidget.enable(False)
+        self.setup_tab(tab, self._videoStatsWidget)
+
+        reader = self.get_statistics_reader()
+        if reader is not None:
+            self._videoStatsWidget.set_video_source(reader)
+
+            stats = self.get_results().get_video_statistics()
+            if stats is not None and len(stats.get_frames()) > 0:
+                self._videoStatsWidget.display_stats()
+
+    def setup_results_tab(self):
+        """
+        make the results widget, which holds a matplotlib canvas, so is only
+        made, and matplotlib imported, when the tab is first shown
+        """
+        # pylint: disable = import-outside-toplevel
+        from cgt.gui.resultswidget import ResultsWidget
+
+        tab = self._resultsTab
+
+        self._resultsWidget = ResultsWidget(tab, self)
+        self.setup_tab(tab, self._resultsWidget)
+
+        if self._enhanced_video_reader is not None:
+            self._resultsWidget.set_video_source(self._enhanced_video_reader)
+
+    def setup_deferred_tab(self, tab_index):
+        """
+        make the widget of a tab if it has not been made
+            Args:
+                tab_index (int) the index of the tab
+        """
+        if tab_index == self._tabWidget.indexOf(self._videoStatsTab):
+            if self._videoStatsWidget is None:
+                self.setup_video_statistics_tab()
+        elif tab_index == self._tabWidget.indexOf(self._resultsTab):
+            if self._resultsWidget is None:
+                self.setup_results_tab()
+
+    def get_statistics_reader(self):
+        """
+        get the reader of the video used for the statistics
+            Returns:
+                (VideoSource) the raw video reader if in use, else the enhanced, or None
+        """
+        if self._raw_video_reader is not None:
+            return self._raw_video_reader
+
+        return self._enhanced_video_reader
+
     def get_pens(self):
         """
         getter for the pens
@@ -189,14 +274,18 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             Args:
                 tab_index (int) the index of the new tab
         """
+        self.setup_deferred_tab(tab_index)
+
         if not self.has_project():
             return
 
         self._propertiesWidget.setEnabled(False)
         self._selectWidget.enable(False)
-        self._videoStatsWidget.enable(False)
+        if self._videoStatsWidget is not None:
+            self._videoStatsWidget.enable(False)
         self._drawingWidget.setEnabled(False)
-        self._resultsWidget.setEnabled(False)
+        if self._resultsWidget is not None:
+            self._resultsWidget.setEnabled(False)
         self._reportWidget.setEnabled(False)
 
         if tab_index == self._tabWidget.indexOf(self._propertiesTab):
@@ -335,7 +424,8 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         """
         clear and reset the video widgets and the frame queue
         """
-        self._videoStatsWidget.clear()
+        if self._videoStatsWidget is not None:
+            self._videoStatsWidget.clear()
         self._selectWidget.clear()
         self._drawingWidget.clear()
         self._drawingWidget.set_results(self._project["results"])
@@ -369,9 +459,11 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         """
         self.reset_video_widgets()
         self._propertiesWidget.clear()
-        self._videoStatsWidget.clear()
+        if self._videoStatsWidget is not None:
+            self._videoStatsWidget.clear()
         self._drawingWidget.clear()
-        self._resultsWidget.clear()
+        if self._resultsWidget is not None:
+            self._resultsWidget.clear()
 
     @qc.pyqtSlot()
     def save_image(self):
@@ -646,12 +738,7 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
                 True if has marker else false
         """
         index = self._project["results"].get_regions().index(region)
-        markers = []
-        markers.append(self._project["results"].get_lines_for_region(index))
-        markers.append(self._project["results"].get_points_for_region(index))
-        markers = [x for x in markers if x is not None]
-
-        return len(markers)>0
+        return self._project["results"].region_has_markers(index)
 
     def append_lines(self, region_index, lines):
         """
@@ -666,7 +753,8 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             self._project["results"].add_line(region_index, line)
 
         #self._drawingWidget.new_region()
-        self._resultsWidget.display_data()
+        if self._resultsWidget is not None:
+            self._resultsWidget.display_data()
 
     def set_title(self):
         """
@@ -768,27 +856,30 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             Args:
                 video_file (palthlib.Path): the file holding the video
         """
+        self.close_video_readers()
+        get_probe_cache().set_directory(self._project["proj_full_path"])
+        get_seek_index_store().set_directory(self._project["proj_full_path"])
+        get_raw_frame_stores().set_directory(self._project["proj_full_path"])
+
         try:
             # make the objects
             self._enhanced_video_reader = VideoSource(str(video_file),
                                                       float(self._project["frame_rate"]))
             self._selectWidget.set_video_source(self._enhanced_video_reader)
             self._drawingWidget.set_video_source(self._enhanced_video_reader)
-            self._resultsWidget.set_video_source(self._enhanced_video_reader)
+            if self._resultsWidget is not None:
+                self._resultsWidget.set_video_source(self._enhanced_video_reader)
 
-            if self._project["raw_video"] is not None:
-                if self._project["stats_from_enhanced"]:
-                    self._videoStatsWidget.set_video_source(self._enhanced_video_reader)
-                else:
-                    self._raw_video_reader = VideoSource(self._project["raw_video"],
-                                                         float(self._project["frame_rate"]))
-                    self._videoStatsWidget.set_video_source(self._raw_video_reader)
-            else:
-                self._videoStatsWidget.set_video_source(self._enhanced_video_reader)
+            if self._project["raw_video"] is not None and not self._project["stats_from_enhanced"]:
+                self._raw_video_reader = VideoSource(self._project["raw_video"],
+                                                     float(self._project["frame_rate"]))
 
-            stats = self.get_results().get_video_statistics()
-            if stats is not None and len(stats.get_frames()) > 0:
-                self._videoStatsWidget.display_stats()
+            if self._videoStatsWidget is not None:
+                self._videoStatsWidget.set_video_source(self.get_statistics_reader())
+
+                stats = self.get_results().get_video_statistics()
+                if stats is not None and len(stats.get_frames()) > 0:
+                    self._videoStatsWidget.display_stats()
 
         except ffmpeg.Error as error:
             self.display_error(f"File {video_file} cannot be probed: {error}")
@@ -800,8 +891,110 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             self.display_error(f"Probe video data error: unknown key {exception}")
             return False
 
+        self.setup_proxy_video(video_file)
+
         return True
 
+    def setup_proxy_video(self, video_file):
+        """
+        if proxy videos are in use display the video's proxy, if the proxy
+        has not been made it is transcoded in the background and used when ready
+            Args:
+                video_file (palthlib.Path): the file holding the video
+        """
+        if not config.USE_PROXY_VIDEO or self._proxy_thread is not None:
+            return
+
+        try:
+            proxy_file = make_proxy_path(self._project["proj_full_path"], video_file)
+        except OSError:
+            return
+
+        if proxy_file.exists():
+            self.use_proxy_video(proxy_file)
+            return
+
+        size = make_proxy_size(self._enhanced_video_reader.get_video_data())
+        self._proxy_transcoder = ProxyTranscoder(str(video_file), proxy_file, size)
+        self._proxy_file = proxy_file
+
+        self._proxy_thread = qc.QThread()
+        self._proxy_transcoder.moveToThread(self._proxy_thread)
+
+        self._proxy_thread.started.connect(self._proxy_transcoder.run)
+        self._proxy_transcoder.failed.connect(self.proxy_video_failed)
+        self._proxy_transcoder.finished.connect(self._proxy_thread.quit)
+        self._proxy_transcoder.finished.connect(self.proxy_video_made)
+        self._proxy_thread.finished.connect(self._proxy_transcoder.deleteLater)
+
+        self._proxy_thread.start()
+
+    @qc.pyqtSlot()
+    def proxy_video_made(self):
+        """
+        tidy up after the proxy video has been transcoded and display it
+        """
+        if self._proxy_transcoder is None or self.sender() is not self._proxy_transcoder:
+            return
+
+        self._proxy_thread.wait()
+        proxy_file = self._proxy_file
+        self._proxy_thread = None
+        self._proxy_transcoder = None
+        self._proxy_file = None
+
+        if proxy_file.exists():
+            self.use_proxy_video(proxy_file)
+
+    @qc.pyqtSlot(str)
+    def proxy_video_failed(self, message):
+        """
+        report the failure to make the proxy video, the video is still displayed
+            Args:
+                message (str): the error output of the transcoder
+        """
+        print(f"Proxy video not made: {message}")
+
+    def use_proxy_video(self, proxy_file):
+        """
+        display frames from a proxy video
+            Args:
+                proxy_file (pathlib.Path): the proxy
+        """
+        if self._enhanced_video_reader is None:
+            return
+
+        try:
+            self._enhanced_video_reader.set_proxy(proxy_file)
+        except (ffmpeg.Error, StopIteration, KeyError) as error:
+            print(f"Proxy video {proxy_file} cannot be used: {error}")
+
+    def cancel_proxy_video(self):
+        """
+        stop any running proxy video transcode
+        """
+        if self._proxy_thread is not None:
+            self._proxy_transcoder.cancel()
+            self._proxy_thread.quit()
+            self._proxy_thread.wait()
+            self._proxy_thread = None
+            self._proxy_transcoder = None
+            self._proxy_file = None
+
+    def close_video_readers(self):
+        """
+        stop the decoders of any existing video readers and empty the frame cache
+        """
+        self.cancel_proxy_video()
+
+        if self._enhanced_video_reader is not None:
+            self._enhanced_video_reader.close()
+            self._enhanced_video_reader.get_frame_cache().clear()
+
+        if self._raw_video_reader is not None:
+            self._raw_video_reader.close()
+            self._raw_video_reader = None
+
     qc.pyqtSlot()
     def save_region_videos(self):
         """
@@ -824,8 +1017,65 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         if not dir_name:
             return
 
-        region_copy = RegionVideoCopy(self._project)
-        region_copy.copy_region_videos(dir_name)
+        if self._region_thread is not None:
+            message = self.tr("Region videos are already being saved.")
+            qw.QMessageBox.warning(self, self.tr("CGT Error"), message)
+            return
+
+        self._region_copy = RegionVideoCopy(self._project)
+        self._region_copy.set_output_directory(dir_name)
+        self._region_errors = []
+
+        self._region_thread = qc.QThread()
+        self._region_copy.moveToThread(self._region_thread)
+
+        self._progressBar.setMaximum(self._region_copy.get_video_data().get_frame_count())
+        self._region_copy.frames_read.connect(self._progressBar.setValue)
+        self._region_copy.region_failed.connect(self.region_video_failed)
+        self._region_copy.failed.connect(self.region_videos_failed)
+
+        self._region_thread.started.connect(self._region_copy.copy_videos)
+        self._region_copy.finished.connect(self._region_thread.quit)
+        self._region_copy.finished.connect(self.region_videos_saved)
+        self._region_thread.finished.connect(self._region_copy.deleteLater)
+
+        self._progressBar.show()
+        self._region_thread.start()
+
+    @qc.pyqtSlot(int, str)
+    def region_video_failed(self, index, message):
+        """
+        record the failure to save the video of a region
+            Args:
+                index (int): the region index
+                message (str): the error output of the encoder
+        """
+        self._region_errors.append(f"Region {index}: {message}")
+
+    @qc.pyqtSlot(str)
+    def region_videos_failed(self, message):
+        """
+        record an error that stopped the saving of the region videos
+            Args:
+                message (str): the error message
+        """
+        self._region_errors.append(message)
+
+    @qc.pyqtSlot()
+    def region_videos_saved(self):
+        """
+        tidy up after the region videos have been saved and report any errors
+        """
+        self._region_thread.wait()
+        self._region_thread = None
+        self._region_copy = None
+        self._progressBar.hide()
+
+        if len(self._region_errors) > 0:
+            message = self.tr("Some region videos could not be saved:\n")
+            qw.QMessageBox.warning(self,
+                                   self.tr("CGT Error"),
+                                   message + "\n".join(self._region_errors))
 
     def has_unsaved_data(self):
         """
@@ -906,8 +1156,9 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             print("have stats")
         self._progressBar.hide()
 
-        self._videoStatsWidget.display_stats()
-        self._videoStatsWidget.enable(True)
+        if self._videoStatsWidget is not None:
+            self._videoStatsWidget.display_stats()
+            self._videoStatsWidget.enable(True)
 
     def make_report(self):
         """
@@ -918,6 +1169,7 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
         self._progressBar.setMaximum(8)
         maker = ReportMaker(self)
         maker.stage_completed.connect(self._progressBar.setValue)
+        maker.image_saved.connect(self.show_report_image_progress)
         self._progressBar.show()
         try:
             report_file = maker.save_html_report(self)
@@ -927,9 +1179,21 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
                                     str(exception))
             report_file = None
         finally:
+            self._progressBar.resetFormat()
             self._progressBar.hide()
         return report_file
 
+    @qc.pyqtSlot(int, int)
+    def show_report_image_progress(self, saved, total):
+        """
+        show the number of report images saved on the progress bar
+            Args:
+                saved (int): the number of images saved
+                total (int): the number of images to be saved
+        """
+        self._progressBar.setFormat(self.tr("Images") + f" {saved}/{total}")
+        self._progressBar.repaint()
+
     def get_video_stats(self):
         """
         getter for video stats
@@ -954,6 +1218,13 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             Args:
                 event (QEvent) the Qt event object
         """
+        # the export thread must finish before the window, and thread, are destroyed
+        if self._region_thread is not None:
+            message = self.tr("Region videos are being saved, please wait until they are finished.")
+            qw.QMessageBox.warning(self, self.tr("CGT Error"), message)
+            event.ignore()
+            return
+
         message = self.tr('Do you want to leave?')
         changed = self.tr('You have unsaved data.')
 
@@ -971,6 +1242,9 @@ class CrystalGrowthTrackerMain(qw.QMainWindow, Ui_CrystalGrowthTrackerMain):
             # the event must be accepted
             event.accept()
 
+            # end any ffmpeg processes held by the readers
+            self.close_video_readers()
+
             # to get rid tell the event-loop to schedule for deleteion
             # do not destroy as a pointer may survive in event-loop
             # which will trigger errors if it recieves a queued signal
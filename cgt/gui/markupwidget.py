@@ -37,6 +37,7 @@ import PyQt5.QtGui as qg
 from cgt.gui.markupview import MarkUpStates
 from cgt.gui.resultsstoreproxy import ResultsStoreProxy
 from cgt.gui.videobasewidget import PlayStates
+from cgt.io.frameprefetcher import FramePrefetcher
 from cgt.util.markers import (get_region,
                               get_frame,
                               hash_marker)
@@ -68,7 +69,7 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         ## the current frame of the video
         self._current_frame = 0
 
-        ## the current raw pixmap
+        ## the current pixmap, holding only the current region if there is one
         self._current_pixmap = None
 
         ## playing state of the video
@@ -86,6 +87,9 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         ## pointer for the video source
         self._video_source = None
 
+        ## decodes frames ahead of the display in play
+        self._prefetcher = None
+
         self._entryView.set_parent_and_pens(self, self._data_source.get_pens())
         self._cloneView.set_parent_and_pens(self, self._data_source.get_pens())
         self._cloneView.assign_state(MarkUpStates.CLONE_ITEM)
@@ -203,6 +207,7 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
 
         if self._current_pixmap is not None:
             self._results_proxy.clear()
+            self._current_pixmap = self.get_frame_pixmap(self._current_frame)
             self.display_pixmap()
 
         self._results_proxy.redraw_markers(self._regionsBox.currentIndex())
@@ -213,6 +218,7 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         """
         if self._current_pixmap is not None:
             self._results_proxy.clear()
+            self._current_pixmap = self.get_frame_pixmap(self._current_frame)
             self.display_pixmap()
 
         self._entryControls.enable_all()
@@ -226,8 +232,33 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
             Args:
                 frame (int): the time of the frame to display (user FPS)
         """
-        pixmap = self._video_source.get_pixmap(frame)
-        self.display_image(pixmap, frame)
+        self.display_image(self.get_frame_pixmap(frame), frame)
+
+    def get_region_rect(self):
+        """
+        get the rectangle of the current region
+            Returns:
+                (QRect) the rectangle, or None if there are no regions
+        """
+        regions = self._results_proxy.get_regions()
+        if len(regions) < 1:
+            return None
+
+        return regions[self._regionsBox.currentIndex()].rect().toRect()
+
+    def get_frame_pixmap(self, frame):
+        """
+        get the pixmap of the current region in a frame, only the region is decoded
+            Args:
+                frame (int): the frame number
+            Returns:
+                (QPixmap) the region, or the whole frame if there are no regions
+        """
+        rect = self.get_region_rect()
+        if rect is None:
+            return self._video_source.get_pixmap(frame)
+
+        return self._video_source.get_region_pixmap(frame, rect)
 
     def display_image(self, pixmap, frame_number):
         """
@@ -257,30 +288,14 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         self._entryControls.set_frame_currently_displayed(self._current_frame)
         self._cloneControls.set_frame_currently_displayed(self._current_frame)
 
-        delay = self._video_source.get_video_data().get_user_time_step()
-        qc.QTimer.singleShot(delay, self.next_pixmap)
-
-    @qc.pyqtSlot()
-    def next_pixmap(self):
-        """
-        call back for timer in display, will incrament/decrement frame as needed
-        """
-        if self._playing == PlayStates.PLAY_FORWARD:
-            self.incrament_frame()
-        elif self._playing == PlayStates.PLAY_BACKWARD:
-            self.decrament_frame()
-
     def display_pixmap(self):
         """
         display the current pixmap
         """
         pixmap = self._current_pixmap
-        regions = self._results_proxy.get_regions()
         index = -1
-        if len(regions) > 0:
+        if len(self._results_proxy.get_regions()) > 0:
             index = self._regionsBox.currentIndex()
-            region = regions[index].rect()
-            pixmap = self._current_pixmap.copy(region.toRect())
 
         if self._base_key_frame is None:
             self._entryView.set_region_pixmap(pixmap, self._current_frame, index)
@@ -343,6 +358,19 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         self._cloneControls.set_range(self._video_source.get_video_data().get_frame_count())
         self._entryControls.set_range(self._video_source.get_video_data().get_frame_count())
 
+        self.close_prefetcher()
+        self._prefetcher = FramePrefetcher(video_source, self)
+        self._prefetcher.display_image.connect(self.display_image)
+
+    def close_prefetcher(self):
+        """
+        stop any play and release the prefetcher's decoder
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher.deleteLater()
+            self._prefetcher = None
+
     @qc.pyqtSlot()
     def play_video(self):
         """
@@ -350,7 +378,12 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         """
         self._playing = PlayStates.PLAY_FORWARD
         self.block_user_entry()
-        self.incrament_frame()
+        lower_limit, upper_limit = self.get_frame_limits()
+        self._prefetcher.start(self.get_next_frame(),
+                               1,
+                               lower_limit,
+                               upper_limit,
+                               self.get_region_rect())
 
     @qc.pyqtSlot()
     def step_video(self):
@@ -365,7 +398,7 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         """
         callback for calling the video
         """
-        self._playing = PlayStates.MANUAL
+        self.play_pause()
         self.unblock_user_entry()
 
     @qc.pyqtSlot()
@@ -383,7 +416,12 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         """
         self._playing = PlayStates.PLAY_BACKWARD
         self.block_user_entry()
-        self.decrament_frame()
+        lower_limit, upper_limit = self.get_frame_limits()
+        self._prefetcher.start(self.get_previous_frame(),
+                               -1,
+                               lower_limit,
+                               upper_limit,
+                               self.get_region_rect())
 
     @qc.pyqtSlot(int)
     def time_changed(self, frame):
@@ -455,9 +493,11 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         elif index == 1:
             self._entryView.assign_state(MarkUpStates.DRAW_CROSS)
 
-    def incrament_frame(self):
+    def get_frame_limits(self):
         """
-        emit a signal for the next frame looping at max
+        get the range of frames the clone view may show
+            Returns:
+                (int, int) the lower limit and one past the upper limit
         """
         upper_limit = self._video_source.get_video_data().get_frame_count()
         lower_limit = 0
@@ -469,29 +509,45 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
             else:
                 upper_limit = current_range[1]
 
-        if self._current_frame < upper_limit-1:
-            self.display_frame(self._current_frame+1)
-        else:
-            self.display_frame(lower_limit)
+        return lower_limit, upper_limit
 
-    def decrament_frame(self):
+    def get_next_frame(self):
         """
-        emit a signal for the previous frame looping at min
+        get the frame after the current, looping at max
+            Returns:
+                (int) the frame number
         """
-        upper_limit = self._video_source.get_video_data().get_frame_count()
-        lower_limit = 0
+        lower_limit, upper_limit = self.get_frame_limits()
 
-        if self._base_key_frame is not None:
-            current_range = self._cloneControls.get_range()
-            if self._entry_forward:
-                lower_limit = current_range[0]
-            else:
-                upper_limit = current_range[1]
+        if self._current_frame < upper_limit-1:
+            return self._current_frame+1
+
+        return lower_limit
+
+    def get_previous_frame(self):
+        """
+        get the frame before the current, looping at min
+            Returns:
+                (int) the frame number
+        """
+        lower_limit, upper_limit = self.get_frame_limits()
 
         if self._current_frame > lower_limit:
-            self.display_frame(self._current_frame-1)
-        else:
-            self.display_frame(upper_limit-1)
+            return self._current_frame-1
+
+        return upper_limit-1
+
+    def incrament_frame(self):
+        """
+        emit a signal for the next frame looping at max
+        """
+        self.display_frame(self.get_next_frame())
+
+    def decrament_frame(self):
+        """
+        emit a signal for the previous frame looping at min
+        """
+        self.display_frame(self.get_previous_frame())
 
     def add_point(self, point):
         """
@@ -670,6 +726,8 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         pause the playing
         """
         self._playing = PlayStates.MANUAL
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
 
     @qc.pyqtSlot()
     def display_help(self):
@@ -693,6 +751,7 @@ class MarkUpWidget(qw.QWidget, Ui_MarkUpWidget):
         """
         empty scene graphs and results proxy
         """
+        self.play_pause()
         self._cloneView.clear()
         self._entryView.clear()
         self._current_pixmap = None
@@ -87,13 +87,11 @@ class ResultsStoreProxy():
             Returns:
                 [(QGraphicsLineItem)]
         """
-        lines = self._results_store.get_lines()
-        tmp = []
-        for line in lines:
-            if get_region(line[0]) == index:
-                tmp.append(line)
+        lines = self._results_store.get_lines_for_region(index)
+        if lines is None:
+            return []
 
-        return tmp
+        return lines
 
     def get_points(self):
         """
@@ -111,13 +109,11 @@ class ResultsStoreProxy():
             Returns:
                 [(QGraphicsPathItem)]
         """
-        points = self._results_store.get_points()
-        tmp = []
-        for point in points:
-            if get_region(point[0]) == index:
-                tmp.append(point)
+        points = self._results_store.get_points_for_region(index)
+        if points is None:
+            return []
 
-        return tmp
+        return points
 
     def get_key_frames(self, region_index):
         """
@@ -339,8 +335,7 @@ class ResultsStoreProxy():
 
         if item_type == MarkerTypes.LINE:
             index = self._results_store.find_list_for_old_line(marker)
-            lines = self._results_store.get_lines()
-            for line in lines[index]:
+            for line in self._results_store.get_line_marker(index):
                 self._clone_view.delete_graphics_item(line)
                 if line in self._marker_arrow_map:
                     self._clone_view.delete_graphics_items(self._marker_arrow_map[line])
@@ -349,8 +344,7 @@ class ResultsStoreProxy():
 
         if item_type == MarkerTypes.POINT:
             index = self._results_store.find_list_for_old_point(marker)
-            points = self._results_store.get_points()
-            for point in points[index]:
+            for point in self._results_store.get_point_marker(index):
                 self._clone_view.delete_graphics_item(point)
                 if point in self._marker_arrow_map:
                     self._clone_view.delete_graphics_items(self._marker_arrow_map[point])
@@ -28,6 +28,7 @@ import PyQt5.QtCore as qc
 import PyQt5.QtGui as qg
 
 from cgt.model.velocitiescalculator import VelocitiesCalculator
+from cgt.model.growthratefitter import fit_growth_rates
 from cgt.io.mpl import make_mplcanvas, draw_displacements
 from cgt.util.markers import (ItemDataTypes,
                               MarkerTypes,
@@ -150,33 +151,31 @@ class ResultsWidget(qw.QWidget, Ui_ResultsWidget):
         """
         results = self._data_source.get_results()
         self._current_region = results.get_regions()[index]
-        line_markers = results.get_lines_for_region(index)
-        point_markers = results.get_points_for_region(index)
+        line_markers = results.get_line_records_for_region(index)
+        point_markers = results.get_point_records_for_region(index)
 
         self._lines = []
         self._points = []
-        if line_markers is not None:
-            for marker in line_markers:
-                self._lines.append(marker[0])
+        for marker in line_markers:
+            self._lines.append(results.get_record_item(marker[0]))
 
-        if point_markers is not None:
-            for marker in point_markers:
-                self._points.append(marker[0])
+        for marker in point_markers:
+            self._points.append(results.get_record_item(marker[0]))
 
-        self.display_image(self._video_source.get_pixmap(0))
+        rect = self._current_region.rect().toRect()
+        self.display_image(self._video_source.get_region_pixmap(0, rect))
 
     def display_image(self, pixmap):
         """
         callback function to display an image from a source
             Args:
-                pixmap (QPixmap) the pixmap to be displayed
+                pixmap (QPixmap) the pixmap of the current region
         """
         scene = self._regionView.scene()
         scene.clear()
 
-        rect = self._current_region.rect().toRect()
-        pixmap = pixmap.copy(rect)
-        scene.addPixmap(pixmap)
+        if pixmap is not None:
+            scene.addPixmap(pixmap)
         pen = self._data_source.get_pens().get_display_pen()
         for number, line in enumerate(self._lines):
             scene.addItem(clone_line(line, pen))
@@ -251,7 +250,11 @@ class ResultsWidget(qw.QWidget, Ui_ResultsWidget):
         calc = self.calculate_speeds(index)
         lines = calc.get_line_displacements()
         points = calc.get_point_displacements()
-        draw_displacements(self._graph, lines, points, index)
+
+        fps = self._data_source.get_project()["frame_rate"]
+        rates = (fit_growth_rates(calc.get_line_table(), MarkerTypes.LINE, fps),
+                 fit_growth_rates(calc.get_point_table(), MarkerTypes.POINT, fps))
+        draw_displacements(self._graph, lines, points, index, rates)
 
     def calculate_speeds(self, index):
         """
@@ -260,15 +263,8 @@ class ResultsWidget(qw.QWidget, Ui_ResultsWidget):
                 index (int) the region
         """
         results = self._data_source.get_results()
-        lines = []
-        for marker in results.get_lines():
-            if get_region(marker[0]) == index:
-                lines.append(marker)
-
-        points = []
-        for marker in results.get_points():
-            if get_region(marker[0]) == index:
-                points.append(marker)
+        lines = results.get_line_records_for_region(index)
+        points = results.get_point_records_for_region(index)
 
         fps = self._data_source.get_project()["frame_rate"]
         scale = self._data_source.get_project()["resolution"]
@@ -30,6 +30,8 @@ import PyQt5.QtWidgets as qw
 import PyQt5.QtGui as qg
 import PyQt5.QtCore as qc
 
+from cgt.io.frameprefetcher import FramePrefetcher
+
 class PlayStates(Enum):
     """
     enumeration of video playing states
@@ -73,6 +75,9 @@ class VideoBaseWidget(qw.QWidget):
         ## the current value of the zoom
         self._current_zoom = 1.0
 
+        ## decodes frames ahead of the display in play
+        self._prefetcher = None
+
     def enable(self, enabled):
         """
         enable/disable widget on disable play is paused
@@ -99,6 +104,19 @@ class VideoBaseWidget(qw.QWidget):
         self._video_source = video_source
         self._videoControl.set_range(video_source.get_video_data().get_frame_count())
 
+        self.close_prefetcher()
+        self._prefetcher = FramePrefetcher(video_source, self)
+        self._prefetcher.display_image.connect(self.display_image)
+
+    def close_prefetcher(self):
+        """
+        stop any play and release the prefetcher's decoder
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher.deleteLater()
+            self._prefetcher = None
+
     @qc.pyqtSlot(int)
     def display_frame(self, frame):
         """
@@ -173,19 +191,6 @@ class VideoBaseWidget(qw.QWidget):
         message = f"Time {now:0>5.1f} of {length:0>5.1f} (Frames: {data.get_frame_count()})"
         self._frameLabel.setText(message)
 
-        delay = int(1000*self._video_source.get_video_data().get_user_time_step())
-        qc.QTimer.singleShot(delay, self.next_pixmap)
-
-    qc.pyqtSlot()
-    def next_pixmap(self):
-        """
-        if in play forwards or backwards get next
-        """
-        if self._playing == PlayStates.PLAY_FORWARD:
-            self.next_pixmap_forwards()
-        elif self._playing == PlayStates.PLAY_BACKWARD:
-            self.next_pixmap_backwards()
-
     def next_pixmap_forwards(self):
         """
         in play forwards mode next frame
@@ -247,6 +252,8 @@ class VideoBaseWidget(qw.QWidget):
         pause the playing
         """
         self._playing = PlayStates.MANUAL
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
         self._videoControl.enable_fine_controls()
 
     @qc.pyqtSlot()
@@ -255,7 +262,11 @@ class VideoBaseWidget(qw.QWidget):
         start playing forward
         """
         self._playing = PlayStates.PLAY_FORWARD
-        self.next_pixmap_forwards()
+        data = self._video_source.get_video_data()
+        self._prefetcher.start(data.next_frame(self._current_frame),
+                               1,
+                               0,
+                               data.get_frame_count())
 
     @qc.pyqtSlot()
     def play_backward(self):
@@ -263,7 +274,11 @@ class VideoBaseWidget(qw.QWidget):
         start playing in reverse
         """
         self._playing = PlayStates.PLAY_BACKWARD
-        self.next_pixmap_backwards()
+        data = self._video_source.get_video_data()
+        self._prefetcher.start(data.previous_frame(self._current_frame),
+                               -1,
+                               0,
+                               data.get_frame_count())
 
     def get_data(self):
         """
@@ -285,6 +300,7 @@ class VideoBaseWidget(qw.QWidget):
         """
         reset to initial conditions
         """
+        self.close_prefetcher()
         self._video_source = None
         self._playing = PlayStates.MANUAL
         self._current_pixmap = None
@@ -133,7 +133,7 @@ class VideoStatisticsWidget(VideoBaseWidget, Ui_VideoStatisticsWidget):
         draw the two graphs
         """
         stats = self._data_source.get_results().get_video_statistics()
-        self._frame_line = render_graph(stats.get_frames(),
+        self._frame_line = render_graph(stats,
                                         self._evolution_canvas,
                                         self._current_frame)
 
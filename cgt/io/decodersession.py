@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+## @package decodersession
+# a long lived ffmpeg process serving sequential raw frames from a video
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+import subprocess
+import threading
+
+import ffmpeg
+
+from cgt.util import config
+
+class DecoderSession():
+    """
+    a persistent ffmpeg decoder, frames are read from one open pipe. The process
+    is only restarted, with a seek, if the requested frame is behind the stream
+    or too far ahead to be reached by reading and discarding frames. If a crop
+    is given only that rectangle of each frame is output. If a seek index is
+    given restarts seek to the key frame before the requested frame, and
+    the frames up to it are counted off, else the seek is by time. If a scale
+    is given the frames are resized, before any crop.
+    """
+
+    def __init__(self, file_name, video_data, pix_fmt, crop=None, seek_index=None, scale=None):
+        """
+        set up the object, the ffmpeg process is not started until a frame is read
+            Args:
+                file_name (str): the path and name of video file
+                video_data (VideoData): the probed properties of the video
+                pix_fmt (str): the ffmpeg output pixel format
+                crop (tuple): optional (x, y, width, height) of the output in pixels
+                seek_index (SeekIndex): optional index of the video's frames
+                scale (tuple): optional (width, height) the frames are resized to,
+                               video_data must give the resized size
+        """
+        ## file name
+        self._file_name = file_name
+
+        ## video data
+        self._video_data = video_data
+
+        ## the output pixel format
+        self._pix_fmt = pix_fmt
+
+        ## the rectangle (x, y, width, height) output, or None for whole frames
+        self._crop = crop
+
+        ## the index of the video's frames, or None
+        self._seek_index = seek_index
+
+        ## the size (width, height) the frames are resized to, or None
+        self._scale = scale
+
+        ## the running ffmpeg process, or None
+        self._process = None
+
+        ## the log file for the ffmpeg process stderr, or None
+        self._log_file = None
+
+        ## the number of the frame the next read from the pipe will return
+        self._next_frame = None
+
+        ## the most recently read frame (frame number, bytes)
+        self._last_frame = (None, None)
+
+        ## lock, the session may be shared between threads
+        self._lock = threading.Lock()
+
+    def get_frame_size(self):
+        """
+        getter for the number of bytes in one output frame
+        """
+        if self._crop is None:
+            return self._video_data.get_frame_size()
+
+        bytes_per_pixel = self._video_data.get_bytes_per_line()//self._video_data.get_width()
+        return self._crop[2]*self._crop[3]*bytes_per_pixel
+
+    def get_file_name(self):
+        """
+        getter for the file decoded
+            Returns:
+                (str)
+        """
+        return self._file_name
+
+    def get_crop(self):
+        """
+        getter for the output rectangle
+            Returns:
+                (tuple) (x, y, width, height) or None if whole frames are output
+        """
+        return self._crop
+
+    def set_seek_index(self, seek_index):
+        """
+        setter for the index of the video's frames, used from the next seek
+            Args:
+                seek_index (SeekIndex): the index, or None for time based seeks
+        """
+        with self._lock:
+            self._seek_index = seek_index
+
+    def read_frame(self, frame):
+        """
+        get the raw bytes of a frame, reading forward in the stream if possible
+            Args:
+                frame (int): the frame number
+            Returns:
+                (bytes): the frame, or None if the frame could not be read
+        """
+        if frame < 0 or frame >= self._video_data.get_frame_count():
+            return None
+
+        with self._lock:
+            if self._last_frame[0] == frame:
+                return self._last_frame[1]
+
+            if not self.can_read_forward_to(frame):
+                self.restart(frame)
+
+            frame_size = self.get_frame_size()
+            while self._next_frame < frame:
+                if len(self._process.stdout.read(frame_size)) < frame_size:
+                    self.stop()
+                    return None
+                self._next_frame += 1
+
+            in_bytes = self._process.stdout.read(frame_size)
+            if len(in_bytes) < frame_size:
+                self.stop()
+                return None
+
+            self._next_frame += 1
+            self._last_frame = (frame, in_bytes)
+
+            return in_bytes
+
+    def can_read_forward_to(self, frame):
+        """
+        test if the frame can be reached without restarting ffmpeg
+            Args:
+                frame (int): the frame number
+            Returns:
+                True if the frame is the next in the stream, or a short way ahead,
+                or with a seek index no key frame lies between
+        """
+        if self._process is None or self._next_frame is None:
+            return False
+
+        if frame < self._next_frame:
+            return False
+
+        # a restart would decode from the key frame, so read on unless it is ahead
+        if self._seek_index is not None and frame < self._seek_index.get_frame_count():
+            return self._seek_index.get_key_frame_before(frame) <= self._next_frame
+
+        return frame - self._next_frame <= config.DECODER_MAX_SKIP
+
+    def restart(self, frame):
+        """
+        stop any current process and start a new one seeking to a frame
+            Args:
+                frame (int): the frame sought, the new process may start at
+                             an earlier key frame
+        """
+        self.stop()
+
+        if self._seek_index is not None and frame < self._seek_index.get_frame_count():
+            # start at the key frame, ffmpeg outputs every frame after it
+            frame, time = self._seek_index.get_seek(frame)
+            stream = ffmpeg.input(self._file_name, ss=time, noaccurate_seek=None)
+        else:
+            time = self._video_data.frame_to_internal_time(frame)
+            stream = ffmpeg.input(self._file_name, ss=time)
+
+        if self._scale is not None:
+            stream = stream.filter('scale', self._scale[0], self._scale[1])
+
+        # convert before cropping so pixels match those of the whole frame
+        if self._crop is not None:
+            x_pos, y_pos, width, height = self._crop
+            stream = (stream
+                      .filter('format', self._pix_fmt)
+                      .filter('crop', width, height, x_pos, y_pos))
+
+        args = (stream
+                .output('pipe:', format='rawvideo', pix_fmt=self._pix_fmt, vsync='0')
+                .compile())
+
+        error_out = subprocess.DEVNULL
+        if config.USE_FFMPEG_LOG:
+            self._log_file = open("ffmpeg_log.txt", 'a')
+            error_out = self._log_file
+
+        self._process = subprocess.Popen(args,
+                                         stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE,
+                                         stderr=error_out)
+        self._next_frame = frame
+
+    def stop(self):
+        """
+        end the current ffmpeg process, if any
+        """
+        if self._process is not None:
+            self._process.stdout.close()
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+        self._next_frame = None
+
+    def close(self):
+        """
+        release the ffmpeg process and the cached frame
+        """
+        with self._lock:
+            self.stop()
+            self._last_frame = (None, None)
@@ -24,16 +24,20 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 # pylint: disable = c-extension-no-member
 # pylint: disable = import-error
 
-import ffmpeg
 import PyQt5.QtCore as qc
 
-from cgt.io.videodata import VideoData
+from cgt.util import config
+from cgt.io.probecache import make_video_data
+from cgt.io.framecache import FrameCache
 
 class FfmpegBase(qc.QObject):
     """
     base class for video reader, holds file name, user frame rate and video data
     """
 
+    ## decoded frames shared by all readers
+    _frame_cache = FrameCache(config.FRAME_CACHE_BYTES)
+
     def __init__(self, file_name, parent=None):
         """
         set up the object
@@ -51,7 +55,7 @@ class FfmpegBase(qc.QObject):
 
     def probe_video(self, user_frame_rate, bytes_per_pixel):
         """
-        open video file and read data
+        read the video data, the file is only probed if it is not in the probe cache
             Args:
                 user_frame_rate (int): the frame rate provided by user
                 bytes_per_pixel (int): the numbe of bytes per pixel
@@ -60,22 +64,7 @@ class FfmpegBase(qc.QObject):
                  (StopIteration): problem with information in video
                  (KeyError): problem with information in video
         """
-        probe = ffmpeg.probe(self._file_name)
-        video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-
-        frame_data = [video_info["width"], video_info["height"], video_info["duration_ts"]]
-
-        parts = video_info["r_frame_rate"].split('/')
-        frame_rate_codec = float(parts[0])/float(parts[1])
-        frame_rates = []
-        if user_frame_rate is None:
-            frame_rates.append(frame_rate_codec)
-        else:
-            frame_rates.append(user_frame_rate)
-
-        frame_rates.append(frame_rate_codec)
-
-        self._video_data = VideoData(frame_data, frame_rates, bytes_per_pixel)
+        self._video_data = make_video_data(self._file_name, user_frame_rate, bytes_per_pixel)
 
     def get_video_data(self):
         """
@@ -90,3 +79,41 @@ class FfmpegBase(qc.QObject):
                 file name (string)
         """
         return self._file_name
+
+    def get_display_name(self):
+        """
+        getter for the name of the file whose frames are decoded, which keys
+        the frames in the shared cache
+            Returns:
+                file name (string)
+        """
+        return self._file_name
+
+    @staticmethod
+    def get_frame_cache():
+        """
+        getter for the frame cache shared by all readers
+            Returns:
+                (FrameCache)
+        """
+        return FfmpegBase._frame_cache
+
+    def get_cached_frame(self, frame, pix_fmt, decode):
+        """
+        get the raw bytes of a frame from the shared cache, decoding on a miss
+            Args:
+                frame (int): the frame number
+                pix_fmt (str): the ffmpeg pixel format
+                decode (function): called with the frame number on a cache miss
+            Returns:
+                (bytes) the frame, or None if it could not be decoded
+        """
+        key = FrameCache.make_key(self.get_display_name(), frame, pix_fmt)
+        in_bytes = FfmpegBase._frame_cache.get(key)
+
+        if in_bytes is None:
+            in_bytes = decode(frame)
+            if in_bytes is not None:
+                FfmpegBase._frame_cache.put(key, in_bytes)
+
+        return in_bytes
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+## @package framecache
+# a least recently used store of decoded video frames with a byte budget
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+import threading
+from collections import OrderedDict
+
+class FrameCache():
+    """
+    a thread safe least recently used cache of raw frame bytes, keyed by
+    (video file, frame number, pixel format). When the total size of the
+    stored frames exceeds the byte budget the least recently used are evicted.
+    """
+
+    def __init__(self, byte_budget):
+        """
+        set up the object
+            Args:
+                byte_budget (int): the maximum number of bytes to be held
+        """
+        ## the frames in order of use, least recent first
+        self._frames = OrderedDict()
+
+        ## the maximum number of bytes held
+        self._byte_budget = byte_budget
+
+        ## the number of bytes currently held
+        self._bytes_held = 0
+
+        ## lock, the cache is shared by all readers
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_name, frame, pix_fmt):
+        """
+        make the key for a frame
+            Args:
+                file_name (str): the video file
+                frame (int): the frame number
+                pix_fmt (str): the ffmpeg pixel format
+            Returns:
+                (tuple) the key
+        """
+        return (str(file_name), int(frame), pix_fmt)
+
+    def get(self, key):
+        """
+        get a frame and mark it as most recently used
+            Args:
+                key (tuple): the key
+            Returns:
+                (bytes) the frame, or None if not held
+        """
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+
+            return frame
+
+    def put(self, key, frame):
+        """
+        store a frame, evicting least recently used frames to stay in budget
+            Args:
+                key (tuple): the key
+                frame (bytes): the frame
+        """
+        size = len(frame)
+        if size > self._byte_budget:
+            return
+
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._bytes_held -= len(old)
+
+            self._frames[key] = frame
+            self._bytes_held += size
+            self.evict()
+
+    def evict(self):
+        """
+        remove least recently used frames until the store is within budget,
+        the lock must be held by the caller
+        """
+        while self._bytes_held > self._byte_budget:
+            _, frame = self._frames.popitem(last=False)
+            self._bytes_held -= len(frame)
+
+    def set_byte_budget(self, byte_budget):
+        """
+        change the budget, evicting frames if needed
+            Args:
+                byte_budget (int): the maximum number of bytes to be held
+        """
+        with self._lock:
+            self._byte_budget = byte_budget
+            self.evict()
+
+    def get_bytes_held(self):
+        """
+        getter for the number of bytes held
+        """
+        return self._bytes_held
+
+    def __len__(self):
+        """
+        the number of frames held
+        """
+        return len(self._frames)
+
+    def __contains__(self, key):
+        """
+        test if a frame is held, without changing its use order
+        """
+        return key in self._frames
+
+    def clear(self):
+        """
+        remove all the frames
+        """
+        with self._lock:
+            self._frames.clear()
+            self._bytes_held = 0
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+## @package frameprefetcher
+# decode frames ahead of the display during video play, in a separate thread
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+# pylint: disable = too-many-instance-attributes
+import threading
+from collections import deque
+
+import PyQt5.QtCore as qc
+import PyQt5.QtGui as qg
+
+from cgt.util import config
+
+class PlaySequence():
+    """
+    the sequence of frames shown in play, frames are numbered by their step
+    in the sequence, which wraps round between the lower and upper limits
+    """
+
+    def __init__(self, first_frame, direction, lower, upper):
+        """
+        set up the object
+            Args:
+                first_frame (int): the first frame to be shown
+                direction (int): +1 for play forward, -1 for play backward
+                lower (int): the lowest frame in the loop
+                upper (int): one past the highest frame in the loop
+        """
+        ## the lowest frame number
+        self._lower = lower
+
+        ## the number of frames in the loop
+        self._length = max(upper - lower, 1)
+
+        ## the offset of the first frame from the lower limit
+        self._offset = first_frame - lower
+
+        ## the direction of play
+        self._direction = direction
+
+    def frame(self, step):
+        """
+        get the frame shown at a step of the sequence
+            Args:
+                step (int): the step number
+            Returns:
+                (int): the frame number
+        """
+        return self._lower + (self._offset + self._direction*step) % self._length
+
+    def steps_to_limit(self, step):
+        """
+        the number of steps, including this one, before the sequence wraps
+            Args:
+                step (int): the step number
+            Returns:
+                (int)
+        """
+        frame = self.frame(step)
+        if self._direction > 0:
+            return self._lower + self._length - frame
+
+        return frame - self._lower + 1
+
+    def is_forward(self):
+        """
+        getter for the direction
+            Returns:
+                True if playing forward else False
+        """
+        return self._direction > 0
+
+class PrefetchWorker(qc.QObject):
+    """
+    decode the frames of a play sequence into the prefetcher's buffer,
+    run in its own thread
+    """
+
+    ## the worker has stopped
+    finished = qc.pyqtSignal()
+
+    def __init__(self, prefetcher):
+        """
+        set up the object
+            Args:
+                prefetcher (FramePrefetcher): the owner of the buffer
+        """
+        super().__init__()
+
+        ## the owner of the buffer
+        self._prefetcher = prefetcher
+
+    @qc.pyqtSlot()
+    def run(self):
+        """
+        decode frames until the prefetcher is stopped
+        """
+        prefetcher = self._prefetcher
+        while True:
+            step = prefetcher.wait_for_space()
+            if step is None:
+                break
+
+            if prefetcher.get_sequence().is_forward():
+                prefetcher.add_frames(step, [self.decode(step)])
+            else:
+                prefetcher.add_frames(step, self.decode_backward_block(step))
+
+        self.finished.emit()
+
+    def decode(self, step):
+        """
+        decode the frame for a single step
+            Args:
+                step (int): the step number
+            Returns:
+                (QImage) the frame or None
+        """
+        frame = self._prefetcher.get_sequence().frame(step)
+        return self._prefetcher.decode_frame(frame)
+
+    def decode_backward_block(self, step):
+        """
+        in backward play decode a block of frames in increasing frame order,
+        so that one ffmpeg seek serves the whole block
+            Args:
+                step (int): the first step of the block
+            Returns:
+                ([QImage]) the frames in play order
+        """
+        sequence = self._prefetcher.get_sequence()
+        count = min(config.PREFETCH_BACKWARD_BLOCK, sequence.steps_to_limit(step))
+        frames = [sequence.frame(step + i) for i in range(count)]
+
+        images = []
+        for frame in reversed(frames):
+            images.append(self._prefetcher.decode_frame(frame))
+
+        images.reverse()
+        return images
+
+class FramePrefetcher(qc.QObject):
+    """
+    plays a video: a worker thread decodes frames ahead of the display into a
+    ring buffer, and a timer in the GUI thread delivers them at the user frame
+    rate. If a frame is not ready when it is due it is dropped, and the worker
+    skips ahead, so play never falls behind the user frame rate.
+    """
+
+    ## signal that a frame is ready to display (as VideoSource)
+    display_image = qc.pyqtSignal(qg.QPixmap, int)
+
+    def __init__(self, video_source, parent=None):
+        """
+        set up the object
+            Args:
+                video_source (VideoSource): the source of the frames
+                parent (QObject): parent object
+        """
+        super().__init__(parent)
+
+        ## the source of the frames
+        self._video_source = video_source
+
+        ## the worker's decoder, seperate from the one used by the GUI thread
+        self._decoder = video_source.make_decoder()
+
+        ## the worker's decoder for regions, or None
+        self._region_decoder = None
+
+        ## the region of the frames to be played, or None for whole frames
+        self._rect = None
+
+        ## the decoded frames (step, QImage) in play order
+        self._buffer = deque()
+
+        ## guards the buffer and the play state
+        self._condition = threading.Condition()
+
+        ## the sequence being played
+        self._sequence = None
+
+        ## the step of the frame to be displayed next
+        self._display_step = 0
+
+        ## the step of the frame to be decoded next
+        self._decode_step = 0
+
+        ## flag, if True the worker is to stop
+        self._stopping = True
+
+        ## the thread running the worker
+        self._thread = None
+
+        ## the worker
+        self._worker = None
+
+        ## the timer delivering frames to the display
+        self._timer = qc.QTimer(self)
+        self._timer.timeout.connect(self.deliver_frame)
+
+    def start(self, first_frame, direction, lower, upper, rect=None):
+        """
+        start play
+            Args:
+                first_frame (int): the first frame to be shown
+                direction (int): +1 for play forward, -1 for play backward
+                lower (int): the lowest frame in the loop
+                upper (int): one past the highest frame in the loop
+                rect (QRect): if not None only this region of the frames is played
+        """
+        self.stop()
+
+        # the source may have changed the file it displays, e.g. to a proxy
+        if self._decoder.get_file_name() != self._video_source.get_display_name():
+            self._decoder.close()
+            self._decoder = self._video_source.make_decoder()
+
+        self._rect = rect
+        if rect is not None:
+            self._region_decoder = self._video_source.get_region_decoder(rect,
+                                                                         self._region_decoder)
+
+        with self._condition:
+            self._sequence = PlaySequence(first_frame, direction, lower, upper)
+            self._display_step = 0
+            self._decode_step = 0
+            self._buffer.clear()
+            self._stopping = False
+
+        self._worker = PrefetchWorker(self)
+        self._thread = qc.QThread()
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.finished.connect(self._thread.quit)
+        self._thread.start()
+
+        delay = int(1000*self._video_source.get_video_data().get_user_time_step())
+        self._timer.start(max(delay, 1))
+
+    def stop(self):
+        """
+        stop play, and wait for the worker to finish
+        """
+        self._timer.stop()
+
+        with self._condition:
+            self._stopping = True
+            self._buffer.clear()
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+            self._thread = None
+            self._worker = None
+
+    def close(self):
+        """
+        stop play and release the decoder
+        """
+        self.stop()
+        self._decoder.close()
+        if self._region_decoder is not None:
+            self._region_decoder.close()
+            self._region_decoder = None
+
+    def is_playing(self):
+        """
+        getter for the play state
+            Returns:
+                True if playing else False
+        """
+        return not self._stopping
+
+    def get_sequence(self):
+        """
+        getter for the sequence being played
+        """
+        return self._sequence
+
+    def wait_for_space(self):
+        """
+        block the worker until there is space in the buffer
+            Returns:
+                (int): the step to be decoded next, or None if play has stopped
+        """
+        with self._condition:
+            while not self._stopping and len(self._buffer) >= self.capacity():
+                self._condition.wait()
+
+            if self._stopping:
+                return None
+
+            # if the display has overtaken the decoder skip ahead
+            self._decode_step = max(self._decode_step, self._display_step)
+            return self._decode_step
+
+    def capacity(self):
+        """
+        the number of frames the worker may decode ahead, in backward play
+        the next block is started when half a block remains
+        """
+        if self._sequence is not None and not self._sequence.is_forward():
+            return config.PREFETCH_BACKWARD_BLOCK//2 + 1
+
+        return config.PREFETCH_FRAMES
+
+    def add_frames(self, step, images):
+        """
+        add decoded frames to the buffer
+            Args:
+                step (int): the step of the first image
+                images ([QImage]): the frames in play order
+        """
+        with self._condition:
+            if self._stopping:
+                return
+
+            for i, image in enumerate(images):
+                if step + i >= self._display_step and image is not None:
+                    self._buffer.append((step + i, image))
+
+            self._decode_step = step + len(images)
+            self._condition.notify_all()
+
+    def decode_frame(self, frame):
+        """
+        decode a frame to image in the worker thread, sharing the frame cache
+            Args:
+                frame (int): the frame number
+            Returns:
+                (QImage) or None
+        """
+        if self._rect is not None:
+            return self._video_source.get_region_image(frame,
+                                                       self._rect,
+                                                       self._region_decoder)
+
+        in_bytes = self._video_source.get_cached_frame(frame,
+                                                       self._video_source.PIX_FMT[0],
+                                                       self._decoder.read_frame)
+        if in_bytes is None:
+            return None
+
+        return self._video_source.make_image(in_bytes)
+
+    @qc.pyqtSlot()
+    def deliver_frame(self):
+        """
+        callback for the timer, display the frame due now if it has been
+        decoded, else drop it, then advance
+        """
+        image = None
+        with self._condition:
+            if self._stopping:
+                return
+
+            step = self._display_step
+            while len(self._buffer) > 0 and self._buffer[0][0] < step:
+                self._buffer.popleft()
+
+            if len(self._buffer) > 0 and self._buffer[0][0] == step:
+                _, image = self._buffer.popleft()
+
+            self._display_step += 1
+            self._condition.notify_all()
+
+        if image is not None:
+            frame = self._sequence.frame(step)
+            self.display_image.emit(qg.QPixmap.fromImage(image), frame)
@@ -26,14 +26,24 @@ import pathlib
 import itertools
 import getpass
 
+import numpy as np
+
 import PyQt5.QtGui as qg
 import PyQt5.QtCore as qc
 
 from cgt.model.velocitiescalculator import VelocitiesCalculator
-from cgt.io.mpl import OffScreenRender, render_graph
+from cgt.model.growthratefitter import calculator_growth_rates
+from cgt.io.reportimagemanifest import (ReportImageManifest,
+                                        make_image_key,
+                                        video_key,
+                                        rect_key,
+                                        pen_key)
+from cgt.io.reportimageplanner import ReportImagePlanner
+from cgt.io.imageencoder import ImageEncoder
 from cgt.util.utils import make_report_file_names
 from cgt.util.scenegraphitems import get_rect_even_dimensions
-from cgt.util.markers import (hash_results, get_region)
+from cgt.util.markers import hash_results, MarkerTypes, digest_videointensitystats
+from cgt.util import config
 
 class ReportMaker(qc.QObject):
     """
@@ -43,6 +53,9 @@ class ReportMaker(qc.QObject):
     ## the progress signal
     stage_completed = qc.pyqtSignal(int)
 
+    ## the image progress signal (number of images saved, number to be saved)
+    image_saved = qc.pyqtSignal(int, int)
+
     def save_html_report(self, data_source):
         '''
         Creates and co-ordinates the html report file creation and on the file handle to
@@ -60,17 +73,37 @@ class ReportMaker(qc.QObject):
         if not report_dir.exists():
             report_dir.mkdir()
 
+        images_dir = report_dir.joinpath("images")
+        if not images_dir.exists():
+            images_dir.mkdir()
+
+        # images are only remade if their inputs have changed since the last report
+        manifest = ReportImageManifest(images_dir)
+
+        # the frames of all the images are decoded together in one pass
+        # and the images saved by a pool of threads
+        planner = ReportImagePlanner(data_source.get_enhanced_reader(),
+                                     ImageEncoder(),
+                                     manifest)
+
         stage = itertools.count(1)
         with open(html_outfile, "w") as fout:
             write_html_report_start(fout, project)
             self.stage_completed.emit(next(stage))
-            image_files = save_region_location_images(report_dir, data_source)
+            image_files = save_region_location_images(report_dir, data_source, manifest, planner)
             self.stage_completed.emit(next(stage))
-            region_files = save_region_start_images(report_dir, data_source)
+            region_files = save_region_start_images(report_dir, data_source, manifest, planner)
             self.stage_completed.emit(next(stage))
-            key_frame_files = save_region_keyframe_images(report_dir, data_source)
+            key_frame_files = save_region_keyframe_images(report_dir,
+                                                          data_source,
+                                                          manifest,
+                                                          planner)
+            # the images of frames that cannot be decoded are left out of the
+            # manifest, so they are tried again by the next report
+            planner.run(self.image_saved.emit)
             self.stage_completed.emit(next(stage))
-            save_time_evolution_video_statistics(report_dir, data_source)
+            save_time_evolution_video_statistics(report_dir, data_source, manifest)
+            manifest.save()
             self.stage_completed.emit(next(stage))
             #write_html_overview(fout, image_files)
             write_html_stats(fout, report_dir)
@@ -141,6 +174,42 @@ def make_html_speeds_table(calculator, units, speed_table_count):
 
     return '\n'.join(html_table)
 
+def make_html_growth_rates_table(rates, units, speed_table_count):
+    """
+    make a table of the fitted growth rates
+        Args:
+            rates (GrowthRates): the fitted rates
+            units (string): the units of measure
+            speed_table_count (itertools.count): counter for the tables
+    """
+    html_table = ["<table style=\"margin-bottom:5mm;\" class=\"hg-pdf\">"]
+    caption = (f"Table {next(speed_table_count)}. Growth rates fitted by least squares to"
+               " the distance moved at each key frame, with the standard error of the fit and"
+               f" the {100*config.GROWTH_RATE_CONFIDENCE:.0f}% bootstrap confidence interval.")
+    html_table.append(f"<caption>{caption}</caption>\n")
+
+    html_table.append("<tr><th>Marker ID</th><th>Type</th><th>Key Frames</th>"
+                      f"<th>Rate ({units} s<sup>-1</sup>)</th><th>Std. Error</th>"
+                      "<th>Confidence Interval</th></tr>")
+    # markers are numbered as in the speeds table
+    marker_ids = {}
+    for i in range(len(rates.marker)):
+        m_type = MarkerTypes(rates.m_type[i]).name
+        marker_ids[m_type] = marker_ids.get(m_type, -1) + 1
+        interval = "&ndash;"
+        if not np.isnan(rates.ci_low[i]):
+            interval = f"{rates.ci_low[i]:.2f} to {rates.ci_high[i]:.2f}"
+        std_error = "&ndash;"
+        if not np.isnan(rates.std_error[i]):
+            std_error = f"{rates.std_error[i]:.2f}"
+        html_table.append(f"<tr><td>{marker_ids[m_type]}</td><td>{m_type}</td>"
+                          f"<td>{rates.key_frames[i]}</td><td>{rates.rate[i]:.2f}</td>"
+                          f"<td>{std_error}</td><td>{interval}</td></tr>")
+
+    html_table.append("</table>")
+
+    return '\n'.join(html_table)
+
 def write_html_report_start(fout, project):
     '''
     Creates the start of a generic html report.
@@ -272,23 +341,22 @@ def write_html_region(fout, results, index, speeds_table_count, images, fps, sca
             images ([pathlib.Path]): paths to images of region at each key frame
             fps (np.float64): the number of frames per second
             scale (np.float64): the size of a pixel
+            units (str): the units of the pixel size
     '''
     fout.write(f"<h2 align=\"left\">Region {index}:</h3>\n")
 
-    lines = []
-    for marker in results.get_lines():
-        if get_region(marker[0]) == index:
-            lines.append(marker)
-
-    points = []
-    for marker in results.get_points():
-        if get_region(marker[0]) == index:
-            points.append(marker)
+    lines = results.get_line_records_for_region(index)
+    points = results.get_point_records_for_region(index)
 
     calculator = VelocitiesCalculator(lines, points, fps, scale)
     counts = calculator.number_markers()
     if counts[0] > 0 or counts[1] > 0:
         fout.write(make_html_speeds_table(calculator, units, speeds_table_count))
+        rates = calculator_growth_rates(calculator,
+                                        fps,
+                                        config.GROWTH_RATE_BOOTSTRAP_SAMPLES,
+                                        config.GROWTH_RATE_CONFIDENCE)
+        fout.write(make_html_growth_rates_table(rates, units, speeds_table_count))
 
         fig_number = 4 + index
         fout.write("<figure>")
@@ -332,12 +400,13 @@ def to_date_and_time(timestamp):
 
     return date, time
 
-def save_time_evolution_video_statistics(report_dir, data_source):
+def save_time_evolution_video_statistics(report_dir, data_source, manifest):
     """
     save image of time evolution of mean pixel intensity
         Args:
             report_dir (libpath.Path): the directory to hold images
             data_source (CrystlGrowthTrackerMain): the holder of the data
+            manifest (ReportImageManifest): the keys of existing images
     """
     statistics = data_source.get_results().get_video_statistics()
     if statistics is None:
@@ -346,44 +415,63 @@ def save_time_evolution_video_statistics(report_dir, data_source):
     images_dir = report_dir.joinpath("images")
     file_name = images_dir.joinpath("video_statistics.png")
 
-    canvas = OffScreenRender()
-    render_graph(statistics.get_frames(), canvas)
-    canvas.print_png(str(file_name))
+    def make():
+        # matplotlib is slow to import so is only loaded when a plot is made
+        # pylint: disable = import-outside-toplevel
+        from cgt.io.mpl import OffScreenRender, render_graph
+
+        canvas = OffScreenRender()
+        render_graph(statistics, canvas)
+        canvas.print_png(str(file_name))
+
+    key = make_image_key("statistics", digest_videointensitystats(statistics).hex())
+    manifest.make_image(file_name, key, make)
 
     return file_name
 
-def save_region_start_images(report_dir, data_source):
+def save_region_start_images(report_dir, data_source, manifest, planner):
     """
-    save image of each region
+    plan the image of each region in the first frame
         Args:
             report_dir (libpath.Path): the directory to hold images
             data_source (CrystlGrowthTrackerMain): the holder of the data
+            manifest (ReportImageManifest): the keys of existing images
+            planner (ReportImagePlanner): the plan of images to be made
+        Returns:
+            [pathlib.Path] the image files
     """
     images_dir = report_dir.joinpath("images")
-    raw_image = data_source.get_enhanced_reader().get_pixmap(0)
+    video = video_key(data_source.get_enhanced_reader().get_name())
+    encoder = planner.get_encoder()
     files = []
 
     results = data_source.get_results()
     for i, region in enumerate(results.get_regions()):
         rect = get_rect_even_dimensions(region)
-        pixmap = raw_image.copy(rect)
-        out_file = images_dir.joinpath(f"region_{i}.png")
-        pixmap.save(str(out_file))
+        out_file = images_dir.joinpath(f"region_{i}.{encoder.get_suffix()}")
+        key = make_image_key("region", video, 0, rect_key(rect), encoder.get_key())
+        if not manifest.is_current(out_file, key):
+            planner.add_image(0, out_file, lambda image, r=rect: image.copy(r), key)
         files.append(out_file)
 
     return files
 
-def save_region_location_images(report_dir, data_source):
+def save_region_location_images(report_dir, data_source, manifest, planner):
     """
-    save start, middle and final frames of video with the regions marked
+    plan the start, middle and final frames of video with the regions marked
         Args:
             report_dir (libpath.Path): the directory to hold images
             data_source (CrystlGrowthTrackerMain): the holder of the data
+            manifest (ReportImageManifest): the keys of existing images
+            planner (ReportImagePlanner): the plan of images to be made
+        Returns:
+            [pathlib.Path] the image files
     """
     images_dir = report_dir.joinpath("images")
-    start_file = images_dir.joinpath("regions_start.png")
-    middle_file = images_dir.joinpath("regions_middle.png")
-    last_file = images_dir.joinpath("regions_end.png")
+    suffix = planner.get_encoder().get_suffix()
+    start_file = images_dir.joinpath(f"regions_start.{suffix}")
+    middle_file = images_dir.joinpath(f"regions_middle.{suffix}")
+    last_file = images_dir.joinpath(f"regions_end.{suffix}")
 
     last = data_source.get_enhanced_reader().get_video_data().get_frame_count()-1
     middle = int(last/2)
@@ -392,39 +480,60 @@ def save_region_location_images(report_dir, data_source):
     if not images_dir.exists():
         images_dir.mkdir()
 
-    save_image_with_regions(first, start_file, data_source)
-    save_image_with_regions(middle, middle_file, data_source)
-    save_image_with_regions(middle, last_file, data_source)
+    save_image_with_regions(first, start_file, data_source, manifest, planner)
+    save_image_with_regions(middle, middle_file, data_source, manifest, planner)
+    save_image_with_regions(last, last_file, data_source, manifest, planner)
 
     return [start_file, middle_file, last_file]
 
-def save_image_with_regions(frame, out_file, data_source):
+def save_image_with_regions(frame, out_file, data_source, manifest, planner):
     """
-    save frame to file
+    plan a frame with the regions drawn, if the frame, regions or pen have changed
         Args:
             frame (int): frame number
             out_file (pathlib.Path):
             data_source (CrystalGrowthTrackeMain): holder of the data
+            manifest (ReportImageManifest): the keys of existing images
+            planner (ReportImagePlanner): the plan of images to be made
     """
-    pixmap = data_source.get_enhanced_reader().get_pixmap(frame)
+    reader = data_source.get_enhanced_reader()
+    pen = data_source.get_pens().get_display_pen()
+    rects = [get_rect_even_dimensions(x, False) for x in data_source.get_results().get_regions()]
 
-    painter = qg.QPainter(pixmap)
-    painter.setPen(data_source.get_pens().get_display_pen())
-    results = data_source.get_results()
-    for region in results.get_regions():
-        rect = get_rect_even_dimensions(region, False)
-        painter.drawRect(rect)
+    key = make_image_key("regions",
+                         video_key(reader.get_name()),
+                         frame,
+                         [rect_key(x) for x in rects],
+                         pen_key(pen),
+                         planner.get_encoder().get_key())
+    if manifest.is_current(out_file, key):
+        return
+
+    def make(frame_image):
+        # draw on a copy, the frame is shared with the other images
+        image = frame_image.copy()
 
-    painter.end()
+        painter = qg.QPainter(image)
+        painter.setPen(pen)
+        for rect in rects:
+            painter.drawRect(rect)
 
-    pixmap.save(str(out_file))
+        painter.end()
 
-def save_region_keyframe_images(report_dir, data_source):
+        return image
+
+    planner.add_image(frame, out_file, make, key)
+
+def save_region_keyframe_images(report_dir, data_source, manifest, planner):
     """
-    save image of each region
+    plan the image of each region at each of its key frames
         Args:
             report_dir (libpath.Path): the directory to hold images
             data_source (CrystlGrowthTrackerMain): the holder of the data
+            manifest (ReportImageManifest): the keys of existing images
+            planner (ReportImagePlanner): the plan of images to be made
+        Returns:
+            [[pathlib.Path]] the image files of each region
     """
     images_dir = report_dir.joinpath("images")
     files = []
@@ -433,31 +542,40 @@ def save_region_keyframe_images(report_dir, data_source):
     for index in range(len(results.get_regions())):
         files.append(save_keyframe_images(images_dir,
                                           data_source,
-                                          index))
+                                          index,
+                                          manifest,
+                                          planner))
 
     return files
 
-def save_keyframe_images(images_dir, data_source, region_index):
+def save_keyframe_images(images_dir, data_source, region_index, manifest, planner):
     """
-    save image of the region at each key frame
+    plan the image of the region at each key frame
         Args:
-            images_dir,
-            data_source, region_index
+            images_dir (libpath.Path): the directory to hold images
+            data_source (CrystlGrowthTrackerMain): the holder of the data
+            region_index (int): the index of the region
+            manifest (ReportImageManifest): the keys of existing images
+            planner (ReportImagePlanner): the plan of images to be made
+        Returns:
+            [pathlib.Path] the image files
     """
     results = data_source.get_results()
     region = results.get_regions()[region_index]
     key_frames = results.get_key_frames(region_index)
     rect = get_rect_even_dimensions(region)
+    video = video_key(data_source.get_enhanced_reader().get_name())
+    encoder = planner.get_encoder()
     files = []
 
     if key_frames is None:
         return files
 
     for frame in key_frames:
-        raw_image = data_source.get_enhanced_reader().get_pixmap(frame)
-        pixmap = raw_image.copy(rect)
-        out_file = images_dir.joinpath(f"region_{region_index}_frame_{frame}.png")
-        pixmap.save(str(out_file))
+        out_file = images_dir.joinpath(f"region_{region_index}_frame_{frame}.{encoder.get_suffix()}")
+        key = make_image_key("region", video, frame, rect_key(rect), encoder.get_key())
+        if not manifest.is_current(out_file, key):
+            planner.add_image(frame, out_file, lambda image: image.copy(rect), key)
         files.append(out_file)
 
     return files
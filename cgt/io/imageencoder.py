@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+## @package imageencoder
+# encode and save images in a pool of worker threads
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cgt.util import config
+
+def save_image(image, out_file, image_format, quality):
+    """
+    encode and save an image, run in a worker thread
+        Args:
+            image (QImage): the image, QImage unlike QPixmap may be used in any thread
+            out_file (pathlib.Path): the file
+            image_format (str): the format, e.g. png, jpg or webp
+            quality (int): 0 to 100, small files to high quality, -1 for the default
+        Throws:
+            (OSError) if the image cannot be saved
+    """
+    if not image.save(str(out_file), image_format.upper(), quality):
+        raise OSError(f"Unable to save image {out_file}")
+
+class ImageEncoder():
+    """
+    a pool of threads encoding and saving images, the images are submitted
+    then the caller waits for all to be saved
+    """
+
+    def __init__(self, image_format=None, quality=None, workers=None):
+        """
+        set up the object, the settings default to those in config when the
+        object is made, so changes to config after import are used
+            Args:
+                image_format (str): the format, e.g. png, jpg or webp, None for config
+                quality (int): 0 to 100, small files to high quality, -1 for the
+                               format's default, None for config
+                workers (int): the number of threads, None for config
+        """
+        if image_format is None:
+            image_format = config.REPORT_IMAGE_FORMAT
+
+        if quality is None:
+            quality = config.REPORT_IMAGE_QUALITY
+
+        if workers is None:
+            workers = config.REPORT_ENCODE_WORKERS
+
+        ## the image format
+        self._image_format = image_format
+
+        ## the quality, or compression level
+        self._quality = quality
+
+        ## the number of threads
+        self._workers = workers
+
+        ## the pool of threads, made when the first image is submitted
+        self._pool = None
+
+        ## the images being saved
+        self._futures = []
+
+    def get_suffix(self):
+        """
+        getter for the file suffix of the images
+            Returns:
+                (str)
+        """
+        return self._image_format.lower()
+
+    def get_key(self):
+        """
+        get the settings affecting the content of the image files
+            Returns:
+                (list) format and quality
+        """
+        return [self.get_suffix(), self._quality]
+
+    def submit(self, image, out_file):
+        """
+        start saving an image
+            Args:
+                image (QImage): the image, which must not be changed until saved
+                out_file (pathlib.Path): the file
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers)
+
+        self._futures.append(self._pool.submit(save_image,
+                                               image,
+                                               out_file,
+                                               self._image_format,
+                                               self._quality))
+
+    def wait(self, progress=None):
+        """
+        wait for all the submitted images to be saved
+            Args:
+                progress (function): if not None called with (number saved, total)
+                                     as each image is saved
+            Throws:
+                (OSError) if any image could not be saved
+        """
+        total = len(self._futures)
+        try:
+            for count, future in enumerate(as_completed(self._futures), 1):
+                future.result()
+                if progress is not None:
+                    progress(count, total)
+        finally:
+            self._futures = []
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
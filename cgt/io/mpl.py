@@ -18,6 +18,8 @@ specific language governing permissions and limitations under the License.
 
 This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 """
+import numpy as np
+
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.backends.backend_agg import FigureCanvasAgg
@@ -80,22 +82,22 @@ def make_mplcanvas(width=5, height=4, dpi=100, toolbar_flag=True):
 
     return canvas, toolbar
 
-def render_graph(frames, canvas, frame=None):
+def render_graph(stats, canvas, frame=None):
     """
     render the graph of intesities against time
         Args:
-            frames ([FrameStats]): the frame statistics
+            stats (VideoIntensityStats): the video statistics
             canvas (mapplotlib.FigureCanvas): the canvas
             frame (int): the frame number, if valid provided frame line will be added
         Returns:
             pointer to frame line or None
     """
-    means = [x.mean for x in frames]
-    std_dev = [x.std_deviation for x in frames]
+    means = stats.get_means()
+    std_dev = stats.get_std_devs()
 
-    upper = [means[a]+x for a, x in enumerate(std_dev)]
-    lower = [means[a]-x for a, x in enumerate(std_dev)]
-    x_vals = range(0, len(means))
+    upper = means + std_dev
+    lower = means - std_dev
+    x_vals = np.arange(len(means))
 
     canvas.axes.plot(x_vals, means, label=r'$\mu$')
     canvas.axes.plot(x_vals, lower, label=r"-$\sigma$")
@@ -103,7 +105,7 @@ def render_graph(frames, canvas, frame=None):
     canvas.axes.fill_between(x_vals, lower, upper, alpha=0.2)
 
     frame_line = None
-    if frame is not None and not frame < 0 and not frame >= len(frames):
+    if frame is not None and not frame < 0 and not frame >= len(means):
         line_x = [frame, frame]
         line_y = [5, 250]
         frame_line = canvas.axes.plot(line_x, line_y)
@@ -130,9 +132,8 @@ def render_prob_density(stats, canvas, frame):
             pointer to line
 
     """
-    frames = stats.get_frames()
     curve = canvas.axes.plot(stats.get_bins()[1:32],
-                             frames[frame].bin_counts)
+                             stats.get_bin_counts()[frame])
 
     canvas.axes.set_xlabel('Pixel Intensity')
     canvas.axes.set_ylabel('Proportion')
@@ -157,9 +158,8 @@ def update_density(plot, density_curve, stats, frame):
     if density_curve is None:
         return
 
-    frames = stats.get_frames()
     density_curve[0].set_data(stats.get_bins()[1:32],
-                              frames[frame].bin_counts)
+                              stats.get_bin_counts()[frame])
 
     plot.draw()
 
@@ -176,7 +176,7 @@ def update_graph(plot, frame_line, frame):
     frame_line[0].set_data(line_x, line_y)
     plot.draw()
 
-def draw_displacements(canvas, lines, points, region):
+def draw_displacements(canvas, lines, points, region, rates=None):
     """
     draw the time displacement graphs
         Args:
@@ -184,6 +184,8 @@ def draw_displacements(canvas, lines, points, region):
             lines (): array of graphics line
             points (): array of grahics point
             region (int): the region
+            rates (GrowthRates, GrowthRates): if not None the fitted rates of
+                                              the lines and points, shown in the legend
     """
     canvas.axes.cla()
     canvas.axes.set_title(f'Marker Displacements Frame {region}')
@@ -198,7 +200,10 @@ def draw_displacements(canvas, lines, points, region):
             displacements.append(new_dis)
             frames.append(dis.get_end())
 
-        canvas.axes.plot(frames, displacements, label=f"Line {i}")
+        label = f"Line {i}"
+        if rates is not None:
+            label += make_rate_label(rates[0], i)
+        canvas.axes.plot(frames, displacements, label=label)
 
     for i, marker in enumerate(points):
         displacements = [0.0]
@@ -208,9 +213,28 @@ def draw_displacements(canvas, lines, points, region):
             displacements.append(new_dis)
             frames.append(dis.get_end())
 
-        canvas.axes.plot(frames, displacements, label=f"Point {i}")
+        label = f"Point {i}"
+        if rates is not None:
+            label += make_rate_label(rates[1], i)
+        canvas.axes.plot(frames, displacements, label=label)
 
     if len(lines) or len(points):
         canvas.axes.legend()
 
     canvas.draw()
+
+def make_rate_label(rates, index):
+    """
+    make the legend text for a fitted growth rate
+        Args:
+            rates (GrowthRates): the rates
+            index (int): the index of the rate
+        Returns:
+            (str)
+    """
+    rate = rates.rate[index]
+    error = rates.std_error[index]
+    if np.isnan(error):
+        return f" ({rate:.2f} per s)"
+
+    return f" ({rate:.2f} \u00b1 {error:.2f} per s)"
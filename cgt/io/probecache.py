@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+## @package probecache
+# a store of the ffprobe results of video files, so each file is only probed
+# once, the store is saved in the project directory
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+import os
+import json
+import pathlib
+import tempfile
+import threading
+
+import ffmpeg
+
+from cgt.util import config
+from cgt.io.videodata import VideoData
+
+class ProbeCache():
+    """
+    a thread safe store of the video stream information of video files, keyed
+    by the absolute path, an entry is only used if the file's size and
+    modification time are unchanged. If a directory is set the store is
+    read from, and saved to, a json file in the directory, and holds only
+    the entries of that directory's project.
+    """
+
+    def __init__(self):
+        """
+        set up the object
+        """
+        ## map absolute path => {"size", "mtime_ns", "stream"}
+        self._entries = {}
+
+        ## the file holding the saved entries, or None
+        self._file = None
+
+        ## lock, readers in several threads may probe
+        self._lock = threading.Lock()
+
+    def set_directory(self, dir_name):
+        """
+        set the directory holding the saved entries, and read them, replacing
+        the entries of any previous directory
+            Args:
+                dir_name (str): the directory, None for no saving
+        """
+        with self._lock:
+            self._entries = {}
+            if dir_name is None:
+                self._file = None
+                return
+
+            self._file = pathlib.Path(dir_name).joinpath(config.PROBE_CACHE_FILE)
+            if not self._file.exists():
+                return
+
+            try:
+                with open(self._file, 'r') as fin:
+                    self._entries = json.load(fin)
+            except (OSError, ValueError):
+                pass
+
+    def get_video_stream(self, file_name):
+        """
+        get the information on the first video stream of a file, which is
+        only probed if the file is new or has changed
+            Args:
+                file_name (str): the video file
+            Returns:
+                (dict) the stream information as given by ffprobe
+            Throws:
+                 (ffmpeg.Error): can't probe video
+                 (StopIteration): no video stream
+        """
+        path = str(pathlib.Path(file_name).resolve())
+        try:
+            stat = os.stat(path)
+            size, mtime = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime = None, None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and size is not None:
+                if entry["size"] == size and entry["mtime_ns"] == mtime:
+                    return entry["stream"]
+
+        probe = ffmpeg.probe(file_name)
+        stream = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+
+        if size is not None:
+            with self._lock:
+                self._entries[path] = {"size": size, "mtime_ns": mtime, "stream": stream}
+                self.save()
+
+        return stream
+
+    def save(self):
+        """
+        save the entries, if a directory is set, the file is replaced in one
+        step so that processes sharing the directory never read a part file
+        """
+        if self._file is None:
+            return
+
+        try:
+            with tempfile.NamedTemporaryFile('w',
+                                             dir=self._file.parent,
+                                             suffix=".tmp",
+                                             delete=False) as fout:
+                json.dump(self._entries, fout)
+            os.replace(fout.name, self._file)
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        remove all the entries held in memory
+        """
+        with self._lock:
+            self._entries.clear()
+
+## the store shared by all the video readers of a process
+_probe_cache = ProbeCache()
+
+def get_probe_cache():
+    """
+    getter for the store shared by all the video readers
+        Returns:
+            (ProbeCache)
+    """
+    return _probe_cache
+
+def make_video_data(file_name, user_frame_rate, bytes_per_pixel):
+    """
+    make the video data of a file from its, possibly cached, probe
+        Args:
+            file_name (str): the video file
+            user_frame_rate (int): the frame rate provided by user, or None
+            bytes_per_pixel (int): the numbe of bytes per pixel
+        Returns:
+            (VideoData)
+        Throws:
+             (ffmpeg.Error): can't probe video
+             (StopIteration): problem with information in video
+             (KeyError): problem with information in video
+    """
+    video_info = _probe_cache.get_video_stream(file_name)
+
+    frame_data = [video_info["width"], video_info["height"], video_info["duration_ts"]]
+
+    parts = video_info["r_frame_rate"].split('/')
+    frame_rate_codec = float(parts[0])/float(parts[1])
+    frame_rates = []
+    if user_frame_rate is None:
+        frame_rates.append(frame_rate_codec)
+    else:
+        frame_rates.append(user_frame_rate)
+
+    frame_rates.append(frame_rate_codec)
+
+    return VideoData(frame_data, frame_rates, bytes_per_pixel)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+## @package proxytranscoder
+# transcode a video to an all intra frame (MJPEG) proxy, which can be
+# decoded at any frame without reference to earlier frames, for display
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+import os
+import hashlib
+import pathlib
+import subprocess
+import tempfile
+
+import ffmpeg
+
+import PyQt5.QtCore as qc
+
+from cgt.util import config
+
+def make_proxy_path(dir_name, video_file):
+    """
+    make the path of the proxy of a video, the name is unique to the video's
+    path, size and modification time, so a changed video gets a new proxy
+        Args:
+            dir_name (str): the project directory
+            video_file (str): the video
+        Returns:
+            (pathlib.Path) the proxy's path
+        Throws:
+            (OSError) if the video cannot be found
+    """
+    path = pathlib.Path(video_file).resolve()
+    stat = os.stat(path)
+    key = (f"{path}|{stat.st_size}|{stat.st_mtime_ns}|"
+           f"{config.PROXY_QUALITY}|{config.PROXY_MAX_WIDTH}")
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()
+
+    return pathlib.Path(dir_name).joinpath(config.PROXY_DIR, f"{path.stem}_{digest}.avi")
+
+def make_proxy_size(video_data):
+    """
+    find the frame size of a proxy, the frames are reduced if they are wider
+    than config.PROXY_MAX_WIDTH, keeping the aspect ratio
+        Args:
+            video_data (VideoData): the video's data
+        Returns:
+            (int, int) the width and height, or None if the frames are not reduced
+    """
+    width = video_data.get_width()
+    if config.PROXY_MAX_WIDTH <= 0 or width <= config.PROXY_MAX_WIDTH:
+        return None
+
+    height = video_data.get_height()*config.PROXY_MAX_WIDTH/width
+
+    # the yuv pixel formats need even dimensions
+    return config.PROXY_MAX_WIDTH - config.PROXY_MAX_WIDTH%2, max(2, 2*round(height/2))
+
+class ProxyTranscoder(qc.QObject):
+    """
+    an object for making the proxy of a video, for running in a thread. The
+    proxy has the same frames as the video, frame n of the proxy being
+    frame n of the video, and is written to a part file that is renamed
+    only when complete.
+    """
+
+    ## the progress signal, number of frames transcoded
+    frames_done = qc.pyqtSignal(int)
+
+    ## the proxy could not be made, (error message)
+    failed = qc.pyqtSignal(str)
+
+    ## the finished signal, emitted on success and failure
+    finished = qc.pyqtSignal()
+
+    def __init__(self, file_name, out_file, size=None, parent=None):
+        """
+        set up the object
+            Args:
+                file_name (str): the video
+                out_file (pathlib.Path): the proxy
+                size (int, int): the width and height of the proxy, None for that of the video
+                parent (QObject): parent object
+        """
+        super().__init__(parent)
+
+        ## the video
+        self._file_name = file_name
+
+        ## the proxy
+        self._out_file = pathlib.Path(out_file)
+
+        ## the proxy's frame size, or None
+        self._size = size
+
+        ## the running ffmpeg process, or None
+        self._process = None
+
+        ## flag, set if the transcode has been cancelled
+        self._cancelled = False
+
+    def get_output_file(self):
+        """
+        getter for the proxy file
+            Returns:
+                (pathlib.Path)
+        """
+        return self._out_file
+
+    @qc.pyqtSlot()
+    def run(self):
+        """
+        make the proxy, for running in a thread
+        """
+        try:
+            self.transcode()
+        except ffmpeg.Error as error:
+            message = str(error)
+            if error.stderr is not None:
+                message = error.stderr.decode(errors='replace')
+            self.failed.emit(message)
+        except OSError as error:
+            self.failed.emit(str(error))
+
+        self.finished.emit()
+
+    def transcode(self):
+        """
+        make the proxy
+            Throws:
+                (ffmpeg.Error) if ffmpeg fails
+                (OSError) if the proxy cannot be written
+        """
+        self._out_file.parent.mkdir(parents=True, exist_ok=True)
+        part_file = self._out_file.with_name(self._out_file.stem + ".part.avi")
+
+        # number the time stamps by frame so frame n is at n/frame rate in the proxy
+        stream = ffmpeg.input(self._file_name).video.filter('setpts', 'N/FRAME_RATE/TB')
+        if self._size is not None:
+            stream = stream.filter('scale', self._size[0], self._size[1])
+
+        args = (stream
+                .output(str(part_file),
+                        format='avi',
+                        vcodec='mjpeg',
+                        vsync='0',
+                        **{'q:v':config.PROXY_QUALITY})
+                .global_args('-progress', 'pipe:1', '-nostats')
+                .overwrite_output()
+                .compile())
+
+        with tempfile.TemporaryFile() as log:
+            with subprocess.Popen(args,
+                                  stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.PIPE,
+                                  stderr=log) as process:
+                self._process = process
+
+                # a cancel before the process was assigned could not kill it
+                if self._cancelled:
+                    process.kill()
+
+                for line in process.stdout:
+                    if line.startswith(b"frame="):
+                        self.frames_done.emit(int(line[6:]))
+
+                result = process.wait()
+                self._process = None
+
+            if result != 0 or self._cancelled:
+                if part_file.exists():
+                    part_file.unlink()
+
+                log.seek(0)
+                raise ffmpeg.Error('ffmpeg', None, log.read())
+
+        os.replace(part_file, self._out_file)
+
+    def cancel(self):
+        """
+        stop the transcode, can be called from any thread
+        """
+        self._cancelled = True
+        process = self._process
+        if process is not None:
+            process.kill()
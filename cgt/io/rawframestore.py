@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+## @package rawframestore
+# a flat file of the decoded frames of a video, read through a numpy memmap,
+# so that frames are served without decoding
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+import os
+import hashlib
+import pathlib
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+import ffmpeg
+
+from cgt.util import config
+from cgt.io.seekindex import SeekIndexStore
+
+class RawFrameStore():
+    """
+    the frames of a video in one pixel format, stored one after another, each
+    VideoData.get_frame_size() bytes, as output by ffmpeg's rawvideo format.
+    The file is written by build, to a part file that is renamed when
+    complete, so a store whose file exists is complete.
+    """
+
+    def __init__(self, file_name, store_file, video_data, pix_fmt):
+        """
+        set up the object
+            Args:
+                file_name (str): the video
+                store_file (pathlib.Path): the file holding the frames
+                video_data (VideoData): the video's data, for the pixel format
+                pix_fmt (str): the ffmpeg pixel format
+        """
+        ## the video
+        self._file_name = file_name
+
+        ## the file holding the frames
+        self._store_file = pathlib.Path(store_file)
+
+        ## the video's data
+        self._video_data = video_data
+
+        ## the pixel format
+        self._pix_fmt = pix_fmt
+
+        ## the frames (number of frames, height, bytes per line), or None if not opened
+        self._frames = None
+
+        ## lock, the store may be opened from several threads
+        self._lock = threading.Lock()
+
+    def get_file(self):
+        """
+        getter for the file holding the frames
+            Returns:
+                (pathlib.Path)
+        """
+        return self._store_file
+
+    def is_complete(self):
+        """
+        test if the store has been built
+            Returns:
+                True if the frames can be read
+        """
+        return self._store_file.exists()
+
+    def build(self, progress=None):
+        """
+        decode the video into the store, in one pass of ffmpeg
+            Args:
+                progress (function): if not None called with the number of frames decoded
+            Throws:
+                (ffmpeg.Error) if the video cannot be decoded
+                (OSError) if the store cannot be written
+        """
+        self._store_file.parent.mkdir(parents=True, exist_ok=True)
+        part_file = self._store_file.with_name(self._store_file.name + ".part")
+
+        args = (ffmpeg
+                .input(self._file_name)
+                .output(str(part_file),
+                        format='rawvideo',
+                        pix_fmt=self._pix_fmt,
+                        vframes=self._video_data.get_frame_count())
+                .global_args('-progress', 'pipe:1', '-nostats')
+                .overwrite_output()
+                .compile())
+
+        with tempfile.TemporaryFile() as log:
+            with subprocess.Popen(args,
+                                  stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.PIPE,
+                                  stderr=log) as process:
+                for line in process.stdout:
+                    if progress is not None and line.startswith(b"frame="):
+                        progress(int(line[6:]))
+
+            if process.returncode != 0:
+                if part_file.exists():
+                    part_file.unlink()
+
+                log.seek(0)
+                raise ffmpeg.Error('ffmpeg', None, log.read())
+
+        os.replace(part_file, self._store_file)
+
+    def open(self):
+        """
+        map the frames into memory, if not already mapped
+            Returns:
+                True if the frames are mapped, False if the store is incomplete
+        """
+        with self._lock:
+            if self._frames is not None:
+                return True
+
+            if not self.is_complete():
+                return False
+
+            frame_size = self._video_data.get_frame_size()
+            number_frames = os.path.getsize(self._store_file)//frame_size
+            if number_frames == 0:
+                return False
+
+            self._frames = np.memmap(self._store_file,
+                                     dtype=np.uint8,
+                                     mode='r',
+                                     shape=(number_frames,
+                                            self._video_data.get_height(),
+                                            self._video_data.get_bytes_per_line()))
+
+            return True
+
+    def get_frame_count(self):
+        """
+        get the number of frames in the store
+            Returns:
+                (int) the number of frames, 0 if the store is not open
+        """
+        if self._frames is None:
+            return 0
+
+        return self._frames.shape[0]
+
+    def get_frame(self, frame):
+        """
+        get a frame, as a view of the memory map, no data is copied
+            Args:
+                frame (int): the frame number
+            Returns:
+                (np.array uint8) shape (height, bytes per line), or None if the
+                                 frame is not in the store
+        """
+        if self._frames is None or frame < 0 or frame >= self._frames.shape[0]:
+            return None
+
+        return self._frames[frame]
+
+    def get_frames(self, first, count):
+        """
+        get a run of frames, as a view of the memory map
+            Args:
+                first (int): the first frame number
+                count (int): the number of frames
+            Returns:
+                (np.array uint8) shape (number of frames, height, bytes per line),
+                                 shorter than count if the store ends first
+        """
+        if self._frames is None:
+            return np.empty((0,
+                             self._video_data.get_height(),
+                             self._video_data.get_bytes_per_line()),
+                            dtype=np.uint8)
+
+        return self._frames[first:first+count]
+
+class RawFrameStores():
+    """
+    the source of raw frame stores, which are kept in the config.RAW_STORE_DIR
+    subdirectory of the project directory. A store is only provided if
+    config.USE_RAW_FRAME_STORE is set and the frames are no more than
+    config.RAW_STORE_MAX_BYTES.
+    """
+
+    def __init__(self):
+        """
+        set up the object
+        """
+        ## the directory holding the stores, or None
+        self._directory = None
+
+    def set_directory(self, dir_name):
+        """
+        set the directory holding the stores
+            Args:
+                dir_name (str): the project directory, None for no stores
+        """
+        if dir_name is None:
+            self._directory = None
+        else:
+            self._directory = pathlib.Path(dir_name).joinpath(config.RAW_STORE_DIR)
+
+    def get_store(self, file_name, video_data, pix_fmt):
+        """
+        get the store of a video in a pixel format, the store may not yet be built
+            Args:
+                file_name (str): the video
+                video_data (VideoData): the video's data, for the pixel format
+                pix_fmt (str): the ffmpeg pixel format
+            Returns:
+                (RawFrameStore) or None if stores are not in use, or the video is too big
+        """
+        if not config.USE_RAW_FRAME_STORE or self._directory is None:
+            return None
+
+        size = video_data.get_frame_count()*video_data.get_frame_size()
+        if size > config.RAW_STORE_MAX_BYTES:
+            return None
+
+        file_key = SeekIndexStore.make_file_key(file_name)
+        if file_key is None:
+            return None
+        path, (file_size, mtime) = file_key
+
+        key = f"{path}|{file_size}|{mtime}|{pix_fmt}"
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()
+        store_file = self._directory.joinpath(f"{path.stem}_{pix_fmt}_{digest}.raw")
+
+        return RawFrameStore(str(path), store_file, video_data, pix_fmt)
+
+## the source of stores shared by all the video readers of a process
+_raw_frame_stores = RawFrameStores()
+
+def get_raw_frame_stores():
+    """
+    getter for the source of stores shared by all the video readers
+        Returns:
+            (RawFrameStores)
+    """
+    return _raw_frame_stores
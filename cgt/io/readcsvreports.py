@@ -30,11 +30,9 @@ import numpy as np
 import PyQt5.QtCore as qc
 import PyQt5.QtWidgets as qw
 
-from cgt.util.framestats import FrameStats, VideoIntensityStats
-from cgt.util.markers import(get_region,
-                             get_frame)
-from cgt.util.scenegraphitems import (list_to_g_point,
-                                      list_to_g_line)
+from cgt.model.markertable import record_from_row
+from cgt.util.framestats import VideoIntensityStats
+from cgt.util.markers import MarkerTypes
 
 def read_csv_project(results_dir, new_project, pens):
     '''Coordinates the reading of a selection of csv reports.
@@ -56,9 +54,10 @@ def read_csv_project(results_dir, new_project, pens):
     old_signal_state = new_project["results"].blockSignals(True)
     read_csv_video_statistics(new_project, files, results_path)
 
+    new_project["results"].change_marker_props(pens)
     if read_csv_regions(new_project, files, results_path):
-        read_csv_points(new_project, files, results_path, pens)
-        read_csv_lines(new_project, files, results_path, pens)
+        read_csv_points(new_project, files, results_path)
+        read_csv_lines(new_project, files, results_path)
         extract_key_frames(new_project["results"])
     new_project["results"].blockSignals(old_signal_state)
 
@@ -127,15 +126,31 @@ def read_csv_video_statistics(new_project, files, path):
 
         stats = VideoIntensityStats(bins)
 
-        for row in reader:
-            mean = np.float64(row.pop(0))
-            std_dev = np.float64(row.pop(0))
-            bin_counts = [np.float64(i) for i in row]
-            stats.append_frame(FrameStats(mean, std_dev, bin_counts))
+        binary_file = tmp[0].with_suffix(".npy")
+        if is_binary_statistics_current(binary_file, tmp[0]):
+            stats.set_records(np.load(binary_file, mmap_mode='r'))
+        else:
+            data = np.loadtxt(file_in, delimiter=',', ndmin=2)
+            if data.size > 0:
+                stats.append_frames(data[:, 0], data[:, 1], data[:, 2:])
 
     tmp = new_project["results"]
     new_project["results"].set_video_statistics(stats)
 
+def is_binary_statistics_current(binary_file, csv_file):
+    """
+    test if there is a binary statistics file at least as new as the csv file
+        Args:
+            binary_file (pathlib.Path): the binary sidecar
+            csv_file (pathlib.Path): the csv file
+        Returns:
+            True if the binary file can be used else False
+    """
+    if not binary_file.exists():
+        return False
+
+    return binary_file.stat().st_mtime >= csv_file.stat().st_mtime
+
 def read_csv_regions(new_project, files, path):
     """
     read the video regions, if it exists
@@ -169,7 +184,7 @@ def read_csv_regions(new_project, files, path):
 
     return flag
 
-def read_csv_points(new_project, files, path, pens):
+def read_csv_points(new_project, files, path):
     """
     read the points file, if it exists
         Args:
@@ -205,20 +220,16 @@ def read_csv_points(new_project, files, path, pens):
         for _, point_iterator in itertools.groupby(region_group, operator.itemgetter(0)):
             point_group = list(point_iterator)
             point_group.sort(key=operator.itemgetter(5))
-            g_marker = []
-            for row in point_group:
-                g_marker.append(list_to_g_point(row, pens.get_display_pen()))
-
-            new_project["results"].insert_point_marker(g_marker)
+            marker = [record_from_row(MarkerTypes.POINT, row) for row in point_group]
+            new_project["results"].insert_point_records(marker)
 
-def read_csv_lines(new_project, files, path, pens):
+def read_csv_lines(new_project, files, path):
     """
     read the lines file, if it exists
         Args:
             new_project (CGTProject): the project object
             files ([pathlib.Path]): list of files in directory
             path (pathlib.Path): the working directory
-            pens (PenStore): the current pens set
         Throws:
             IOException if error reading file
     """
@@ -248,11 +259,8 @@ def read_csv_lines(new_project, files, path, pens):
         for _, line_iterator in itertools.groupby(region_group, operator.itemgetter(0)):
             line_group = list(line_iterator)
             line_group.sort(key=operator.itemgetter(7))
-            g_marker = []
-            for row in line_group:
-                g_marker.append(list_to_g_line(row, pens.get_display_pen()))
-
-            new_project["results"].insert_line_marker(g_marker)
+            marker = [record_from_row(MarkerTypes.LINE, row) for row in line_group]
+            new_project["results"].insert_line_records(marker)
 
 def extract_key_frames(results):
     """
@@ -263,13 +271,9 @@ def extract_key_frames(results):
 
     frames = []
 
-    for line_set in results.get_lines():
-        for line in line_set:
-            frames.append((get_region(line), get_frame(line)))
-
-    for point_set in results.get_points():
-        for point in point_set:
-            frames.append((get_region(point), get_frame(point)))
+    for marker in results.get_line_records() + results.get_point_records():
+        for record in marker:
+            frames.append((record.region, record.frame))
 
     frames.sort(key=operator.itemgetter(0))
 
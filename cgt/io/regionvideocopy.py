@@ -26,14 +26,46 @@ import pathlib
 import tempfile
 import itertools
 import os
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import numpy as np
 import ffmpeg
 
+import PyQt5.QtCore as qc
 import PyQt5.QtGui as qg
 
 from cgt.io.ffmpegbase import FfmpegBase
+from cgt.io.rawframestore import get_raw_frame_stores
+from cgt.util import config
 from cgt.util.scenegraphitems import get_rect_even_dimensions
 
+def crop_frame(frame, rect):
+    """
+    cut a rectangle from a frame, parts outside the frame are filled with zeros
+        Args:
+            frame (np.array uint8): the frame, shape (height, width, bytes per pixel)
+            rect (QRect): the rectangle
+        Returns:
+            (np.array uint8) contiguous array, shape (rect height, rect width, bytes per pixel)
+    """
+    height, width = frame.shape[:2]
+    left = max(rect.x(), 0)
+    top = max(rect.y(), 0)
+    right = min(rect.x() + rect.width(), width)
+    bottom = min(rect.y() + rect.height(), height)
+
+    if left == rect.x() and top == rect.y() and \
+       right == rect.x() + rect.width() and bottom == rect.y() + rect.height():
+        return np.ascontiguousarray(frame[top:bottom, left:right])
+
+    crop = np.zeros((rect.height(), rect.width(), frame.shape[2]), dtype=frame.dtype)
+    if right > left and bottom > top:
+        crop[top-rect.y():bottom-rect.y(), left-rect.x():right-rect.x()] = \
+            frame[top:bottom, left:right]
+
+    return crop
+
 class RegionVideoCopy(FfmpegBase):
     """
     an object for copying videos of regions
@@ -45,6 +77,21 @@ class RegionVideoCopy(FfmpegBase):
     ## the output pixel format
     OUT_PIX_FMT = 'yuv420p'
 
+    ## the progress signal, number of frames read from the video
+    frames_read = qc.pyqtSignal(int)
+
+    ## the video of a region has been written, (region index)
+    region_finished = qc.pyqtSignal(int)
+
+    ## the video of a region could not be written, (region index, error message)
+    region_failed = qc.pyqtSignal(int, str)
+
+    ## the copying failed, (error message), finished is still emitted
+    failed = qc.pyqtSignal(str)
+
+    ## the finished signal
+    finished = qc.pyqtSignal()
+
     def __init__(self, project, parent=None):
         """
         set up the object
@@ -67,14 +114,64 @@ class RegionVideoCopy(FfmpegBase):
         ## the temporary directory that will hold images during production of video
         self._tmp_dir = None
 
+        ## the ffmpeg encoder processes, one per region, used in streaming mode
+        self._encoders = []
+
+        ## the files receiving the encoders' error output
+        self._encoder_logs = []
+
         self.probe_video(1, RegionVideoCopy.IN_PIX_FMT[1])
 
+    def set_output_directory(self, dir_name):
+        """
+        setter for the output directory used by copy_videos
+            dir_name (str): the path to the directory
+        """
+        self._dir_name = pathlib.Path(dir_name)
+
+    @qc.pyqtSlot()
+    def copy_videos(self):
+        """
+        copy each region to the output directory, for running in a thread,
+        finished is always emitted, preceded by failed if an error stopped the copying
+        """
+        try:
+            self.copy_region_videos(self._dir_name)
+        except Exception as error: # pylint: disable = broad-except
+            self.failed.emit(str(error))
+        finally:
+            self.finished.emit()
+
     def copy_region_videos(self, dir_name):
         """
-        copy each region to a seperate video file
+        copy each region to a seperate video file, the frames are read once
             dir_name (str): the path to the directory
+            Throws:
+                (OSError) if the frames cannot be read
         """
         self._dir_name = pathlib.Path(dir_name)
+
+        with self.open_frames(self.get_raw_store()) as stream:
+            if config.REGION_EXPORT_STREAMING:
+                self.stream_film(stream)
+            else:
+                self.process_film(stream)
+
+    @contextlib.contextmanager
+    def open_frames(self, store):
+        """
+        open a stream of the raw frames of the video
+            Args:
+                store (RawFrameStore): if not None the frames are read from the store,
+                                       else they are decoded by ffmpeg
+            Returns:
+                (file) the stream, closed when the context is left
+        """
+        if store is not None:
+            with open(store.get_file(), 'rb') as stream:
+                yield stream
+            return
+
         length = self._video_data.get_frame_count()
         args = (ffmpeg
                 .input(self.get_name())
@@ -83,21 +180,141 @@ class RegionVideoCopy(FfmpegBase):
 
         with open(os.devnull, 'w') as f_err:
             with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=f_err) as proc:
-                self.process_film(proc)
+                try:
+                    yield proc.stdout
+                finally:
+                    # stop the decoder if the stream was not read to the end
+                    if proc.poll() is None:
+                        proc.kill()
 
-    def process_film(self, video_proc):
+    def get_raw_store(self):
+        """
+        get the raw frame store of the video, building it if needed, progress
+        of the build is reported by frames_read
+            Returns:
+                (RawFrameStore) the built store, or None if stores are not in
+                                use or the store could not be built
         """
-        read one frame from the ffmpeg process
-            video_proc (subprocess.Popen): the ffmpeg process
+        store = get_raw_frame_stores().get_store(self.get_name(),
+                                                 self._video_data,
+                                                 RegionVideoCopy.IN_PIX_FMT[0])
+        if store is None or store.is_complete():
+            return store
+
+        try:
+            store.build(self.frames_read.emit)
+        except (ffmpeg.Error, OSError):
+            return None
+
+        return store
+
+    def stream_film(self, stream):
+        """
+        read the frames from the stream, writing the raw bytes of each
+        region directly to an encoder for that region, no intermediate files are used
+            stream (file): the source of raw frames
+        """
+        regions = self._project["results"].get_regions()
+        rects = [get_rect_even_dimensions(region) for region in regions]
+        shape = (self._video_data.get_height(),
+                 self._video_data.get_width(),
+                 RegionVideoCopy.IN_PIX_FMT[1])
+
+        self.start_encoders(rects)
+        count = itertools.count()
+        try:
+            flag = True
+            while flag:
+                in_bytes = stream.read(self._video_data.get_frame_size())
+
+                if len(in_bytes) == self._video_data.get_frame_size():
+                    frame = np.frombuffer(in_bytes, dtype=np.uint8).reshape(shape)
+                    for encoder, rect in zip(self._encoders, rects):
+                        if encoder.poll() is None:
+                            try:
+                                encoder.stdin.write(crop_frame(frame, rect))
+                            except BrokenPipeError:
+                                pass
+                    self.report_progress(next(count))
+                else:
+                    flag = False
+        finally:
+            self.finish_encoders()
+
+    def report_progress(self, frame_number):
+        """
+        emit the progress signal every few frames
+            Args:
+                frame_number (int): the number of the frame just read
+        """
+        if (frame_number+1)%10 == 0:
+            self.frames_read.emit(frame_number+1)
+
+    def start_encoders(self, rects):
+        """
+        start an ffmpeg encoder, reading raw frames from its stdin, for each region
+            Args:
+                rects ([QRect]): the regions, with even dimensions
+        """
+        fps = int(self._project['frame_rate'])
+        self._encoders = []
+        for i, rect in enumerate(rects):
+            out_file = f"{self._name_root}_{i}.mp4"
+            out_path = pathlib.Path(self._dir_name).joinpath(out_file)
+
+            args = (ffmpeg
+                    .input('pipe:',
+                           format='rawvideo',
+                           pix_fmt=RegionVideoCopy.IN_PIX_FMT[0],
+                           s=f"{rect.width()}x{rect.height()}",
+                           framerate=fps)
+                    .output(str(out_path), pix_fmt=RegionVideoCopy.OUT_PIX_FMT)
+                    .overwrite_output()
+                    .compile())
+
+            log = tempfile.TemporaryFile()
+            self._encoder_logs.append(log)
+            self._encoders.append(subprocess.Popen(args,
+                                                   stdin=subprocess.PIPE,
+                                                   stdout=subprocess.DEVNULL,
+                                                   stderr=log))
+
+    def finish_encoders(self):
+        """
+        close the encoders' input, wait for them to finish writing and report
+        the outcome for each region
+        """
+        for i, (encoder, log) in enumerate(zip(self._encoders, self._encoder_logs)):
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+
+            if encoder.wait() == 0:
+                self.region_finished.emit(i)
+            else:
+                log.seek(0)
+                self.region_failed.emit(i, log.read().decode(errors='replace'))
+            log.close()
+
+        self._encoders = []
+        self._encoder_logs = []
+
+    def process_film(self, stream):
+        """
+        read the frames from the stream, saving the regions of each as images
+            stream (file): the source of raw frames
         """
         self.start_conversion()
         flag = True
         count = itertools.count()
         while flag:
-            in_bytes = video_proc.stdout.read(self._video_data.get_frame_size())
+            in_bytes = stream.read(self._video_data.get_frame_size())
 
             if not len(in_bytes) == 0:
-                self.save_frame(in_bytes, next(count))
+                frame_number = next(count)
+                self.save_frame(in_bytes, frame_number)
+                self.report_progress(frame_number)
             else:
                 flag = False
 
@@ -127,27 +344,49 @@ class RegionVideoCopy(FfmpegBase):
 
     def finish_conversion(self):
         """
-        combine the region images into videos, clear and remove the tmp directory
+        combine the region images into videos, the regions are encoded concurrently
+        by a bounded pool of workers, then clear and remove the tmp directory
         """
         regions = self._project["results"].get_regions()
+
+        with ThreadPoolExecutor(max_workers=config.REGION_ENCODE_WORKERS) as pool:
+            futures = {pool.submit(self.encode_region, i): i for i in range(len(regions))}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    future.result()
+                    self.region_finished.emit(index)
+                except ffmpeg.Error as error:
+                    message = ""
+                    if error.stderr is not None:
+                        message = error.stderr.decode(errors='replace')
+                    self.region_failed.emit(index, message)
+
+        self._tmp_dir.cleanup()
+
+    def encode_region(self, index):
+        """
+        combine the images of one region into a video, run in a worker thread
+            Args:
+                index (int): the region index
+            Throws:
+                (ffmpeg.Error) if the encoding fails
+        """
         frame = "_%04d.png"
         fps = int(self._project['frame_rate'])
 
-        for i in range(len(regions)):
-            name = f"{self._name_root}_{i}{frame}"
-            frames_path = pathlib.Path(self._tmp_dir.name).joinpath(name)
-            out_file = f"{self._name_root}_{i}.mp4"
-            out_path = pathlib.Path(self._dir_name).joinpath(out_file)
-
-            if out_path.exists():
-                out_path.unlink()
+        name = f"{self._name_root}_{index}{frame}"
+        frames_path = pathlib.Path(self._tmp_dir.name).joinpath(name)
+        out_file = f"{self._name_root}_{index}.mp4"
+        out_path = pathlib.Path(self._dir_name).joinpath(out_file)
 
-            command = (ffmpeg
-                       .input(str(frames_path), framerate=fps)
-                       .output(str(out_path), pix_fmt=RegionVideoCopy.OUT_PIX_FMT))
-            command.run(capture_stderr=True)
+        if out_path.exists():
+            out_path.unlink()
 
-        self._tmp_dir.cleanup()
+        command = (ffmpeg
+                   .input(str(frames_path), framerate=fps)
+                   .output(str(out_path), pix_fmt=RegionVideoCopy.OUT_PIX_FMT))
+        command.run(capture_stderr=True)
 
     def make_image(self, image_bytes):
         """
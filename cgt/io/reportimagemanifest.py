@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+## @package reportimagemanifest
+# a record of the inputs used to make each image of a report, so that only
+# images whose inputs have changed need to be made again
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+
+import os
+import json
+
+import PyQt5.QtGui as qg
+
+from cgt.util.markers import make_digest
+from cgt.util import config
+
+def video_key(file_name):
+    """
+    make the part of an image key identifying a video file, the file is
+    assumed unchanged if its size and modification time are the same
+        Args:
+            file_name (str): the video file
+        Returns:
+            (list) the name, size and modification time
+    """
+    try:
+        stat = os.stat(file_name)
+        return [str(file_name), stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        return [str(file_name), None, None]
+
+def rect_key(rect):
+    """
+    make the part of an image key identifying a rectangle
+        Args:
+            rect (QRect): the rectangle
+        Returns:
+            (list) x, y, width, height
+    """
+    return [rect.x(), rect.y(), rect.width(), rect.height()]
+
+def pen_key(pen):
+    """
+    make the part of an image key identifying a pen
+        Args:
+            pen (QPen): the pen
+        Returns:
+            (list) colour, width and style
+    """
+    return [pen.color().name(qg.QColor.HexArgb), pen.widthF(), int(pen.style())]
+
+def make_image_key(*parts):
+    """
+    make the key of an image, a digest of everything used to make the image
+        Args:
+            parts: json serialisable values, e.g. image type, video key, frame, rects, pen
+        Returns:
+            (str) the hexadecimal digest
+    """
+    digest = make_digest()
+    digest.update(json.dumps(parts).encode("utf-8"))
+    return digest.hexdigest()
+
+class ReportImageManifest():
+    """
+    the keys of the images held in a report's image directory, saved as json
+    with the images so that they can be reused by the next report
+    """
+
+    def __init__(self, images_dir):
+        """
+        set up the object, reading any existing manifest
+            Args:
+                images_dir (pathlib.Path): the directory holding the images
+        """
+        ## the file holding the manifest
+        self._path = images_dir.joinpath(config.REPORT_IMAGE_MANIFEST)
+
+        ## the keys read from file, image file name => key
+        self._old_keys = {}
+
+        ## the keys of the images used in this report, image file name => key
+        self._keys = {}
+
+        ## the number of images that had to be made
+        self._made = 0
+
+        if self._path.exists():
+            try:
+                with open(self._path, 'r') as fin:
+                    self._old_keys = json.load(fin)
+            except (OSError, ValueError):
+                self._old_keys = {}
+
+    def is_current(self, out_file, key):
+        """
+        test if an image exists and was made from the inputs identified by the key,
+        a current image is recorded as used by this report
+            Args:
+                out_file (pathlib.Path): the image file
+                key (str): the key of the image's inputs
+            Returns:
+                True if the image can be reused, else False
+        """
+        if out_file.exists() and self._old_keys.get(out_file.name) == key:
+            self._keys[out_file.name] = key
+            return True
+
+        return False
+
+    def record(self, out_file, key):
+        """
+        record an image as saved by this report, to be called only once the
+        image file has been written
+            Args:
+                out_file (pathlib.Path): the image file
+                key (str): the key of the image's inputs
+        """
+        self._keys[out_file.name] = key
+
+    def make_image(self, out_file, key, make):
+        """
+        make an image if it is not current
+            Args:
+                out_file (pathlib.Path): the image file
+                key (str): the key of the image's inputs
+                make (function): called with no arguments to save the image
+            Returns:
+                True if the image was made, else False
+        """
+        if self.is_current(out_file, key):
+            return False
+
+        make()
+        self.record(out_file, key)
+        self._made += 1
+        return True
+
+    def get_number_made(self):
+        """
+        getter for the number of images made rather than reused
+            Returns:
+                (int)
+        """
+        return self._made
+
+    def save(self):
+        """
+        save the keys of the images used by this report
+        """
+        with open(self._path, 'w') as fout:
+            json.dump(self._keys, fout)
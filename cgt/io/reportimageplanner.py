@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+## @package reportimageplanner
+# collect the images of a report that need video frames, so that every frame
+# is decoded once, in a single sequential pass
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+
+class ReportImagePlanner():
+    """
+    a plan of the images to be made from video frames. Each image is added
+    with a function making it from the frame, when run the union of the
+    frames is decoded in frame order, each frame is passed to all the
+    images made from it and the images are saved by the encoder's threads.
+    The keys of the images are only recorded in the manifest once saved.
+    """
+
+    def __init__(self, reader, encoder, manifest=None):
+        """
+        set up the object
+            Args:
+                reader (VideoSource): the source of the frames
+                encoder (ImageEncoder): the encoder saving the images
+                manifest (ReportImageManifest): if not None records the keys of saved images
+        """
+        ## the source of the frames
+        self._reader = reader
+
+        ## the encoder saving the images
+        self._encoder = encoder
+
+        ## the record of the keys of saved images, or None
+        self._manifest = manifest
+
+        ## map frame number => [(image file, function making the image from the frame, key)]
+        self._images = {}
+
+    def get_encoder(self):
+        """
+        getter for the encoder
+            Returns:
+                (ImageEncoder)
+        """
+        return self._encoder
+
+    def add_image(self, frame, out_file, make, key=None):
+        """
+        add an image to the plan
+            Args:
+                frame (int): the frame number
+                out_file (pathlib.Path): the image file
+                make (function): called with the frame's QImage, returns the QImage
+                                 to be saved, the frame must not be altered
+                key (str): the key of the image's inputs, recorded once the image is saved
+        """
+        self._images.setdefault(frame, []).append((out_file, make, key))
+
+    def get_frames(self):
+        """
+        get the frames needed by the plan
+            Returns:
+                [int] the frame numbers in order
+        """
+        return sorted(self._images.keys())
+
+    def number_of_images(self):
+        """
+        get the number of images in the plan
+            Returns:
+                (int)
+        """
+        return sum(len(x) for x in self._images.values())
+
+    def run(self, progress=None):
+        """
+        decode the frames, make the images and wait for them to be saved,
+        the plan is then emptied. An image whose frame could not be decoded is
+        not made, and any out of date file it replaces is deleted.
+            Args:
+                progress (function): if not None called with (number saved, total)
+                                     as each image is saved
+            Returns:
+                [int] the frames that could not be decoded
+            Throws:
+                (OSError) if an image could not be saved
+        """
+        frames = self.get_frames()
+        submitted = []
+        if len(frames) > 0:
+            for frame, image in self._reader.stream_frames(frames):
+                for out_file, make, key in self._images.pop(frame):
+                    self._encoder.submit(make(image), out_file)
+                    submitted.append((out_file, key))
+
+        missing = self.get_frames()
+        for frame in missing:
+            for out_file, _, _ in self._images[frame]:
+                if out_file.exists():
+                    out_file.unlink()
+        self._images.clear()
+
+        self._encoder.wait(progress)
+
+        if self._manifest is not None:
+            for out_file, key in submitted:
+                if key is not None:
+                    self._manifest.record(out_file, key)
+
+        return missing
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+## @package seekindex
+# an index of the presentation time and key frame flag of every frame of a
+# video, so that decoders can seek straight to the key frame before a frame
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+import os
+import hashlib
+import pathlib
+import tempfile
+import threading
+from fractions import Fraction
+
+import numpy as np
+import ffmpeg
+
+from cgt.util import config
+
+class SeekIndex():
+    """
+    the presentation time stamp (pts) and key frame flag of each frame, in
+    presentation order, frame n being the n'th frame displayed
+    """
+
+    def __init__(self, pts, key_frames, time_base):
+        """
+        set up the object
+            Args:
+                pts (numpy.array int64): the time stamp of each frame, in presentation order
+                key_frames (numpy.array bool): True for the frames that are key frames
+                time_base (Fraction): the time in seconds of one time stamp unit
+        """
+        ## the time stamp of each frame
+        self._pts = np.asarray(pts, dtype=np.int64)
+
+        ## the key frame flags
+        self._key_frames = np.asarray(key_frames, dtype=bool)
+
+        ## the numbers of the key frames, in order
+        self._key_frame_numbers = np.flatnonzero(self._key_frames)
+
+        ## the time in seconds of one time stamp unit
+        self._time_base = Fraction(time_base)
+
+    def get_frame_count(self):
+        """
+        getter for the number of frames indexed
+        """
+        return len(self._pts)
+
+    def get_pts(self):
+        """
+        getter for the time stamps
+            Returns:
+                (numpy.array int64)
+        """
+        return self._pts
+
+    def get_key_frames(self):
+        """
+        getter for the key frame flags
+            Returns:
+                (numpy.array bool)
+        """
+        return self._key_frames
+
+    def get_time_base(self):
+        """
+        getter for the time base
+            Returns:
+                (Fraction)
+        """
+        return self._time_base
+
+    def get_key_frame_before(self, frame):
+        """
+        find the last key frame at or before a frame
+            Args:
+                frame (int): the frame number
+            Returns:
+                (int) the key frame's number, 0 if there is none
+        """
+        i = np.searchsorted(self._key_frame_numbers, frame, side='right') - 1
+        if i < 0:
+            return 0
+
+        return int(self._key_frame_numbers[i])
+
+    def get_time(self, frame):
+        """
+        get the time of a frame from the start of the video
+            Args:
+                frame (int): the frame number
+            Returns:
+                (float) the time in seconds
+        """
+        return float((int(self._pts[frame]) - int(self._pts[0]))*self._time_base)
+
+    def get_seek(self, frame):
+        """
+        get the seek that starts decoding at the key frame before a frame, the
+        time is half way between the key frame and the next, so that a seek
+        to the key frame at or before it cannot miss through rounding
+            Args:
+                frame (int): the frame number
+            Returns:
+                (int, float) the key frame's number and the seek time in seconds
+        """
+        key_frame = self.get_key_frame_before(frame)
+        time = self.get_time(key_frame)
+        if key_frame + 1 < len(self._pts):
+            time = (time + self.get_time(key_frame + 1))/2.0
+
+        return key_frame, time
+
+    def save(self, file_name, file_key):
+        """
+        save to a numpy npz file, the file is replaced in one step so a part
+        written file is never read
+            Args:
+                file_name (pathlib.Path): the file
+                file_key ([int]): the size and modification time of the video
+        """
+        with tempfile.NamedTemporaryFile('wb',
+                                         dir=file_name.parent,
+                                         suffix=".tmp",
+                                         delete=False) as fout:
+            np.savez(fout,
+                     pts=self._pts,
+                     key_frames=self._key_frames,
+                     time_base=np.array([self._time_base.numerator,
+                                         self._time_base.denominator],
+                                        dtype=np.int64),
+                     file_key=np.array(file_key, dtype=np.int64))
+        os.replace(fout.name, file_name)
+
+    @staticmethod
+    def load(file_name, file_key):
+        """
+        read from a numpy npz file
+            Args:
+                file_name (pathlib.Path): the file
+                file_key ([int]): the size and modification time of the video
+            Returns:
+                (SeekIndex) or None if the file is missing, unreadable or of a
+                            different version of the video
+        """
+        try:
+            with np.load(file_name) as data:
+                if list(data["file_key"]) != list(file_key):
+                    return None
+
+                # pylint cannot infer the arrays read from an npz file are subscriptable
+                # pylint: disable = unsubscriptable-object
+                time_base = data["time_base"]
+                return SeekIndex(data["pts"],
+                                 data["key_frames"],
+                                 Fraction(int(time_base[0]), int(time_base[1])))
+        except (OSError, ValueError, KeyError):
+            return None
+
+def build_seek_index(file_name, time_base):
+    """
+    index a video by reading the time stamps and flags of its video packets,
+    the packets are demuxed but not decoded
+        Args:
+            file_name (str): the video file
+            time_base (str): the video stream's time base, as given by ffprobe
+        Returns:
+            (SeekIndex)
+        Throws:
+            (ffmpeg.Error): can't probe video
+            (ValueError): no packets with time stamps
+    """
+    probe = ffmpeg.probe(file_name,
+                         select_streams='v:0',
+                         show_entries='packet=pts,flags')
+
+    pts = []
+    key_frames = []
+    for packet in probe.get("packets", []):
+        if "pts" not in packet or packet["pts"] == "N/A":
+            continue
+        pts.append(int(packet["pts"]))
+        key_frames.append('K' in packet.get("flags", ""))
+
+    if len(pts) == 0:
+        raise ValueError(f"no time stamps in {file_name}")
+
+    # packets are in decoding order, frames are numbered in presentation order
+    pts = np.array(pts, dtype=np.int64)
+    order = np.argsort(pts, kind='stable')
+
+    return SeekIndex(pts[order], np.array(key_frames, dtype=bool)[order], Fraction(time_base))
+
+class SeekIndexStore():
+    """
+    a thread safe store of the seek indices of videos, keyed by absolute path.
+    If a directory is set the indices are saved as npz files in its
+    config.SEEK_INDEX_DIR subdirectory, and are used while the video's
+    size and modification time are unchanged.
+    """
+
+    def __init__(self):
+        """
+        set up the object
+        """
+        ## map absolute path => (file key, SeekIndex or None if the video can't be indexed)
+        self._indices = {}
+
+        ## the directory of the saved indices, or None
+        self._directory = None
+
+        ## lock, readers in several threads may need an index
+        self._lock = threading.Lock()
+
+    def set_directory(self, dir_name):
+        """
+        set the directory holding the saved indices
+            Args:
+                dir_name (str): the project directory, None for no saving
+        """
+        with self._lock:
+            if dir_name is None:
+                self._directory = None
+            else:
+                self._directory = pathlib.Path(dir_name).joinpath(config.SEEK_INDEX_DIR)
+
+    def find_index(self, file_name):
+        """
+        get the index of a video if it is held or saved, the video is never indexed
+            Args:
+                file_name (str): the video file
+            Returns:
+                (SeekIndex) or None if the video has not been, or cannot be, indexed
+        """
+        key = SeekIndexStore.make_file_key(file_name)
+        if key is None:
+            return None
+
+        with self._lock:
+            return self.read_index(*key)[1]
+
+    def get_index(self, file_name, time_base):
+        """
+        get the index of a video, read from file or built if needed, the video
+        is demuxed to build an index, which can take some time
+            Args:
+                file_name (str): the video file
+                time_base (str): the video stream's time base, as given by ffprobe
+            Returns:
+                (SeekIndex) or None if the video cannot be indexed
+        """
+        key = SeekIndexStore.make_file_key(file_name)
+        if key is None:
+            return None
+        path, file_key = key
+
+        with self._lock:
+            found, index = self.read_index(path, file_key)
+            index_file = self.get_index_file(path)
+        if found:
+            return index
+
+        # built without the lock, so the indices of other videos can be read meanwhile
+        try:
+            index = build_seek_index(str(path), time_base)
+        except (ffmpeg.Error, ValueError, OSError):
+            index = None
+
+        with self._lock:
+            self._indices[str(path)] = (file_key, index)
+
+        if index is not None and index_file is not None:
+            try:
+                index_file.parent.mkdir(parents=True, exist_ok=True)
+                index.save(index_file, file_key)
+            except OSError:
+                pass
+
+        return index
+
+    def build_in_background(self, file_name, time_base, callback):
+        """
+        get the index of a video in a background thread, which is abandoned
+        if the program exits
+            Args:
+                file_name (str): the video file
+                time_base (str): the video stream's time base, as given by ffprobe
+                callback (function): called, in the background thread, with the
+                                     SeekIndex, or None if the video cannot be indexed
+        """
+        def build():
+            callback(self.get_index(file_name, time_base))
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def read_index(self, path, file_key):
+        """
+        get the index of a video held in memory, or read it from file, the
+        lock must be held
+            Args:
+                path (pathlib.Path): the absolute path of the video
+                file_key ([int]): the size and modification time of the video
+            Returns:
+                (bool, SeekIndex) True if the video has been indexed, and the
+                                  index, None if the video cannot be indexed
+        """
+        entry = self._indices.get(str(path))
+        if entry is not None and entry[0] == file_key:
+            return True, entry[1]
+
+        index_file = self.get_index_file(path)
+        if index_file is not None:
+            index = SeekIndex.load(index_file, file_key)
+            if index is not None:
+                self._indices[str(path)] = (file_key, index)
+                return True, index
+
+        return False, None
+
+    def get_index_file(self, path):
+        """
+        get the file holding the saved index of a video
+            Args:
+                path (pathlib.Path): the absolute path of the video
+            Returns:
+                (pathlib.Path) or None if no directory is set
+        """
+        if self._directory is None:
+            return None
+
+        return self._directory.joinpath(SeekIndexStore.make_file_name(path))
+
+    @staticmethod
+    def make_file_key(file_name):
+        """
+        make the absolute path of a video and the size and modification time
+        identifying the version of the file
+            Args:
+                file_name (str): the video file
+            Returns:
+                (pathlib.Path, [int]) or None if the file cannot be read
+        """
+        path = pathlib.Path(file_name).resolve()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return path, [stat.st_size, stat.st_mtime_ns]
+
+    @staticmethod
+    def make_file_name(path):
+        """
+        make the name of the file holding the index of a video, unique to the video's path
+            Args:
+                path (pathlib.Path): the absolute path of the video
+            Returns:
+                (str)
+        """
+        digest = hashlib.blake2b(str(path).encode('utf-8'), digest_size=4).hexdigest()
+        return f"{path.stem}_{digest}.npz"
+
+    def clear(self):
+        """
+        remove all the indices held in memory
+        """
+        with self._lock:
+            self._indices.clear()
+
+## the store shared by all the video readers of a process
+_seek_index_store = SeekIndexStore()
+
+def get_seek_index_store():
+    """
+    getter for the store shared by all the video readers
+        Returns:
+            (SeekIndexStore)
+    """
+    return _seek_index_store
@@ -24,6 +24,10 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 import subprocess
 import os
 import pathlib
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, CancelledError, wait
+from concurrent.futures.process import BrokenProcessPool
 
 import PyQt5.QtCore as qc
 
@@ -32,7 +36,112 @@ import ffmpeg
 
 from cgt.util.framestats import FrameStats, VideoIntensityStats
 from cgt.util import config
-from cgt.io.videodata import VideoData
+from cgt.io.probecache import make_video_data
+from cgt.io.rawframestore import get_raw_frame_stores
+
+def make_bin_map(bins):
+    """
+    make the map from the 256 gray levels to the histogram bins, matching
+    numpy.histogram, the last bin includes its upper edge
+        Args:
+            bins ([float]): the bin edges
+        Returns:
+            (np.array int) the bin index of each gray level, -1 if outside the bins
+    """
+    levels = np.arange(256)
+    bin_map = np.searchsorted(bins, levels, side='right') - 1
+    bin_map[levels == bins[-1]] = len(bins) - 2
+    bin_map[bin_map > len(bins) - 2] = -1
+
+    return bin_map
+
+def analyse_frames(frames, bins):
+    """
+    make the statistics for a batch of frames, a 256 level histogram is counted
+    for each frame in one pass over the pixels, the mean and standard deviation
+    are found from the histogram and its counts are folded into the bins
+        Args:
+            frames (np.array uint8): the frames, shape (number of frames, height, width)
+            bins ([float]): the bin edges
+        Returns:
+            (np.array, np.array, np.array) the means, standard deviations and
+            bin counts, shape (number of frames, number of bins), of the frames
+    """
+    number_frames = frames.shape[0]
+    pixels = frames[0].size
+    flat = frames.reshape(number_frames, pixels)
+
+    levels_hist = np.empty((number_frames, 256), dtype=np.int64)
+    for i in range(number_frames):
+        levels_hist[i] = np.bincount(flat[i], minlength=256)
+
+    levels = np.arange(256, dtype=np.int64)
+    means = (levels_hist @ levels)/pixels
+    deviations = (levels[np.newaxis, :] - means[:, np.newaxis])**2
+    std_devs = np.sqrt((levels_hist*deviations).sum(axis=1)/pixels)
+
+    bin_map = make_bin_map(bins)
+    fold = np.zeros((256, len(bins)-1), dtype=np.int64)
+    inside = bin_map >= 0
+    fold[levels[inside], bin_map[inside]] = 1
+    counts = levels_hist @ fold
+
+    return means, std_devs, counts
+
+def read_frames(stream, buffer):
+    """
+    fill a buffer with frames from a stream
+        Args:
+            stream (file): the source of raw frames
+            buffer (np.array uint8): the destination, shape (number of frames, height, width)
+        Returns:
+            (int) the number of whole frames read
+    """
+    view = memoryview(buffer.reshape(-1))
+    filled = 0
+    while filled < len(view):
+        size = stream.readinto(view[filled:])
+        if not size:
+            break
+        filled += size
+
+    return filled//buffer[0].size
+
+def analyse_segment(file_name, segment, shape, bins, progress):
+    """
+    make the statistics for a segment of a video, run in a worker process
+        Args:
+            file_name (str): the video file
+            segment (tuple): (first frame, number of frames, start time in video internal time)
+            shape (tuple): the (height, width) of the frames
+            bins ([float]): the bin edges
+            progress (Queue): the number of frames analysed is put on this queue after each batch
+        Returns:
+            (VideoIntensityStats) the statistics of the frames in the segment
+        Throws:
+            (ValueError) if the number of frames read is not the segment's count
+    """
+    first, count, time = segment
+    args = (ffmpeg
+            .input(file_name, ss=time)
+            .output('pipe:', format='rawvideo', pix_fmt=VideoAnalyser.PIX_FMT[0], vframes=count)
+            .compile())
+
+    buffer = np.empty((config.STATS_BATCH_FRAMES, shape[0], shape[1]), dtype=np.uint8)
+    stats = VideoIntensityStats(bins)
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as video_proc:
+        number_read = config.STATS_BATCH_FRAMES
+        while number_read == config.STATS_BATCH_FRAMES:
+            number_read = read_frames(video_proc.stdout, buffer)
+            if number_read > 0:
+                stats.append_frames(*analyse_frames(buffer[:number_read], bins))
+                progress.put(number_read)
+
+    # an inexact seek, or a short decode, would misalign the joined segments
+    if len(stats) != count:
+        raise ValueError(f"segment at frame {first} read {len(stats)} frames, expected {count}")
+
+    return stats
 
 class VideoAnalyser(qc.QObject):
     """
@@ -76,6 +185,23 @@ class VideoAnalyser(qc.QObject):
         print("VideoAnalyser.stats_whole_film")
         length = self._video_data.get_frame_count()
         print(f"Analyser number of frames {length}")
+
+        store = get_raw_frame_stores().get_store(self._file_name,
+                                                 self._video_data,
+                                                 VideoAnalyser.PIX_FMT[0])
+        if store is not None and self.open_store(store):
+            self._result = self.analyse_store(store)
+            print("finished")
+            self.finished.emit()
+            return
+
+        if config.STATS_WORKERS > 1 and length >= 2*config.STATS_MIN_SEGMENT_FRAMES:
+            self._result = self.stats_in_parallel()
+            if self._result is not None:
+                print("finished")
+                self.finished.emit()
+                return
+
         args = (ffmpeg
                 .input(self.get_name())
                 .output('pipe:', format='rawvideo', pix_fmt=VideoAnalyser.PIX_FMT[0], vframes=length)
@@ -93,6 +219,124 @@ class VideoAnalyser(qc.QObject):
         print("finished")
         self.finished.emit()
 
+    def open_store(self, store):
+        """
+        open a raw frame store, building it first if needed, progress is
+        reported by frames_analysed
+            Args:
+                store (RawFrameStore): the store
+            Returns:
+                True if the store can be read, else False
+        """
+        try:
+            if not store.is_complete():
+                store.build(self.frames_analysed.emit)
+        except (ffmpeg.Error, OSError) as error:
+            print(f"raw frame store not made: {error}")
+            return False
+
+        return store.open()
+
+    def analyse_store(self, store):
+        """
+        analyse the frames of a raw frame store, in batches, no frames are decoded
+            Args:
+                store (RawFrameStore): the store, opened
+            Returns:
+                (VideoIntensityStats)
+        """
+        bins = np.linspace(0, 256, 32)
+        vid_statistics = VideoIntensityStats(bins)
+
+        count = 0
+        while count < store.get_frame_count():
+            frames = store.get_frames(count, config.STATS_BATCH_FRAMES)
+            vid_statistics.append_frames(*analyse_frames(frames, bins))
+            count += frames.shape[0]
+            self.frames_analysed.emit(count)
+
+        return vid_statistics
+
+    def make_segments(self, number_segments):
+        """
+        divide the video into segments of consecutive frames
+            Args:
+                number_segments (int): the number of segments
+            Returns:
+                ([tuple]) (first frame, number of frames, start time) for each segment
+        """
+        length = self._video_data.get_frame_count()
+        starts = np.linspace(0, length, number_segments+1).astype(int)
+
+        segments = []
+        for start, end in zip(starts[:-1], starts[1:]):
+            # seek half a frame early so rounding can not skip the first frame
+            time = self._video_data.frame_to_internal_time(max(start - 0.5, 0))
+            segments.append((int(start), int(end - start), time))
+
+        return segments
+
+    def stats_in_parallel(self):
+        """
+        get the statistics for every frame, with segments of the video analysed
+        in a pool of processes, progress is reported by frames_analysed
+            Returns:
+                the statistics (VideoIntensityStats), or None if a segment could
+                not be analysed, in which case the video should be read in one pass
+        """
+        length = self._video_data.get_frame_count()
+        number_segments = min(config.STATS_WORKERS, length//config.STATS_MIN_SEGMENT_FRAMES)
+        segments = self.make_segments(number_segments)
+        shape = (self._video_data.get_height(), self._video_data.get_width())
+        bins = np.linspace(0, 256, 32)
+
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            progress = manager.Queue()
+            with ProcessPoolExecutor(max_workers=number_segments, mp_context=context) as pool:
+                futures = [pool.submit(analyse_segment,
+                                       self._file_name,
+                                       segment,
+                                       shape,
+                                       bins,
+                                       progress)
+                           for segment in segments]
+
+                count = 0
+                pending = futures
+                while len(pending) > 0:
+                    done, pending = wait(pending, timeout=0.1)
+                    try:
+                        while True:
+                            count += progress.get_nowait()
+                    except queue.Empty:
+                        pass
+                    self.frames_analysed.emit(count)
+
+                    if any(future.exception() is not None for future in done):
+                        for future in pending:
+                            future.cancel()
+                        break
+
+                try:
+                    vid_statistics = VideoIntensityStats(bins)
+                    for future in futures:
+                        segment_stats = future.result()
+                        vid_statistics.append_frames(segment_stats.get_means(),
+                                                     segment_stats.get_std_devs(),
+                                                     segment_stats.get_bin_counts())
+                except (ValueError,
+                        OSError,
+                        ffmpeg.Error,
+                        BrokenProcessPool,
+                        CancelledError) as error:
+                    print(f"parallel analysis failed: {error}")
+                    return None
+
+        self.frames_analysed.emit(len(vid_statistics))
+
+        return vid_statistics
+
     def get_stats(self):
         """
         get the statistics
@@ -101,7 +345,7 @@ class VideoAnalyser(qc.QObject):
 
     def read_and_analyse(self, video_proc):
         """
-        read the frame and analyse them
+        read the frames, in batches, and analyse them
             Args:
                 video_proc (subprocess): ffmpeg process producing frames
             Retruns:
@@ -109,17 +353,20 @@ class VideoAnalyser(qc.QObject):
         """
         bins = np.linspace(0, 256, 32)
         vid_statistics = VideoIntensityStats(bins)
+        buffer = np.empty((config.STATS_BATCH_FRAMES,
+                           self._video_data.get_height(),
+                           self._video_data.get_width()),
+                          dtype=np.uint8)
         count = 0
         flag = True
         while flag:
-            in_bytes = video_proc.stdout.read(self._video_data.get_frame_size())
-            if not len(in_bytes) == 0:
-                vid_statistics.append_frame(self.make_stats(in_bytes, bins))
-                count += 1
-                if count%10 == 0:
-                    self.frames_analysed.emit(count)
-            else:
-                flag = False
+            number_read = read_frames(video_proc.stdout, buffer)
+            if number_read > 0:
+                vid_statistics.append_frames(*analyse_frames(buffer[:number_read], bins))
+                count += number_read
+                self.frames_analysed.emit(count)
+
+            flag = number_read == config.STATS_BATCH_FRAMES
 
         self.frames_analysed.emit(count)
 
@@ -148,7 +395,7 @@ class VideoAnalyser(qc.QObject):
 
     def probe_video(self, user_frame_rate, bytes_per_pixel):
         """
-        open video file and read data
+        read the video data, the file is only probed if it is not in the probe cache
             Args:
                 user_frame_rate (int): the frame rate provided by user
                 bytes_per_pixel (int): the numbe of bytes per pixel
@@ -157,22 +404,7 @@ class VideoAnalyser(qc.QObject):
                  (StopIteration): problem with information in video
                  (KeyError): problem with information in video
         """
-        probe = ffmpeg.probe(self._file_name)
-        video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-
-        frame_data = [video_info["width"], video_info["height"], video_info["duration_ts"]]
-
-        parts = video_info["r_frame_rate"].split('/')
-        frame_rate_codec = float(parts[0])/float(parts[1])
-        frame_rates = []
-        if user_frame_rate is None:
-            frame_rates.append(frame_rate_codec)
-        else:
-            frame_rates.append(user_frame_rate)
-
-        frame_rates.append(frame_rate_codec)
-
-        self._video_data = VideoData(frame_data, frame_rates, bytes_per_pixel)
+        self._video_data = make_video_data(self._file_name, user_frame_rate, bytes_per_pixel)
 
     def get_video_data(self):
         """
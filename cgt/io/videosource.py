@@ -34,10 +34,42 @@ import pathlib
 import PyQt5.QtCore as qc
 import PyQt5.QtGui as qg
 
+import numpy as np
 import ffmpeg
 
 from cgt.util import config
 from cgt.io.ffmpegbase import FfmpegBase
+from cgt.io.decodersession import DecoderSession
+from cgt.io.framecache import FrameCache
+from cgt.io.probecache import get_probe_cache
+from cgt.io.seekindex import get_seek_index_store
+from cgt.io.rawframestore import get_raw_frame_stores
+
+def make_select_expression(frames):
+    """
+    make an ffmpeg select filter expression passing a set of frames, runs of
+    consecutive frames are combined
+        Args:
+            frames ([int]): the frame numbers, sorted and unique
+        Returns:
+            (str) the expression
+    """
+    terms = []
+    start = None
+    for i, frame in enumerate(frames):
+        if start is None:
+            start = frame
+
+        if i+1 < len(frames) and frames[i+1] == frame+1:
+            continue
+
+        if start == frame:
+            terms.append(f"eq(n,{frame})")
+        else:
+            terms.append(f"between(n,{start},{frame})")
+        start = None
+
+    return "+".join(terms)
 
 class VideoSource(FfmpegBase):
     """
@@ -47,6 +79,9 @@ class VideoSource(FfmpegBase):
     ## signal that a frame is ready to display
     display_image = qc.pyqtSignal(qg.QPixmap, int)
 
+    ## signal, from a background thread, that the seek index has been built (SeekIndex)
+    seek_index_built = qc.pyqtSignal(object)
+
     ## the pixel format and number of bytes
     PIX_FMT = ('rgb24', 3)
 
@@ -62,16 +97,238 @@ class VideoSource(FfmpegBase):
 
         self.probe_video(user_frame_rate, VideoSource.PIX_FMT[1])
 
+        ## index of the frames for exact seeking, or None if the video isn't, or can't be, indexed
+        self._seek_index = None
+
+        # an unsaved index is built in the background, until it is ready seeks are time based
+        if config.USE_SEEK_INDEX:
+            self._seek_index = get_seek_index_store().find_index(self._file_name)
+            if self._seek_index is None:
+                stream = get_probe_cache().get_video_stream(self._file_name)
+                self.seek_index_built.connect(self.set_seek_index)
+                get_seek_index_store().build_in_background(self._file_name,
+                                                           stream.get("time_base", "1/1"),
+                                                           self.emit_seek_index)
+
+        ## store of the decoded frames, used once built, or None if frames are always decoded
+        self._raw_store = get_raw_frame_stores().get_store(self._file_name,
+                                                           self._video_data,
+                                                           VideoSource.PIX_FMT[0])
+
+        ## the file decoded for display, an all intra frame proxy or the video
+        self._display_file = self._file_name
+
+        ## the size the proxy's frames are resized to, None if they are the video's size
+        self._display_scale = None
+
+        ## persistent decoder serving frames for display
+        self._decoder = self.make_decoder()
+
+        ## persistent decoder serving a region of the frames for display
+        self._region_decoder = None
+
+    def make_decoder(self, rect=None):
+        """
+        make a new decoder for the video, for use by another thread
+            Args:
+                rect (QRect): if not None the decoder outputs only this region
+            Returns:
+                (DecoderSession) the decoder
+        """
+        crop = None
+        if rect is not None:
+            rect = self.clip_rect(rect)
+            crop = (rect.x(), rect.y(), rect.width(), rect.height())
+
+        if self._display_file != self._file_name:
+            return DecoderSession(self._display_file,
+                                  self._video_data,
+                                  VideoSource.PIX_FMT[0],
+                                  crop,
+                                  None,
+                                  self._display_scale)
+
+        return DecoderSession(self._file_name,
+                              self._video_data,
+                              VideoSource.PIX_FMT[0],
+                              crop,
+                              self.get_seek_index())
+
+    def get_region_decoder(self, rect, decoder=None):
+        """
+        get a decoder for a region, reusing the one provided if its region matches
+            Args:
+                rect (QRect): the region
+                decoder (DecoderSession): an existing region decoder or None
+            Returns:
+                (DecoderSession) the decoder
+        """
+        rect = self.clip_rect(rect)
+        crop = (rect.x(), rect.y(), rect.width(), rect.height())
+
+        if decoder is not None:
+            if decoder.get_crop() == crop and decoder.get_file_name() == self._display_file:
+                return decoder
+            decoder.close()
+
+        return self.make_decoder(rect)
+
+    def clip_rect(self, rect):
+        """
+        clip a rectangle to the frame
+            Args:
+                rect (QRect): the rectangle
+            Returns:
+                (QRect) the part of the rectangle inside the frame
+        """
+        frame_rect = qc.QRect(0,
+                              0,
+                              self._video_data.get_width(),
+                              self._video_data.get_height())
+
+        return rect.intersected(frame_rect)
+
+    def get_raw_frame(self, frame):
+        """
+        get a frame from the raw frame store, without decoding or copying
+            Args:
+                frame (int): the frame number
+            Returns:
+                (np.array uint8) a view of the store, or None if there is no
+                                 built store holding the frame
+        """
+        if self._raw_store is None or not self._raw_store.open():
+            return None
+
+        return self._raw_store.get_frame(frame)
+
+    def get_cached_frame(self, frame, pix_fmt, decode):
+        """
+        get the raw bytes of a frame from the raw frame store, if it holds the
+        frame, else from the shared cache, decoding on a miss
+            Args:
+                frame (int): the frame number
+                pix_fmt (str): the ffmpeg pixel format
+                decode (function): called with the frame number on a cache miss
+            Returns:
+                (bytes) the frame, or None if it could not be decoded
+        """
+        if pix_fmt == VideoSource.PIX_FMT[0]:
+            in_bytes = self.get_raw_frame(frame)
+            if in_bytes is not None:
+                return in_bytes
+
+        return super().get_cached_frame(frame, pix_fmt, decode)
+
     def get_pixmap(self, frame):
         """
-        get the pixmap for the frame
+        get the pixmap for the frame, frames are taken from the shared cache
+        if possible, else sequential frames are read from a single ffmpeg process
+            Args:
+                frame (int): the frame number
+            Returns:
+                (QPixmap): the pixmap, or None if the frame cannot be read
+        """
+        in_bytes = self.get_cached_frame(frame,
+                                         VideoSource.PIX_FMT[0],
+                                         self._decoder.read_frame)
+        if in_bytes is None:
+            return None
+
+        return qg.QPixmap.fromImage(self.make_image(in_bytes))
+
+    def get_region_pixmap(self, frame, rect):
+        """
+        get the pixmap for a region of the frame, only the region is decoded
+            Args:
+                frame (int): the frame number
+                rect (QRect): the region
+            Returns:
+                (QPixmap): the pixmap, or None if the frame cannot be read
+        """
+        self._region_decoder = self.get_region_decoder(rect, self._region_decoder)
+        image = self.get_region_image(frame, rect, self._region_decoder)
+        if image is None:
+            return None
+
+        return qg.QPixmap.fromImage(image)
+
+    def get_region_image(self, frame, rect, decoder):
+        """
+        get the image of a region of the frame, if the whole frame is in the raw
+        frame store or the shared cache the region is sliced from it, else it is
+        read from a cropped decoder
+            Args:
+                frame (int): the frame number
+                rect (QRect): the region
+                decoder (DecoderSession): a decoder cropped to the region
+            Returns:
+                (QImage): the image, or None if the frame cannot be read
+        """
+        rect = self.clip_rect(rect)
+        if rect.isEmpty():
+            return None
+
+        in_bytes = self.get_raw_frame(frame)
+        if in_bytes is None:
+            key = FrameCache.make_key(self._display_file, frame, VideoSource.PIX_FMT[0])
+            in_bytes = self.get_frame_cache().get(key)
+
+        if in_bytes is not None:
+            return self.make_region_image(self.slice_region(in_bytes, rect), rect)
+
+        in_bytes = self.get_cached_frame(frame,
+                                         VideoSource.region_pix_fmt(rect),
+                                         decoder.read_frame)
+        if in_bytes is None:
+            return None
+
+        return self.make_region_image(in_bytes, rect)
+
+    @staticmethod
+    def region_pix_fmt(rect):
+        """
+        make the pixel format name used to key region frames in the shared cache
+            Args:
+                rect (QRect): the region
+            Returns:
+                (str)
+        """
+        return f"{VideoSource.PIX_FMT[0]}:{rect.x()},{rect.y()},{rect.width()},{rect.height()}"
+
+    def slice_region(self, image_bytes, rect):
+        """
+        cut a region from the bytes of a whole frame, only the region is copied
             Args:
-                frame (int): the time in user fps
+                image_bytes (bytes): the whole frame
+                rect (QRect): the region, inside the frame
             Returns:
-                (QPixmap, float): the qixmap and the associated time
+                (bytes) the region
         """
-        time = self._video_data.frame_to_internal_time(frame)
-        return self.get_pixmap_at(time)
+        bytes_per_pixel = VideoSource.PIX_FMT[1]
+        frame = np.frombuffer(image_bytes, dtype=np.uint8)
+        frame = frame.reshape(self._video_data.get_height(),
+                              self._video_data.get_bytes_per_line())
+
+        region = frame[rect.y():rect.y()+rect.height(),
+                       rect.x()*bytes_per_pixel:(rect.x()+rect.width())*bytes_per_pixel]
+
+        return region.tobytes()
+
+    def make_region_image(self, image_bytes, rect):
+        """
+        convert the bytes of a region to QImage
+            Args:
+                image_bytes (bytes): the region
+                rect (QRect): the region
+            Returns:
+                (QImage): the image
+        """
+        return qg.QImage(image_bytes,
+                         rect.width(),
+                         rect.height(),
+                         rect.width()*VideoSource.PIX_FMT[1],
+                         qg.QImage.Format_RGB888)
 
     def get_pixmap_at(self, time):
         """
@@ -115,6 +372,68 @@ class VideoSource(FfmpegBase):
 
         return None
 
+    def stream_frames(self, frames):
+        """
+        decode a set of frames in one sequential pass of a single ffmpeg process,
+        which starts at the first frame and stops after the last
+            Args:
+                frames ([int]): the frame numbers
+            Yields:
+                (int, QImage) the frame number and image, in frame order
+        """
+        count = self._video_data.get_frame_count()
+        frames = sorted({x for x in frames if 0 <= x < count})
+        if len(frames) == 0:
+            return
+
+        if self.get_raw_frame(frames[0]) is not None:
+            for frame in frames:
+                in_bytes = self.get_raw_frame(frame)
+                if in_bytes is None:
+                    return
+                yield frame, self.make_image(in_bytes).copy()
+            return
+
+        # after seeking the frame numbers in the select filter start from zero
+        first = frames[0]
+        seek_index = self.get_seek_index()
+        if seek_index is not None and frames[-1] < seek_index.get_frame_count():
+            first, time = seek_index.get_seek(first)
+            stream = ffmpeg.input(self._file_name, ss=time, noaccurate_seek=None)
+        else:
+            time = self._video_data.frame_to_internal_time(first)
+            stream = ffmpeg.input(self._file_name, ss=time)
+
+        expression = make_select_expression([x - first for x in frames])
+        args = (stream
+                .filter('select', expression)
+                .output('pipe:', format='rawvideo', pix_fmt=VideoSource.PIX_FMT[0], vsync='0')
+                .compile())
+
+        frame_size = self._video_data.get_frame_size()
+
+        # make path for ffmpeg's logs
+        error_path = pathlib.Path(os.devnull)
+        if config.USE_FFMPEG_LOG:
+            error_path = pathlib.Path("ffmpeg_log.txt")
+
+        with error_path.open('a') as f_err:
+            with subprocess.Popen(args,
+                                  stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.PIPE,
+                                  stderr=f_err) as process:
+                try:
+                    for frame in frames:
+                        in_bytes = process.stdout.read(frame_size)
+                        if len(in_bytes) < frame_size:
+                            break
+
+                        # copy so the image owns its data and can be passed between threads
+                        yield frame, self.make_image(in_bytes).copy()
+                finally:
+                    process.stdout.close()
+                    process.kill()
+
     def make_image(self, image_bytes):
         """
         convert bytes to QPixmap
@@ -136,3 +455,87 @@ class VideoSource(FfmpegBase):
         getter for the duration of video, user defined, in seconds
         """
         return self._video_data
+
+    def set_proxy(self, proxy_file):
+        """
+        display frames decoded from an all intra frame proxy of the video, the
+        proxy's frames are resized to the video's size so positions in them
+        are those of the video. Report images are still made from the video.
+            Args:
+                proxy_file (str): the proxy, or None to display the video
+            Throws:
+                (ffmpeg.Error): can't probe the proxy
+                (StopIteration): no video stream in the proxy
+        """
+        scale = None
+        display_file = self._file_name
+        if proxy_file is not None:
+            stream = get_probe_cache().get_video_stream(str(proxy_file))
+            size = (self._video_data.get_width(), self._video_data.get_height())
+            if (stream["width"], stream["height"]) != size:
+                scale = size
+            display_file = str(proxy_file)
+
+        self._display_file = display_file
+        self._display_scale = scale
+
+        self._decoder.close()
+        self._decoder = self.make_decoder()
+        if self._region_decoder is not None:
+            self._region_decoder.close()
+            self._region_decoder = None
+
+    def get_display_name(self):
+        """
+        getter for the name of the file decoded for display
+            Returns:
+                (str) the proxy if one is in use, else the video
+        """
+        return self._display_file
+
+    def get_seek_index(self):
+        """
+        getter for the index of the frames, an index built in the background is
+        found in the store even if set_seek_index has not yet been run
+            Returns:
+                (SeekIndex) or None if the video has not been indexed
+        """
+        if self._seek_index is None and config.USE_SEEK_INDEX:
+            return get_seek_index_store().find_index(self._file_name)
+
+        return self._seek_index
+
+    def emit_seek_index(self, seek_index):
+        """
+        pass an index built in a background thread to set_seek_index, in the
+        thread of the object
+            Args:
+                seek_index (SeekIndex): the index, or None if the video can't be indexed
+        """
+        try:
+            self.seek_index_built.emit(seek_index)
+        except RuntimeError:
+            # the object was deleted while the index was built
+            pass
+
+    @qc.pyqtSlot(object)
+    def set_seek_index(self, seek_index):
+        """
+        use an index for seeks from now on, the proxy video is not indexed
+            Args:
+                seek_index (SeekIndex): the index, or None if the video can't be indexed
+        """
+        self._seek_index = seek_index
+        if self._display_file == self._file_name:
+            self._decoder.set_seek_index(seek_index)
+            if self._region_decoder is not None:
+                self._region_decoder.set_seek_index(seek_index)
+
+    def close(self):
+        """
+        stop the decoders' ffmpeg processes
+        """
+        self._decoder.close()
+        if self._region_decoder is not None:
+            self._region_decoder.close()
+            self._region_decoder = None
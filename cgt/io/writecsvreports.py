@@ -18,10 +18,14 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 '''
 import pathlib
 import csv
+import os
 
-from cgt.util.scenegraphitems import (rect_to_tuple,
-                                      g_point_to_tuple,
-                                      g_line_to_tuple)
+import numpy as np
+
+from cgt.model.growthratefitter import project_growth_rates
+from cgt.util.markers import MarkerTypes
+from cgt.util.scenegraphitems import rect_to_tuple
+from cgt.util import config
 
 def save_csv_project(project):
     """
@@ -75,12 +79,33 @@ def save_csv_video_statistics(project, stats):
         writer = csv.writer(fout, delimiter=',', lineterminator='\n')
         headers = ["Mean", "Std. Dev."]+[str(x) for x in stats.get_bins()[1:]]
         writer.writerow(headers)
-        for item in stats.get_frames():
-            array = []
-            array.append(item.mean)
-            array.append(item.std_deviation)
-            array.extend(item.bin_counts)
-            writer.writerow(array)
+        for mean, std_dev, counts in zip(stats.get_means().tolist(),
+                                         stats.get_std_devs().tolist(),
+                                         stats.get_bin_counts().tolist()):
+            writer.writerow([mean, std_dev] + counts)
+
+    save_binary_video_statistics(path.joinpath(csv_outfile_name).with_suffix(".npy"), stats)
+
+def save_binary_video_statistics(file_path, stats):
+    """
+    save the video statistics as a numpy structured array, a sidecar to the csv
+    file that can be memory mapped on reading. The array is written to a temporary
+    file and moved into place, so statistics mapped from an earlier version stay valid.
+        Args:
+            file_path (pathlib.Path): the output file
+            stats (VideoIntensityStats)
+        Throws:
+            IOException if file cannot be opened
+    """
+    tmp_path = file_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as fout:
+        np.save(fout, stats.to_records())
+
+    try:
+        os.replace(tmp_path, file_path)
+    except OSError:
+        # the old file is in use (Windows), it is older than the csv so will be ignored
+        tmp_path.unlink()
 
 def save_csv_growth_rates(project):
     """
@@ -93,6 +118,37 @@ def save_csv_growth_rates(project):
     save_csv_regions(project)
     save_csv_lines(project)
     save_csv_points(project)
+    save_csv_fitted_rates(project)
+
+def save_csv_fitted_rates(project):
+    """
+    print the fitted growth rates of all markers to csv file, the ID is that
+    used in the lines and points files
+        Args:
+            project (CGTProject) the project object
+        Throws:
+            IOException if file cannot be opened
+    """
+    if project["frame_rate"] is None or project["resolution"] is None:
+        return
+
+    path = pathlib.Path(project["proj_full_path"])
+    csv_outfile_name = project["prog"] + r"_" + project["proj_name"] + r"_growth_rates.csv"
+
+    rates = project_growth_rates(project["results"],
+                                 float(project["frame_rate"]),
+                                 float(project["resolution"]),
+                                 config.GROWTH_RATE_BOOTSTRAP_SAMPLES,
+                                 config.GROWTH_RATE_CONFIDENCE)
+
+    headers = ["ID", "type", "region", "key_frames", "rate", "std_error",
+               "intercept", "rms_residual", "ci_low", "ci_high"]
+    with open(path.joinpath(csv_outfile_name), 'w') as fout:
+        writer = csv.writer(fout, delimiter=',', lineterminator='\n')
+        writer.writerow(headers)
+
+        for row in zip(*[x.tolist() for x in rates]):
+            writer.writerow([row[0], MarkerTypes(row[1]).name] + list(row[2:]))
 
 def save_csv_info(info):
     '''Creates the csv report file for info.
@@ -149,10 +205,9 @@ def save_csv_points(project):
         writer = csv.writer(fout, delimiter=',', lineterminator='\n')
         writer.writerow(headers)
 
-        for i, points_array in enumerate(results.get_points()):
+        for i, points_array in enumerate(results.get_point_records()):
             for point in points_array:
-                point_data = g_point_to_tuple(point)
-                point_data = [i] + point_data
+                point_data = [i] + point.to_list()
 
                 writer.writerow(point_data)
 
@@ -173,9 +228,8 @@ def save_csv_lines(project):
         writer = csv.writer(fout, delimiter=',', lineterminator='\n')
         writer.writerow(headers)
 
-        for i, line_array in enumerate(results.get_lines()):
+        for i, line_array in enumerate(results.get_line_records()):
             for line in line_array:
-                line_data = g_line_to_tuple(line)
-                line_data = [i] + line_data
+                line_data = [i] + line.to_list()
 
                 writer.writerow(line_data)
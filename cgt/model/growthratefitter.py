@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+## @package growthratefitter
+# fit growth rates, with their uncertainties, to the key frame positions of
+# every marker in a project at once
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = too-many-arguments
+# pylint: disable = too-many-locals
+
+from collections import namedtuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cgt.model.velocitiescalculator import project_displacements
+from cgt.util.markers import MarkerTypes
+from cgt.util import config
+
+## data type for fitted growth rates, each field an array with one entry per
+## marker, the rate is the slope of the least squares line through the
+## distance moved at each key frame against time
+GrowthRates = namedtuple("GrowthRates",
+                         ["marker",
+                          "m_type",
+                          "region",
+                          "key_frames",
+                          "rate",
+                          "std_error",
+                          "intercept",
+                          "rms_residual",
+                          "ci_low",
+                          "ci_high"])
+
+## data type for the distance moved by markers at their key frames, each field
+## an array with one entry per key frame, sorted by marker then time
+KeyFramePositions = namedtuple("KeyFramePositions", ["marker", "region", "time", "distance"])
+
+def key_frame_positions(displacements, fps):
+    """
+    find the distance each marker has moved, from its first key frame, at each
+    of its key frames
+        Args:
+            displacements (MarkerDisplacements): the displacements of the markers
+            fps (float): the number of frames per second
+        Returns:
+            (KeyFramePositions)
+    """
+    markers = displacements.marker
+    first = np.ones(len(markers), dtype=bool)
+    first[1:] = markers[1:] != markers[:-1]
+
+    # cumulative sum of the lengths restarting for each marker
+    totals = np.cumsum(displacements.length)
+    offsets = (totals - displacements.length)[first]
+    counts = np.diff(np.append(np.flatnonzero(first), len(markers)))
+    distances = totals - np.repeat(offsets, counts)
+
+    marker = np.concatenate((markers[first], markers))
+    region = np.concatenate((displacements.region[first], displacements.region))
+    time = np.concatenate((displacements.start[first], displacements.end))/fps
+    distance = np.concatenate((np.zeros(np.count_nonzero(first)), distances))
+
+    order = np.lexsort((time, marker))
+
+    return KeyFramePositions(marker[order], region[order], time[order], distance[order])
+
+def weighted_fit(groups, n_groups, time, distance, weights):
+    """
+    fit a straight line to the distance against time of each group of key frames
+        Args:
+            groups (np.array int): the group index, 0 to n_groups-1, of each key frame
+            n_groups (int): the number of groups
+            time (np.array float): the time of each key frame
+            distance (np.array float): the distance of each key frame, the last
+                                       axis runs over the key frames
+            weights (np.array float): the weight of each key frame
+        Returns:
+            (slope, intercept) arrays, with the leading axes of distance
+    """
+    def group_sum(values):
+        if values.ndim == 1:
+            return np.bincount(groups, weights=values, minlength=n_groups)
+
+        # one bincount over all rows, offsetting the groups of each row
+        rows = values.shape[0]
+        index = groups + n_groups*np.arange(rows)[:, np.newaxis]
+        sums = np.bincount(index.ravel(), weights=values.ravel(), minlength=rows*n_groups)
+        return sums.reshape(rows, n_groups)
+
+    sum_w = group_sum(weights)
+    sum_wt = group_sum(weights*time)
+    sum_wtt = group_sum(weights*time*time)
+    sum_wy = group_sum(weights*distance)
+    sum_wty = group_sum(weights*time*distance)
+
+    denominator = sum_w*sum_wtt - sum_wt*sum_wt
+    slope = (sum_w*sum_wty - sum_wt*sum_wy)/denominator
+    intercept = (sum_wy - slope*sum_wt)/sum_w
+
+    return slope, intercept
+
+def bootstrap_slopes(groups, n_groups, time, fitted, residuals, weights, samples, seed):
+    """
+    find the slopes of fits to resampled data, the residuals of each group
+    are resampled with replacement and added to the fitted line, run in a
+    worker process for large numbers of samples
+        Args:
+            groups (np.array int): the group index of each key frame, groups contiguous
+            n_groups (int): the number of groups
+            time (np.array float): the time of each key frame
+            fitted (np.array float): the fitted distance of each key frame
+            residuals (np.array float): the residual of each key frame
+            weights (np.array float): the weight of each key frame
+            samples (int): the number of resamplings
+            seed (np.random.SeedSequence): the seed of the random numbers
+        Returns:
+            (np.array float) the slopes, shape (samples, n_groups)
+    """
+    generator = np.random.default_rng(seed)
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    slopes = np.empty((samples, n_groups))
+    chunk = max(1, config.GROWTH_RATE_BOOTSTRAP_CHUNK//max(len(groups), 1))
+    for first in range(0, samples, chunk):
+        number = min(chunk, samples - first)
+        picks = starts[groups] + (generator.random((number, len(groups)))*counts[groups]).astype(int)
+        distance = fitted + residuals[picks]
+        slopes[first:first+number] = weighted_fit(groups, n_groups, time, distance, weights)[0]
+
+    return slopes
+
+def bootstrap_intervals(groups, n_groups, time, fitted, residuals, weights, samples, confidence):
+    """
+    find bootstrap confidence intervals of the slopes, for large numbers of
+    samples the resampling is shared across a pool of processes
+        Args:
+            groups (np.array int): the group index of each key frame, groups contiguous
+            n_groups (int): the number of groups
+            time (np.array float): the time of each key frame
+            fitted (np.array float): the fitted distance of each key frame
+            residuals (np.array float): the residual of each key frame
+            weights (np.array float): the weight of each key frame
+            samples (int): the number of resamplings
+            confidence (float): the confidence level of the intervals
+        Returns:
+            (np.array float, np.array float) the lower and upper limits
+    """
+    workers = min(config.GROWTH_RATE_WORKERS, samples//config.GROWTH_RATE_MIN_WORKER_SAMPLES)
+    seeds = np.random.SeedSequence(config.GROWTH_RATE_BOOTSTRAP_SEED).spawn(max(workers, 1))
+    args = (groups, n_groups, time, fitted, residuals, weights)
+
+    if workers < 2:
+        slopes = bootstrap_slopes(*args, samples, seeds[0])
+    else:
+        counts = [len(x) for x in np.array_split(np.arange(samples), workers)]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(bootstrap_slopes, *args, count, seed)
+                       for count, seed in zip(counts, seeds)]
+            slopes = np.concatenate([future.result() for future in futures])
+
+    tail = 50.0*(1.0 - confidence)
+    low, high = np.percentile(slopes, [tail, 100.0 - tail], axis=0)
+
+    return low, high
+
+def fit_growth_rates(displacements, m_type, fps, samples=0, confidence=0.95):
+    """
+    fit growth rates to the displacements of a set of markers, by weighted
+    least squares with equal weights for the key frames
+        Args:
+            displacements (MarkerDisplacements): the displacements of the markers
+            m_type (MarkerTypes): the type of the markers
+            fps (float): the number of frames per second
+            samples (int): the number of bootstrap samples, 0 for no confidence intervals
+            confidence (float): the confidence level of the intervals
+        Returns:
+            (GrowthRates) one entry per marker with displacements, sorted by marker,
+                          the standard error and interval are NaN for markers
+                          with two or fewer key frames
+    """
+    positions = key_frame_positions(displacements, fps)
+    markers, first, groups, counts = np.unique(positions.marker,
+                                               return_index=True,
+                                               return_inverse=True,
+                                               return_counts=True)
+    n_groups = len(markers)
+    weights = np.ones(len(groups))
+
+    slope, intercept = weighted_fit(groups, n_groups, positions.time, positions.distance, weights)
+
+    fitted = intercept[groups] + slope[groups]*positions.time
+    residuals = positions.distance - fitted
+    sum_w = np.bincount(groups, weights=weights, minlength=n_groups)
+    sum_wt = np.bincount(groups, weights=weights*positions.time, minlength=n_groups)
+    sum_wtt = np.bincount(groups, weights=weights*positions.time**2, minlength=n_groups)
+    rss = np.bincount(groups, weights=weights*residuals**2, minlength=n_groups)
+
+    # two key frames fit exactly, so give no estimate of the error
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.where(counts > 2, rss/(counts - 2), np.nan)
+        std_error = np.sqrt(variance/(sum_wtt - sum_wt*sum_wt/sum_w))
+
+    ci_low = np.full(n_groups, np.nan)
+    ci_high = np.full(n_groups, np.nan)
+    if samples > 0 and n_groups > 0:
+        ci_low, ci_high = bootstrap_intervals(groups,
+                                              n_groups,
+                                              positions.time,
+                                              fitted,
+                                              residuals,
+                                              weights,
+                                              samples,
+                                              confidence)
+
+        # the residuals of an exact fit are zero, so resampling gives no interval
+        ci_low = np.where(counts > 2, ci_low, np.nan)
+        ci_high = np.where(counts > 2, ci_high, np.nan)
+
+    return GrowthRates(markers,
+                       np.full(n_groups, int(m_type)),
+                       positions.region[first],
+                       counts,
+                       slope,
+                       std_error,
+                       intercept,
+                       np.sqrt(rss/sum_w),
+                       ci_low,
+                       ci_high)
+
+def project_growth_rates(results, fps, scale, samples=0, confidence=0.95):
+    """
+    fit the growth rates of every marker in a project, the marker index is its
+    index in the lines, or points, of the results store
+        Args:
+            results (VideoAnalysisResultsStore): the results
+            fps (float): the number of frames per second
+            scale (float): the size of a pixel
+            samples (int): the number of bootstrap samples, 0 for no confidence intervals
+            confidence (float): the confidence level of the intervals
+        Returns:
+            (GrowthRates) the lines followed by the points
+    """
+    lines, points = project_displacements(results, fps, scale)
+    line_rates = fit_growth_rates(lines, MarkerTypes.LINE, fps, samples, confidence)
+    point_rates = fit_growth_rates(points, MarkerTypes.POINT, fps, samples, confidence)
+
+    return join_rates(line_rates, point_rates)
+
+def calculator_growth_rates(calculator, fps, samples=0, confidence=0.95):
+    """
+    fit the growth rates of the markers in a velocities calculator, which must
+    have processed its data, the marker index is the index of the marker's
+    displacements in the calculator
+        Args:
+            calculator (VelocitiesCalculator): the calculator
+            fps (float): the number of frames per second
+            samples (int): the number of bootstrap samples, 0 for no confidence intervals
+            confidence (float): the confidence level of the intervals
+        Returns:
+            (GrowthRates) the lines followed by the points
+    """
+    line_rates = fit_growth_rates(calculator.get_line_table(),
+                                  MarkerTypes.LINE,
+                                  fps,
+                                  samples,
+                                  confidence)
+    point_rates = fit_growth_rates(calculator.get_point_table(),
+                                   MarkerTypes.POINT,
+                                   fps,
+                                   samples,
+                                   confidence)
+
+    return join_rates(line_rates, point_rates)
+
+def join_rates(first, second):
+    """
+    join two sets of growth rates
+        Args:
+            first (GrowthRates): the first rates
+            second (GrowthRates): the second rates
+        Returns:
+            (GrowthRates)
+    """
+    return GrowthRates(*[np.concatenate(x) for x in zip(first, second)])
+
+def select_region(rates, region):
+    """
+    select the growth rates of the markers in one region
+        Args:
+            rates (GrowthRates): the growth rates
+            region (int): the region index
+        Returns:
+            (GrowthRates)
+    """
+    mask = rates.region == region
+    return GrowthRates(*[x[mask] for x in rates])
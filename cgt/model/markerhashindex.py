@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+## @package markerhashindex
+# an index from marker hash codes to their locations in the results store
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+
+class MarkerHashIndex():
+    """
+    an index from the hash codes of markers to their location (marker list index,
+    position in list) in a list of marker lists. The hash code of each stored item
+    is computed once and cached, so the index can be renumbered without rehashing.
+    Lookups are O(1), but as locations are list indices inserting or removing a
+    list costs one update for every item in the lists after it.
+    """
+
+    def __init__(self, hash_function):
+        """
+        initalize the object
+            Args:
+                hash_function (function): makes the hash code of an item
+        """
+        ## the function making hash codes
+        self._hash_function = hash_function
+
+        ## map hash code => (marker list index, position in list)
+        self._locations = {}
+
+        ## map stored item => hash code
+        self._item_hashes = {}
+
+    def get_hash(self, item):
+        """
+        get the hash code of an item, from the cache if the item is stored
+            Args:
+                item (QGraphicsItem): the item
+            Returns:
+                (int) the hash code
+        """
+        hash_code = self._item_hashes.get(item)
+        if hash_code is None:
+            hash_code = self._hash_function(item)
+
+        return hash_code
+
+    def find(self, hash_code):
+        """
+        find the location of a marker
+            Args:
+                hash_code (int): the hash code of the marker
+            Returns:
+                (int, int) the marker list index and position in list, or None
+        """
+        return self._locations.get(hash_code)
+
+    def find_list(self, hash_code):
+        """
+        find the list holding a marker
+            Args:
+                hash_code (int): the hash code of the marker
+            Returns:
+                (int) the marker list index, or None
+        """
+        location = self._locations.get(hash_code)
+        if location is None:
+            return None
+
+        return location[0]
+
+    def index_list(self, markers, list_index):
+        """
+        add, or update, the locations of all items in a marker list
+            Args:
+                markers ([QGraphicsItem]): the marker list
+                list_index (int): the index of the list
+        """
+        for position, item in enumerate(markers):
+            hash_code = self._item_hashes.get(item)
+            if hash_code is None:
+                hash_code = self._hash_function(item)
+                self._item_hashes[item] = hash_code
+
+            self._locations[hash_code] = (list_index, position)
+
+    def remove_items(self, items):
+        """
+        remove items from the index
+            Args:
+                items ([QGraphicsItem]): the items
+        """
+        for item in items:
+            hash_code = self._item_hashes.pop(item, None)
+            if hash_code is not None:
+                self._locations.pop(hash_code, None)
+
+    def renumber(self, marker_lists, start):
+        """
+        update the locations of the lists from start, after a list has been
+        inserted or removed, cached hash codes are used. The cost is one
+        dictionary update per item in the lists from start, O(markers after start).
+            Args:
+                marker_lists ([[QGraphicsItem]]): all the marker lists
+                start (int): the index of the first list to update
+        """
+        for list_index in range(start, len(marker_lists)):
+            self.index_list(marker_lists[list_index], list_index)
+
+    def clear(self):
+        """
+        remove all entries
+        """
+        self._locations.clear()
+        self._item_hashes.clear()
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+## @package markertable
+# compact records of the markers, the canonical form of the markers in the
+# results store, graphics items are only made when needed for display
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+# pylint: disable = too-many-arguments
+
+import struct
+
+import PyQt5.QtGui as qg
+
+from cgt.util.markers import (ItemDataTypes,
+                              MarkerTypes,
+                              get_marker_type,
+                              get_parent_hash,
+                              get_frame,
+                              get_region,
+                              get_point_of_point,
+                              make_digest)
+from cgt.util.scenegraphitems import (list_to_g_line,
+                                      list_to_g_point)
+
+class MarkerRecord():
+    """
+    the data of one key frame of a marker. Lines have coordinates
+    (x1, y1, x2, y2) and points have the centre of the cross (x, y).
+    """
+    __slots__ = ("m_type", "coords", "pos", "frame", "region", "parent", "hash_code",
+                 "_digest", "_item")
+
+    def __init__(self, m_type, coords, pos, frame, region, parent=None, item=None):
+        """
+        initalize the object
+            Args:
+                m_type (MarkerTypes): line or point
+                coords (tuple): the line end points, or the centre of the cross
+                pos (tuple): the position (x, y) of the marker
+                frame (int): the frame number
+                region (int): the index of the region
+                parent: the hash code of the parent marker, 'p' if progenitor
+                item (QGraphicsItem): the graphics item if one exists
+        """
+        ## the type of the marker
+        self.m_type = m_type
+
+        ## the line end points (x1, y1, x2, y2) or cross centre (x, y)
+        self.coords = tuple(coords)
+
+        ## the position (x, y)
+        self.pos = tuple(pos)
+
+        ## the frame number
+        self.frame = frame
+
+        ## the index of the region
+        self.region = region
+
+        ## the hash code of the parent, 'p' if progenitor
+        self.parent = parent
+
+        ## the hash code, matching that of the equivalent graphics item
+        self.hash_code = make_record_hash(m_type, self.coords, self.pos, frame)
+
+        ## the content digest, made on demand
+        self._digest = None
+
+        ## the graphics item, made on demand
+        self._item = item
+
+    def get_hash(self):
+        """
+        getter for the hash code
+            Returns:
+                (int) the hash code
+        """
+        return self.hash_code
+
+    def get_digest(self):
+        """
+        get the content digest of the type, coordinates, position and frame,
+        unlike the hash code this is the same in every session
+            Returns:
+                (bytes) the digest
+        """
+        if self._digest is None:
+            values = self.coords + self.pos
+            digest = make_digest()
+            digest.update(struct.pack(f"<q{len(values)}dq", int(self.m_type), *values, self.frame))
+            self._digest = digest.digest()
+
+        return self._digest
+
+    def has_item(self):
+        """
+        test if the graphics item has been made
+            Returns:
+                True if the item exists else False
+        """
+        return self._item is not None
+
+    def get_item(self, pen=None):
+        """
+        get the graphics item, making it if it does not exist
+            Args:
+                pen (QPen): the pen used if the item is made
+            Returns:
+                (QGraphicsItem) the item
+        """
+        if self._item is None:
+            if pen is None:
+                pen = qg.QPen()
+
+            row = [0] + self.to_list()
+            if self.m_type == MarkerTypes.LINE:
+                self._item = list_to_g_line(row, pen)
+            else:
+                self._item = list_to_g_point(row, pen)
+
+            self._item.setData(ItemDataTypes.PARENT_HASH, self.parent)
+
+        return self._item
+
+    def set_parent(self, parent):
+        """
+        set the parent hash code, of the record and the item
+            Args:
+                parent: the hash code of the parent, 'p' if progenitor
+        """
+        self.parent = parent
+        if self._item is not None:
+            self._item.setData(ItemDataTypes.PARENT_HASH, parent)
+
+    def set_region(self, region):
+        """
+        set the region index, of the record and the item
+            Args:
+                region (int): the index of the region
+        """
+        self.region = region
+        if self._item is not None:
+            self._item.setData(ItemDataTypes.REGION_INDEX, region)
+
+    def to_list(self):
+        """
+        the data in the order used by the csv files
+            Returns:
+                [x1, y1, x2, y2, px, py, frame, region] for lines
+                [x, y, px, py, frame, region] for points
+        """
+        return list(self.coords) + list(self.pos) + [self.frame, self.region]
+
+def make_record_hash(m_type, coords, pos, frame):
+    """
+    make the hash code of a record, equal to that of the graphics item
+        Args:
+            m_type (MarkerTypes): line or point
+            coords (tuple): the line end points, or the centre of the cross
+            pos (tuple): the position (x, y)
+            frame (int): the frame number
+        Returns:
+            (int) the hash code
+    """
+    if m_type == MarkerTypes.LINE:
+        # as hash_qlinef
+        shape_hash = hash((coords[0], coords[2], coords[1], coords[3]))
+    else:
+        shape_hash = hash(coords)
+
+    return hash((shape_hash, hash(pos), hash(frame)))
+
+def record_from_item(item):
+    """
+    make a record of a graphics item, which is held by the record
+        Args:
+            item (QGraphicsItem): a line or point marker
+        Returns:
+            (MarkerRecord)
+    """
+    m_type = get_marker_type(item)
+    if m_type == MarkerTypes.LINE:
+        line = item.line()
+        coords = (line.x1(), line.y1(), line.x2(), line.y2())
+    else:
+        centre = get_point_of_point(item)
+        coords = (centre.x(), centre.y())
+
+    pos = (item.pos().x(), item.pos().y())
+
+    return MarkerRecord(m_type,
+                        coords,
+                        pos,
+                        get_frame(item),
+                        get_region(item),
+                        get_parent_hash(item),
+                        item)
+
+def record_from_row(m_type, row):
+    """
+    make a record from a row of a csv file
+        Args:
+            m_type (MarkerTypes): line or point
+            row (list): [ID, x1, y1, x2, y2, px, py, frame, region] for lines
+                        [ID, x, y, px, py, frame, region] for points
+        Returns:
+            (MarkerRecord)
+    """
+    n_coords = 4 if m_type == MarkerTypes.LINE else 2
+    coords = [float(x) for x in row[1:1+n_coords]]
+    pos = [float(x) for x in row[1+n_coords:3+n_coords]]
+
+    return MarkerRecord(m_type,
+                        coords,
+                        pos,
+                        int(row[3+n_coords]),
+                        int(row[4+n_coords]))
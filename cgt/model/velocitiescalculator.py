@@ -23,12 +23,10 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 # pylint: disable = import-error
 
 from collections import namedtuple
-from math import sqrt
 
-from cgt.util.markers import (MarkerTypes,
-                              get_point_of_point,
-                              get_frame)
-from cgt.util.scenegraphitems import perpendicular_dist_to_position
+import numpy as np
+
+from cgt.util.markers import MarkerTypes
 
 class ScreenDisplacement():
     """data type for a single marker displacement"""
@@ -92,6 +90,139 @@ class ScreenDisplacement():
 ## data type for the speed of a marker
 MarkerSpeed = namedtuple("MarkerSpeed", ["ID", "m_type", "speed"])
 
+## data type for the displacements of many markers, each field an array with
+## one entry per displacement, marker is the index of the marker in its list
+MarkerDisplacements = namedtuple("MarkerDisplacements",
+                                 ["marker", "region", "start", "end", "length", "speed"])
+
+def marker_arrays(markers, n_coords):
+    """
+    convert markers to arrays, with one row per key frame
+        Args:
+            markers ([[MarkerRecord]]): the markers
+            n_coords (int): the number of coordinates, 4 for lines 2 for points
+        Returns:
+            (marker index, region, frame, coords, pos) arrays
+    """
+    records = [record for marker in markers for record in marker]
+    n_records = len(records)
+
+    marker_ids = np.repeat(np.arange(len(markers)), [len(marker) for marker in markers])
+    regions = np.fromiter((x.region for x in records), dtype=np.int64, count=n_records)
+    frames = np.fromiter((x.frame for x in records), dtype=np.int64, count=n_records)
+    coords = np.array([x.coords for x in records], dtype=np.float64).reshape(n_records, n_coords)
+    pos = np.array([x.pos for x in records], dtype=np.float64).reshape(n_records, 2)
+
+    return marker_ids, regions, frames, coords, pos
+
+def make_displacements(marker_ids, regions, frames, lengths, fps):
+    """
+    make the displacements between consecutive key frames of each marker
+        Args:
+            marker_ids (np.array int): the marker index of each key frame
+            regions (np.array int): the region of each key frame
+            frames (np.array int): the frame number of each key frame
+            lengths (np.array float): the displacement from each key frame to the next
+            fps (float): the number of frames per second
+        Returns:
+            (MarkerDisplacements)
+    """
+    pairs = marker_ids[1:] == marker_ids[:-1]
+
+    first = frames[:-1][pairs]
+    second = frames[1:][pairs]
+    start = np.minimum(first, second)
+    end = np.maximum(first, second)
+
+    length = lengths[pairs]
+    speed = np.abs(length)*fps/(end - start)
+
+    return MarkerDisplacements(marker_ids[1:][pairs],
+                               regions[1:][pairs],
+                               start,
+                               end,
+                               length,
+                               speed)
+
+def line_displacements(lines, fps, scale):
+    """
+    find the displacements of line markers, each line is measured by the
+    distance of its position along its normal, key frames where the line has
+    zero length, other than the first, are ignored
+        Args:
+            lines ([[MarkerRecord]]): the line markers
+            fps (float): the number of frames per second
+            scale (float): the size of a pixel
+        Returns:
+            (MarkerDisplacements)
+    """
+    marker_ids, regions, frames, coords, pos = marker_arrays(lines, 4)
+
+    del_x = coords[:, 2] - coords[:, 0]
+    del_y = coords[:, 3] - coords[:, 1]
+    line_lengths = np.hypot(del_x, del_y)
+
+    keep = line_lengths > 0.0
+    keep[np.unique(marker_ids, return_index=True)[1]] = True
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distances = np.hypot(pos[:, 0]*del_y/line_lengths, pos[:, 1]*del_x/line_lengths)*scale
+    distances = np.nan_to_num(distances)
+
+    distances = distances[keep]
+
+    return make_displacements(marker_ids[keep],
+                              regions[keep],
+                              frames[keep],
+                              distances[1:] - distances[:-1],
+                              fps)
+
+def point_displacements(points, fps, scale):
+    """
+    find the displacements of point markers
+        Args:
+            points ([[MarkerRecord]]): the point markers
+            fps (float): the number of frames per second
+            scale (float): the size of a pixel
+        Returns:
+            (MarkerDisplacements)
+    """
+    marker_ids, regions, frames, coords, pos = marker_arrays(points, 2)
+
+    centres = (coords + pos)*scale
+    steps = np.hypot(centres[1:, 0] - centres[:-1, 0],
+                     centres[1:, 1] - centres[:-1, 1])
+
+    return make_displacements(marker_ids, regions, frames, steps, fps)
+
+def project_displacements(results, fps, scale):
+    """
+    find the displacements of all the markers in a project, in every region
+        Args:
+            results (VideoAnalysisResultsStore): the results
+            fps (float): the number of frames per second
+            scale (float): the size of a pixel
+        Returns:
+            (MarkerDisplacements, MarkerDisplacements) for lines and points
+    """
+    return (line_displacements(results.get_line_records(), fps, scale),
+            point_displacements(results.get_point_records(), fps, scale))
+
+def average_speeds(displacements):
+    """
+    find the average speed of each marker having displacements
+        Args:
+            displacements (MarkerDisplacements): the displacements
+        Returns:
+            (np.array int, np.array float) the marker indices and average speeds
+    """
+    markers, inverse, counts = np.unique(displacements.marker,
+                                         return_inverse=True,
+                                         return_counts=True)
+    totals = np.bincount(inverse, weights=displacements.speed, minlength=len(markers))
+
+    return markers, totals/counts
+
 class VelocitiesCalculator():
     """
     calculate the velocities of the marker objects
@@ -101,8 +232,8 @@ class VelocitiesCalculator():
         """
             initialize object
                 Args:
-                    lines ([]): array of line markers
-                    points ([]): array of point markers
+                    lines ([[MarkerRecord]]): array of line markers
+                    points ([[MarkerRecord]]): array of point markers
                     fps (float): the number of frames per second
                     scale (float): the size of a pixel
         """
@@ -119,6 +250,12 @@ class VelocitiesCalculator():
         ## the velocities of the points
         self._point_displacements = None
 
+        ## the displacements of the lines as arrays
+        self._line_table = None
+
+        ## the displacements of the points as arrays
+        self._point_table = None
+
     def get_line_displacements(self):
         """
         getter for the array of line displacments
@@ -131,6 +268,22 @@ class VelocitiesCalculator():
         """
         return self._point_displacements
 
+    def get_line_table(self):
+        """
+        getter for the line displacments as arrays
+            Returns:
+                (MarkerDisplacements)
+        """
+        return self._line_table
+
+    def get_point_table(self):
+        """
+        getter for the point displacments as arrays
+            Returns:
+                (MarkerDisplacements)
+        """
+        return self._point_table
+
     def number_markers(self):
         """
         get the number of line and point markers
@@ -151,61 +304,42 @@ class VelocitiesCalculator():
         """
         get and convert the marker lines to displacements
         """
-        self._line_displacements = []
-        for marker in self._lines:
-            previous = marker[0]
-            marker_displacements = []
-
-            for i in range(1, len(marker)):
-                current = marker[i]
-
-                if not (current.line().dx() == 0.0 and current.line().dy() == 0.0):
-                    previous_dist = perpendicular_dist_to_position(previous, self._scale)
-                    current_dist = perpendicular_dist_to_position(current, self._scale)
-                    distance = current_dist - previous_dist
-
-                    start = get_frame(previous)
-                    end = get_frame(current)
-                    # start_frame, end_frame, fps, length
-                    displacement = ScreenDisplacement(start, end, self._frames_per_second, distance)
-                    marker_displacements.append(displacement)
-
-                    previous = current
-
-            if len(marker_displacements) > 0:
-                self._line_displacements.append(marker_displacements)
+        self._line_table = line_displacements(self._lines,
+                                              self._frames_per_second,
+                                              self._scale)
+        self._line_displacements = self.make_screen_displacements(self._line_table)
 
     def make_points(self):
         """
         get and convert the marker points to displacements
         """
-        self._point_displacements = []
-
-        for marker in self._points:
-            previous = marker[0]
-            marker_displacements = []
+        self._point_table = point_displacements(self._points,
+                                                self._frames_per_second,
+                                                self._scale)
+        self._point_displacements = self.make_screen_displacements(self._point_table)
 
-            for i in range(1, len(marker)):
-                current = marker[i]
-                start = get_point_of_point(previous) + previous.pos()
-                end = get_point_of_point(current) + current.pos()
-                seperation =  start - end
-
-                del_x = seperation.x()*self._scale
-                del_y = seperation.y()*self._scale
-
-                length = sqrt(del_x*del_x + del_y*del_y)
-                start = get_frame(previous)
-                end = get_frame(current)
-
-                # start_frame, end_frame, fps, length
-                displacement = ScreenDisplacement(start, end, self._frames_per_second, length)
-                marker_displacements.append(displacement)
+    def make_screen_displacements(self, table):
+        """
+        convert displacement arrays to lists of ScreenDisplacement, one list
+        per marker having displacements
+            Args:
+                table (MarkerDisplacements): the displacements
+            Returns:
+                [[ScreenDisplacement]]
+        """
+        markers = []
+        previous = None
+        for marker, start, end, length in zip(table.marker.tolist(),
+                                              table.start.tolist(),
+                                              table.end.tolist(),
+                                              table.length.tolist()):
+            if marker != previous:
+                markers.append([])
+                previous = marker
 
-                previous = current
+            markers[-1].append(ScreenDisplacement(start, end, self._frames_per_second, length))
 
-            if len(marker_displacements) > 0:
-                self._point_displacements.append(marker_displacements)
+        return markers
 
     def get_average_speeds(self):
         """
@@ -215,22 +349,12 @@ class VelocitiesCalculator():
         """
         averages = []
 
-        for i, marker in enumerate(self._line_displacements):
-            speed = 0.0
-            for item in marker:
-                speed += item.get_speed()
-
-            speed /= float(len(marker))
-
+        _, speeds = average_speeds(self._line_table)
+        for i, speed in enumerate(speeds.tolist()):
             averages.append(MarkerSpeed(i, MarkerTypes.LINE, speed))
 
-        for i, marker in enumerate(self._point_displacements):
-            speed = 0.0
-            for item in marker:
-                speed += item.get_speed()
-
-            speed /= float(len(marker))
-
+        _, speeds = average_speeds(self._point_table)
+        for i, speed in enumerate(speeds.tolist()):
             averages.append(MarkerSpeed(i, MarkerTypes.POINT, speed))
 
         return averages
@@ -24,17 +24,22 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 # pylint: disable = c-extension-no-member
 import enum
 import bisect
+import operator
+import struct
 
 import PyQt5.QtCore as qc
 
-from cgt.util.markers import (ItemDataTypes,
-                              MarkerTypes,
+from cgt.model.markerhashindex import MarkerHashIndex
+from cgt.model.markertable import (MarkerRecord,
+                                   record_from_item)
+from cgt.util.markers import (MarkerTypes,
                               get_parent_hash,
                               hash_graphics_point,
                               hash_graphics_line,
-                              get_frame,
-                              get_region,
-                              get_marker_type)
+                              get_marker_type,
+                              make_digest,
+                              digest_graphics_region,
+                              digest_videointensitystats)
 
 class DataTypes(enum.IntEnum):
     """
@@ -52,6 +57,28 @@ class DataTypes(enum.IntEnum):
     ## a key frame
     KEY_FRAME = 3
 
+def add_to_region_map(region_map, marker):
+    """
+    add a marker to the map of region index => markers
+        Args:
+            region_map (dict): the map
+            marker ([MarkerRecord]): the marker
+    """
+    region_map.setdefault(marker[0].region, []).append(marker)
+
+def remove_from_region_map(region_map, marker):
+    """
+    remove a marker from the map of region index => markers
+        Args:
+            region_map (dict): the map
+            marker ([MarkerRecord]): the marker, identified by identity
+    """
+    markers = region_map.get(marker[0].region, [])
+    for i, stored in enumerate(markers):
+        if stored is marker:
+            del markers[i]
+            return
+
 class VideoAnalysisResultsStore(qc.QObject):
     """
     a storage class that records the results of a video analysis
@@ -68,12 +95,27 @@ class VideoAnalysisResultsStore(qc.QObject):
         """
         super().__init__(parent)
 
-        ## store of lines
+        ## store of lines [[MarkerRecord]]
         self._lines = []
 
-        ## store of points
+        ## store of points [[MarkerRecord]]
         self._points = []
 
+        ## index of line hash codes => location in lines
+        self._line_index = MarkerHashIndex(MarkerRecord.get_hash)
+
+        ## index of point hash codes => location in points
+        self._point_index = MarkerHashIndex(MarkerRecord.get_hash)
+
+        ## the pens used for graphics items made from records
+        self._pens = None
+
+        ## map region index => the line markers in the region
+        self._region_lines = {}
+
+        ## map region index => the point markers in the region
+        self._region_points = {}
+
         ## store of regions
         self._regions = []
 
@@ -83,6 +125,12 @@ class VideoAnalysisResultsStore(qc.QObject):
         ## storage for the intensity statistics of the video
         self._video_statistics = None
 
+        ## cache of the content digest of the video statistics
+        self._statistics_digest = None
+
+        ## cache of region index => content digest of the region, its markers and key frames
+        self._region_digests = {}
+
         ## flag to indicate store has been changed
         self._changed = False
 
@@ -118,7 +166,7 @@ class VideoAnalysisResultsStore(qc.QObject):
         """
         getter for the video statistics
             Returns:
-                [FrameStats]
+                (VideoIntensityStats)
         """
         return self._video_statistics
 
@@ -126,14 +174,70 @@ class VideoAnalysisResultsStore(qc.QObject):
         """
         setter for the video statistics
             Args:
-                video_stats ([FrameStats]) the statistics
+                video_stats (VideoIntensityStats) the statistics
         """
         self._video_statistics = video_stats
+        self._statistics_digest = None
         self.set_changed()
 
+    def invalidate_region_digest(self, index):
+        """
+        mark the content digest of a region as out of date
+            Args:
+                index (int) the region index
+        """
+        self._region_digests.pop(index, None)
+
+    def get_region_digest(self, index):
+        """
+        get the content digest of a region, its markers and key frames, the
+        digest is cached until the region is changed
+            Args:
+                index (int) the region index
+            Returns:
+                (bytes) the digest
+        """
+        if index not in self._region_digests:
+            digest = make_digest()
+            digest.update(digest_graphics_region(self._regions[index]))
+
+            for markers in (self._region_lines.get(index, []),
+                            self._region_points.get(index, [])):
+                digest.update(struct.pack("<q", len(markers)))
+                for marker in markers:
+                    digest.update(struct.pack("<q", len(marker)))
+                    for record in marker:
+                        digest.update(record.get_digest())
+
+            key_frames = self._key_frames.get(index, [])
+            digest.update(struct.pack(f"<q{len(key_frames)}q", len(key_frames), *key_frames))
+
+            self._region_digests[index] = digest.digest()
+
+        return self._region_digests[index]
+
+    def get_digest(self):
+        """
+        get the content digest of the results, combining the digests of the
+        video statistics and the regions, which are only remade if changed
+            Returns:
+                (str) the hexadecimal digest
+        """
+        digest = make_digest()
+
+        if self._video_statistics is not None:
+            if self._statistics_digest is None:
+                self._statistics_digest = digest_videointensitystats(self._video_statistics)
+            digest.update(self._statistics_digest)
+
+        for index in range(len(self._regions)):
+            digest.update(self.get_region_digest(index))
+
+        return digest.hexdigest()
+
     def replace_region(self, region, index):
         """
-        replace an existing region
+        replace an existing region, the markers of the region are unchanged
             Args:
                 rectangle (QRect) the new region
                 index (int) the list index
@@ -141,6 +245,7 @@ class VideoAnalysisResultsStore(qc.QObject):
                 IndexError: pop index out of range
         """
         self._regions[index] = region
+        self.invalidate_region_digest(index)
         self.set_changed(1)
 
     def remove_region(self, index):
@@ -151,17 +256,47 @@ class VideoAnalysisResultsStore(qc.QObject):
             Throws:
                 IndexError: pop index out of range
         """
-        markers = []
-        markers.append(self.get_lines_for_region(index))
-        markers.append(self.get_points_for_region(index))
-        markers = [x for x in markers if x is not None]
+        for marker in list(self._region_lines.get(index, [])):
+            location = self._line_index.find(self._line_index.get_hash(marker[0]))
+            self.delete_line_list(location[0])
+
+        for marker in list(self._region_points.get(index, [])):
+            location = self._point_index.find(self._point_index.get_hash(marker[0]))
+            self.delete_point_list(location[0])
 
         self._regions.pop(index)
-        for marker in markers:
-            self.delete_marker(marker)
+        self._key_frames.pop(index, None)
+        self._region_lines.pop(index, None)
+        self._region_points.pop(index, None)
+
+        for old_index in range(index, len(self._regions)+1):
+            self.invalidate_region_digest(old_index)
+
+        for old_index in range(index+1, len(self._regions)+1):
+            self.renumber_region(old_index, old_index-1)
 
         self.set_changed(1)
 
+    def renumber_region(self, old_index, new_index):
+        """
+        move the markers and key frames of a region to a new region index
+            Args:
+                old_index (int) the current index of the region
+                new_index (int) the new index of the region
+        """
+        for region_map in (self._region_lines, self._region_points):
+            markers = region_map.pop(old_index, None)
+            if markers is None:
+                continue
+
+            region_map[new_index] = markers
+            for marker in markers:
+                for record in marker:
+                    record.set_region(new_index)
+
+        if old_index in self._key_frames:
+            self._key_frames[new_index] = self._key_frames.pop(old_index)
+
     def get_regions(self):
         """
         getter for the regions
@@ -172,20 +307,80 @@ class VideoAnalysisResultsStore(qc.QObject):
 
     def get_lines(self):
         """
-        getter for the lines array
+        getter for the lines array as graphics items, which are made if needed
             Returns:
                 the lines array [[QGraphicsLineItem]]
         """
-        return self._lines
+        return [self.get_marker_items(x) for x in self._lines]
 
     def get_points(self):
+        """
+        getter for the points array as graphics items, which are made if needed
+            Returns:
+                the points array [[QGraphicsPathItem]]
+        """
+        return [self.get_marker_items(x) for x in self._points]
+
+    def get_line_records(self):
+        """
+        getter for the lines array
+            Returns:
+                the lines array [[MarkerRecord]]
+        """
+        return self._lines
+
+    def get_point_records(self):
         """
         getter for the points array
             Returns:
-                the points array [[QGraphicsLineItem]]
+                the points array [[MarkerRecord]]
         """
         return self._points
 
+    def get_line_marker(self, index):
+        """
+        get the graphics items of a line marker, which are made if needed
+            Args:
+                index (int) the array index of the marker
+            Returns:
+                [QGraphicsLineItem]
+        """
+        return self.get_marker_items(self._lines[index])
+
+    def get_point_marker(self, index):
+        """
+        get the graphics items of a point marker, which are made if needed
+            Args:
+                index (int) the array index of the marker
+            Returns:
+                [QGraphicsPathItem]
+        """
+        return self.get_marker_items(self._points[index])
+
+    def get_marker_items(self, marker):
+        """
+        get the graphics items of a marker, which are made if needed
+            Args:
+                marker ([MarkerRecord]) the marker
+            Returns:
+                [QGraphicsItem]
+        """
+        return [self.get_record_item(x) for x in marker]
+
+    def get_record_item(self, record):
+        """
+        get the graphics item of a record, which is made if needed
+            Args:
+                record (MarkerRecord) the record
+            Returns:
+                (QGraphicsItem)
+        """
+        pen = None
+        if self._pens is not None:
+            pen = self._pens.get_display_pen()
+
+        return record.get_item(pen)
+
     def get_key_frames(self, region_index):
         """
         get the list of key frames for a region_index
@@ -207,11 +402,7 @@ class VideoAnalysisResultsStore(qc.QObject):
             Returns:
                 array of key-frames [int]
         """
-        key_frames = []
-        for point in self._points[index]:
-            key_frames.append(get_frame(point))
-
-        return key_frames
+        return [x.frame for x in self._points[index]]
 
     def get_key_frames_for_lines(self, index):
         """
@@ -221,11 +412,7 @@ class VideoAnalysisResultsStore(qc.QObject):
             Returns:
                 array of key-frames [int]
         """
-        key_frames = []
-        for line in self._lines[index]:
-            key_frames.append(get_frame(line))
-
-        return key_frames
+        return [x.frame for x in self._lines[index]]
 
     def add_key_frame(self, region_index, frame_number):
         """
@@ -236,11 +423,13 @@ class VideoAnalysisResultsStore(qc.QObject):
         """
         if region_index not in self._key_frames.keys():
             self._key_frames[region_index] = [frame_number]
+            self.invalidate_region_digest(region_index)
             self.set_changed()
             return
 
         if frame_number not in self._key_frames[region_index]:
             bisect.insort(self._key_frames[region_index], frame_number)
+            self.invalidate_region_digest(region_index)
             self.set_changed()
 
     def add_region(self, region):
@@ -250,6 +439,7 @@ class VideoAnalysisResultsStore(qc.QObject):
                 region (QRect) the region
         """
         self._regions.append(region)
+        self.invalidate_region_digest(len(self._regions)-1)
         self.set_changed(1)
 
     def add_point(self, point):
@@ -257,10 +447,16 @@ class VideoAnalysisResultsStore(qc.QObject):
         add a new point
             Args:
                 point (QGraphicsPathItem) the path item
-        """
-        if get_parent_hash(point) == "p":
-            self._points.append([point])
-            self.add_key_frame(get_region(point), get_frame(point))
+            Returns:
+                the point (QGraphicsPathItem) preceeding the new point, or None
+        """
+        record = record_from_item(point)
+        self.invalidate_region_digest(record.region)
+        if record.parent == "p":
+            self._points.append([record])
+            self._point_index.index_list(self._points[-1], len(self._points)-1)
+            add_to_region_map(self._region_points, self._points[-1])
+            self.add_key_frame(record.region, record.frame)
             self.set_changed()
             return None
 
@@ -268,14 +464,15 @@ class VideoAnalysisResultsStore(qc.QObject):
         if index is None:
             raise LookupError("Graphics path with parent hash not matching any in store")
 
-        self._points[index].append(point)
-        self._points[index].sort(key=get_frame)
-        self.add_key_frame(get_region(point), get_frame(point))
+        self._points[index].append(record)
+        self._points[index].sort(key=operator.attrgetter("frame"))
+        self._point_index.index_list(self._points[index], index)
+        self.add_key_frame(record.region, record.frame)
         self.set_changed()
 
-        tmp = self._points[index].index(point)
+        tmp = self._points[index].index(record)
         if tmp > 0:
-            return self._points[index][tmp-1]
+            return self.get_record_item(self._points[index][tmp-1])
 
         return None
 
@@ -284,10 +481,16 @@ class VideoAnalysisResultsStore(qc.QObject):
         add a new line
             Args:
                 point (QGraphicsLineItem) the line item
-        """
-        if get_parent_hash(line) == "p":
-            self._lines.append([line])
-            self.add_key_frame(get_region(line), get_frame(line))
+            Returns:
+                the line (QGraphicsLineItem) preceeding the new line, or None
+        """
+        record = record_from_item(line)
+        self.invalidate_region_digest(record.region)
+        if record.parent == "p":
+            self._lines.append([record])
+            self._line_index.index_list(self._lines[-1], len(self._lines)-1)
+            add_to_region_map(self._region_lines, self._lines[-1])
+            self.add_key_frame(record.region, record.frame)
             self.set_changed()
             return None
 
@@ -295,28 +498,55 @@ class VideoAnalysisResultsStore(qc.QObject):
         if index is None:
             raise LookupError("Graphics item with parent hash not matching any in store")
 
-        self._lines[index].append(line)
-        self._lines[index].sort(key=get_frame)
-        self.add_key_frame(get_region(line), get_frame(line))
+        self._lines[index].append(record)
+        self._lines[index].sort(key=operator.attrgetter("frame"))
+        self._line_index.index_list(self._lines[index], index)
+        self.add_key_frame(record.region, record.frame)
         self.set_changed()
 
-        tmp = self._lines[index].index(line)
+        tmp = self._lines[index].index(record)
         if tmp > 0:
-            return self._lines[index][tmp-1]
+            return self.get_record_item(self._lines[index][tmp-1])
 
         return None
 
     def insert_line_marker(self, marker):
         """
         add a new marker to the lines with no change results call
+            Args:
+                marker ([QGraphicsLineItem]) the marker
         """
-        self._lines.append(marker)
+        self.insert_line_records([record_from_item(x) for x in marker])
 
     def insert_point_marker(self, marker):
         """
         add a new marker to the points with no change results call
+            Args:
+                marker ([QGraphicsPathItem]) the marker
+        """
+        self.insert_point_records([record_from_item(x) for x in marker])
+
+    def insert_line_records(self, marker):
+        """
+        add a new marker to the lines with no change results call
+            Args:
+                marker ([MarkerRecord]) the marker
+        """
+        self._lines.append(marker)
+        self._line_index.index_list(marker, len(self._lines)-1)
+        self.invalidate_region_digest(marker[0].region)
+        add_to_region_map(self._region_lines, marker)
+
+    def insert_point_records(self, marker):
+        """
+        add a new marker to the points with no change results call
+            Args:
+                marker ([MarkerRecord]) the marker
         """
         self._points.append(marker)
+        self._point_index.index_list(marker, len(self._points)-1)
+        self.invalidate_region_digest(marker[0].region)
+        add_to_region_map(self._region_points, marker)
 
     def line_frame_number_unique(self, line):
         """
@@ -346,13 +576,7 @@ class VideoAnalysisResultsStore(qc.QObject):
             Throws
                 LookupError if there is no match
         """
-        hash_code = get_parent_hash(line)
-        for i, _ in enumerate(self._lines):
-            for line_move in self._lines[i]:
-                if hash_graphics_line(line_move) == hash_code:
-                    return i
-
-        return None
+        return self._line_index.find_list(get_parent_hash(line))
 
     def find_list_for_old_line(self, line):
         """
@@ -364,13 +588,7 @@ class VideoAnalysisResultsStore(qc.QObject):
             Throws
                 LookupError if there is no match
         """
-        target = hash_graphics_line(line)
-        for i, markers in enumerate(self._lines):
-            hashes = [hash_graphics_line(x) for x in markers]
-            if target in hashes:
-                return i
-
-        return None
+        return self._line_index.find_list(hash_graphics_line(line))
 
     def find_list_for_new_point(self, point):
         """
@@ -382,13 +600,7 @@ class VideoAnalysisResultsStore(qc.QObject):
             Throws
                 LookupError if there is no match
         """
-        hash_code = get_parent_hash(point)
-        for i, _ in enumerate(self._points):
-            for point_move in self._points[i]:
-                if hash_graphics_point(point_move) == hash_code:
-                    return i
-
-        return None
+        return self._point_index.find_list(get_parent_hash(point))
 
     def find_list_for_old_point(self, point):
         """
@@ -400,13 +612,7 @@ class VideoAnalysisResultsStore(qc.QObject):
             Throws
                 LookupError if there is no match
         """
-        target = hash_graphics_point(point)
-        for i, markers in enumerate(self._points):
-            hashes = [hash_graphics_point(x) for x in markers]
-            if target in hashes:
-                return i
-
-        return None
+        return self._point_index.find_list(hash_graphics_point(point))
 
     def delete_marker(self, marker):
         """
@@ -418,42 +624,62 @@ class VideoAnalysisResultsStore(qc.QObject):
 
         if m_type == MarkerTypes.LINE:
             index = self.find_list_for_old_line(marker)
-            del self._lines[index]
+            self.delete_line_list(index)
             self.set_changed()
 
         if m_type == MarkerTypes.POINT:
             index = self.find_list_for_old_point(marker)
-            del self._points[index]
+            self.delete_point_list(index)
             self.set_changed()
 
+    def delete_line_list(self, index):
+        """
+        remove a list of lines and update the index
+            Args:
+                index (int) the array index of the list
+        """
+        self._line_index.remove_items(self._lines[index])
+        self.invalidate_region_digest(self._lines[index][0].region)
+        remove_from_region_map(self._region_lines, self._lines[index])
+        del self._lines[index]
+        self._line_index.renumber(self._lines, index)
+
+    def delete_point_list(self, index):
+        """
+        remove a list of points and update the index
+            Args:
+                index (int) the array index of the list
+        """
+        self._point_index.remove_items(self._points[index])
+        self.invalidate_region_digest(self._points[index][0].region)
+        remove_from_region_map(self._region_points, self._points[index])
+        del self._points[index]
+        self._point_index.renumber(self._points, index)
+
     def remove_point(self, hash_code):
         """
         remove the line with the given hash code
             Args:
                 hash_code (int) the hash code of the line to be removed
             Returns:
-                None if line was one frame, else remaining lines
+                None if point was one frame, else remaining points [QGraphicsPathItem]
         """
-        point_index = None
-        marker_index = None
-
-        for i, points in enumerate(self._points):
-            for j, point in enumerate(points):
-                if hash_graphics_point(point) == hash_code:
-                    marker_index = j
-                    point_index = i
-
-        if point_index is None or marker_index is None:
+        location = self._point_index.find(hash_code)
+        if location is None:
             return None
 
+        point_index, marker_index = location
+        self.invalidate_region_digest(self._points[point_index][marker_index].region)
+        self._point_index.remove_items([self._points[point_index][marker_index]])
         del self._points[point_index][marker_index]
         self.set_changed()
 
         if len(self._points[point_index]) == 0:
-            del self._points[point_index]
+            self.delete_point_list(point_index)
             return None
 
-        return self._points[point_index]
+        self._point_index.index_list(self._points[point_index], point_index)
+        return self.get_marker_items(self._points[point_index])
 
     def remove_line(self, hash_code):
         """
@@ -461,28 +687,24 @@ class VideoAnalysisResultsStore(qc.QObject):
             Args:
                 hash_code (int) the hash code of the line to be removed
             Returns:
-                None if line was one frame, else remaining lines
+                None if line was one frame, else remaining lines [QGraphicsLineItem]
         """
-        line_index = None
-        marker_index = None
-
-        for i, lines in enumerate(self._lines):
-            for j, line in enumerate(lines):
-                if hash_graphics_line(line) == hash_code:
-                    marker_index = j
-                    line_index = i
-
-        if line_index is None or marker_index is None:
+        location = self._line_index.find(hash_code)
+        if location is None:
             return None
 
+        line_index, marker_index = location
+        self.invalidate_region_digest(self._lines[line_index][marker_index].region)
+        self._line_index.remove_items([self._lines[line_index][marker_index]])
         del self._lines[line_index][marker_index]
         self.set_changed()
 
         if len(self._lines[line_index]) == 0:
-            del self._lines[line_index]
+            self.delete_line_list(line_index)
             return None
 
-        return self._lines[line_index]
+        self._line_index.index_list(self._lines[line_index], line_index)
+        return self.get_marker_items(self._lines[line_index])
 
     def delete_line(self, line, index):
         """
@@ -492,29 +714,32 @@ class VideoAnalysisResultsStore(qc.QObject):
                 index (int) the array index of the list holding the line
         """
         root_hash = None
+        p_hash = hash_graphics_line(line)
+        record = self._lines[index][self._line_index.find(p_hash)[1]]
 
-        if get_parent_hash(line) == 'p':
+        if record.parent == 'p':
             if len(self._lines[index]) == 1:
-                del self._lines[index]
+                self.delete_line_list(index)
                 return
 
             root_hash = 'p'
         else:
-            root_hash = get_parent_hash(line)
-
-        p_hash = hash_graphics_line(line)
+            root_hash = record.parent
 
-        children = [x for x in self._lines[index] if get_parent_hash(x) == p_hash]
+        children = [x for x in self._lines[index] if x.parent == p_hash]
 
         if len(children) > 0:
             new_p = children.pop(0)
-            new_p.setData(ItemDataTypes.PARENT_HASH, root_hash)
-            p_hash = hash_graphics_line(new_p)
+            new_p.set_parent(root_hash)
+            p_hash = new_p.get_hash()
 
             for child in children:
-                child.setData(ItemDataTypes.PARENT_HASH, p_hash)
+                child.set_parent(p_hash)
 
-        self._lines[index].remove(line)
+        self._lines[index].remove(record)
+        self.invalidate_region_digest(record.region)
+        self._line_index.remove_items([record])
+        self._line_index.index_list(self._lines[index], index)
         self.set_changed()
 
     def delete_point(self, point, index):
@@ -525,68 +750,81 @@ class VideoAnalysisResultsStore(qc.QObject):
                 index (int) the array index of the list holding the point
         """
         root_hash = None
+        p_hash = hash_graphics_point(point)
+        record = self._points[index][self._point_index.find(p_hash)[1]]
 
-        if get_parent_hash(point) == 'p':
+        if record.parent == 'p':
             if len(self._points[index]) == 1:
-                del self._points[index]
+                self.delete_point_list(index)
                 return
 
             root_hash = 'p'
         else:
-            root_hash = get_parent_hash(point)
-
-        p_hash = hash_graphics_point(point)
+            root_hash = record.parent
 
-        children = [x for x in self._points[index] if get_parent_hash(x) == p_hash]
+        children = [x for x in self._points[index] if x.parent == p_hash]
 
         if len(children) > 0:
             new_p = children.pop(0)
-            new_p.setData(ItemDataTypes.PARENT_HASH, root_hash)
-            p_hash = hash_graphics_point(new_p)
+            new_p.set_parent(root_hash)
+            p_hash = new_p.get_hash()
 
             for child in children:
-                child.setData(ItemDataTypes.PARENT_HASH, p_hash)
+                child.set_parent(p_hash)
 
-        self._points[index].remove(point)
+        self._points[index].remove(record)
+        self.invalidate_region_digest(record.region)
+        self._point_index.remove_items([record])
+        self._point_index.index_list(self._points[index], index)
         self.set_changed()
 
     def get_lines_for_region(self, index):
         """
-        get a list of lines associated with a region
+        get a list of lines associated with a region, as graphics items
             Args:
                 index (int) array index of region
             Returns:
-                list of lines [line], or None if none found
+                list of lines [[QGraphicsLineItem]], or None if none found
         """
-        tmp = []
-
-        for line in self._lines:
-            if get_region(line[0]) == index:
-                tmp.append(line)
-
-        if len(tmp) > 0:
-            return tmp
+        markers = self._region_lines.get(index)
+        if markers:
+            return [self.get_marker_items(x) for x in markers]
 
         return None
 
     def get_points_for_region(self, index):
         """
-        get a list of points associated with a region
+        get a list of points associated with a region, as graphics items
             Args:
                 index (int) array index of region
             Returns:
-                list of points [points], or None if none found
+                list of points [[QGraphicsPathItem]], or None if none found
         """
-        tmp = []
+        markers = self._region_points.get(index)
+        if markers:
+            return [self.get_marker_items(x) for x in markers]
 
-        for point in self._points:
-            if get_region(point[0]) == index:
-                tmp.append(point)
+        return None
 
-        if len(tmp) > 0:
-            return tmp
+    def get_line_records_for_region(self, index):
+        """
+        get a list of lines associated with a region
+            Args:
+                index (int) array index of region
+            Returns:
+                list of lines [[MarkerRecord]], empty if none found
+        """
+        return list(self._region_lines.get(index, []))
 
-        return None
+    def get_point_records_for_region(self, index):
+        """
+        get a list of points associated with a region
+            Args:
+                index (int) array index of region
+            Returns:
+                list of points [[MarkerRecord]], empty if none found
+        """
+        return list(self._region_points.get(index, []))
 
     def region_has_markers(self, index):
         """
@@ -596,24 +834,23 @@ class VideoAnalysisResultsStore(qc.QObject):
             Returns:
                 True if markers defined else False
         """
-        if len(self.get_points_for_region(index)) > 0:
+        if len(self._region_points.get(index, [])) > 0:
             return True
 
-        if len(self.get_lines_for_region(index)) > 0:
+        if len(self._region_lines.get(index, [])) > 0:
             return True
 
         return False
 
     def change_marker_props(self, pens):
         """
-        change the pen of exisiting items
+        change the pen of exisiting items, and of items made in future
             Args:
                 pens (PenStore): the holder of the pens
         """
-        for marker in self._lines:
-            for line in marker:
-                line.setPen(pens.get_display_pen())
+        self._pens = pens
 
-        for marker in self._points:
-            for point in marker:
-                point.setPen(pens.get_display_pen())
+        for marker in self._lines + self._points:
+            for record in marker:
+                if record.has_item():
+                    record.get_item().setPen(pens.get_display_pen())
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 ## @package config
 # provides a namespace for global variables, used to activate/deactivate
-# types of error logging
+# types of error logging and to tune the video readers
 #
 # @copyright 2021 University of Leeds, Leeds, UK.
 # @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
@@ -25,3 +25,105 @@ USE_FFMPEG_LOG = False
 
 ## save statistics analyser logs to file
 STATS_ANALYSER_LOG = True
+
+## the largest number of frames a decoder session will read and discard
+## to reach a requested frame, rather than restarting ffmpeg with a seek
+DECODER_MAX_SKIP = 25
+
+## the number of bytes of decoded frames held by the shared frame cache
+FRAME_CACHE_BYTES = 512*1024*1024
+
+## the number of frames decoded ahead of the display in video play
+PREFETCH_FRAMES = 16
+
+## the number of frames decoded in one pass in backward video play
+PREFETCH_BACKWARD_BLOCK = 8
+
+## the number of frames read and analysed together by the video statistics
+STATS_BATCH_FRAMES = 16
+
+## the number of processes analysing segments of a video in parallel, 1 for serial
+STATS_WORKERS = 4
+
+## the smallest number of frames given to one statistics process
+STATS_MIN_SEGMENT_FRAMES = 500
+
+## if True region videos are encoded from raw frames piped to ffmpeg,
+## else each region frame is saved as a png file and the files encoded
+REGION_EXPORT_STREAMING = True
+
+## the largest number of region videos encoded at once when REGION_EXPORT_STREAMING
+## is False, streaming runs one encoder per region so the frames are read once
+REGION_ENCODE_WORKERS = 4
+
+## the number of bootstrap samples used for growth rate confidence intervals
+GROWTH_RATE_BOOTSTRAP_SAMPLES = 1000
+
+## the confidence level of the growth rate intervals
+GROWTH_RATE_CONFIDENCE = 0.95
+
+## the seed of the growth rate bootstrap, fixed so reports are reproducible
+GROWTH_RATE_BOOTSTRAP_SEED = 20211018
+
+## the number of key frame values resampled at once by the bootstrap
+GROWTH_RATE_BOOTSTRAP_CHUNK = 1000000
+
+## the number of processes running the bootstrap, 1 for serial
+GROWTH_RATE_WORKERS = 4
+
+## the smallest number of bootstrap samples given to one process
+GROWTH_RATE_MIN_WORKER_SAMPLES = 5000
+
+## the size in bytes of the content digests identifying project results
+RESULTS_DIGEST_SIZE = 16
+
+## the number of frames of video statistics digested at once
+STATS_DIGEST_BLOCK_FRAMES = 4096
+
+## the file, in the report images directory, holding the keys of the images
+REPORT_IMAGE_MANIFEST = "image_manifest.json"
+
+## the format of the report images: png, jpg or webp
+REPORT_IMAGE_FORMAT = "png"
+
+## the quality of the report images, 0 to 100 small files to high quality,
+## -1 for the default, for png this sets the compression level
+REPORT_IMAGE_QUALITY = -1
+
+## the number of threads encoding report images
+REPORT_ENCODE_WORKERS = 4
+
+## the file to which start-up times are appended when timing is requested
+STARTUP_TIMING_LOG = "startup_timing.csv"
+
+## the file, in the project directory, holding the probed data of the videos
+PROBE_CACHE_FILE = "probe_cache.json"
+
+## if True videos are indexed, once, so that decoders seek to exact frames
+USE_SEEK_INDEX = True
+
+## the directory, in the project directory, holding the video seek indices
+SEEK_INDEX_DIR = "seek_index"
+
+## if True an all intra frame proxy of the video is made, in the background,
+## and used to display frames
+USE_PROXY_VIDEO = False
+
+## the directory, in the project directory, holding the proxy videos
+PROXY_DIR = "proxy_video"
+
+## the MJPEG quality of the proxy, 2 to 31 best to worst
+PROXY_QUALITY = 3
+
+## proxies of videos wider than this are reduced to this width, 0 for no reduction
+PROXY_MAX_WIDTH = 0
+
+## if True videos are decoded once into raw frame stores, which are read
+## without decoding by the display, the statistics and the region videos
+USE_RAW_FRAME_STORE = False
+
+## the directory, in the project directory, holding the raw frame stores
+RAW_STORE_DIR = "raw_frames"
+
+## the largest raw frame store, in bytes, larger videos are decoded as usual
+RAW_STORE_MAX_BYTES = 4*1024*1024*1024
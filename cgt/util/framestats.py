@@ -22,26 +22,91 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 
 from collections import namedtuple
 
+import numpy as np
+
 ## Storage of the statistics of one frame of video
 FrameStats = namedtuple("FrameStats", ["mean", "std_deviation", "bin_counts"])
 
+class FrameStatsView():
+    """
+    a read only sequence of FrameStats made on demand from the columns
+    of a VideoIntensityStats
+    """
+
+    def __init__(self, stats):
+        """
+        initalize the object
+            Args:
+                stats (VideoIntensityStats) the columns
+        """
+        ## the columns
+        self._stats = stats
+
+    def __len__(self):
+        """
+        the number of frames
+        """
+        return len(self._stats)
+
+    def __getitem__(self, index):
+        """
+        get the statistics of a frame, or a list for a slice
+        """
+        if isinstance(index, slice):
+            return [self._stats.get_frame(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError("frame index out of range")
+
+        return self._stats.get_frame(index)
+
+    def __iter__(self):
+        """
+        iterate the frames in order
+        """
+        for i in range(len(self)):
+            yield self._stats.get_frame(i)
+
 class VideoIntensityStats():
     """
-    storage for the intensity statistics of  a video
+    storage for the intensity statistics of  a video, held as contiguous
+    columns of means, standard deviations and (frames, bins) counts, which
+    grow by doubling
     """
 
+    ## the number of frames space is allocated for initially
+    INITIAL_CAPACITY = 256
+
     def __init__(self, bins=None):
         """
         initalize the object
             Args:
                 bins [np.float] the bins
         """
-        ## the statistics of the individual frames
-        self._frames = []
-
         ## the bins used in the bin counts
         self._bins = bins
 
+        ## the number of frames held
+        self._length = 0
+
+        ## the means of the frames, with spare capacity
+        self._means = None
+
+        ## the standard deviations of the frames, with spare capacity
+        self._std_devs = None
+
+        ## the bin counts of the frames, with spare capacity
+        self._bin_counts = None
+
+    def __len__(self):
+        """
+        the number of frames
+        """
+        return self._length
+
     def get_bins(self):
         """
         getter for the bins
@@ -51,14 +116,168 @@ class VideoIntensityStats():
     def get_frames(self):
         """
         getter for the frames
+            Returns:
+                (FrameStatsView) a sequence of FrameStats
         """
-        return self._frames
+        return FrameStatsView(self)
+
+    def get_frame(self, index):
+        """
+        getter for the statistics of one frame
+            Args:
+                index (int): the frame number
+            Returns:
+                (FrameStats)
+        """
+        return FrameStats(self._means[index],
+                          self._std_devs[index],
+                          self._bin_counts[index])
+
+    def get_means(self):
+        """
+        getter for the means of all frames
+            Returns:
+                (np.array float)
+        """
+        if self._means is None:
+            return np.zeros(0, dtype=np.float64)
+
+        return self._means[:self._length]
+
+    def get_std_devs(self):
+        """
+        getter for the standard deviations of all frames
+            Returns:
+                (np.array float)
+        """
+        if self._std_devs is None:
+            return np.zeros(0, dtype=np.float64)
+
+        return self._std_devs[:self._length]
+
+    def get_bin_counts(self):
+        """
+        getter for the bin counts of all frames
+            Returns:
+                (np.array int) shape (frames, bins)
+        """
+        if self._bin_counts is None:
+            return np.zeros((0, 0), dtype=np.int64)
+
+        return self._bin_counts[:self._length]
+
+    def set_columns(self, means, std_devs, bin_counts):
+        """
+        replace the frames with existing arrays, which are used without copying
+        and may be read only (memory mapped), appending a frame makes a copy
+            Args:
+                means (np.array float): the means
+                std_devs (np.array float): the standard deviations
+                bin_counts (np.array int): the bin counts, shape (frames, bins)
+        """
+        self._means = means
+        self._std_devs = std_devs
+        self._bin_counts = bin_counts
+        self._length = len(means)
+
+    def to_records(self):
+        """
+        make a structured array of the frames, for binary storage
+            Returns:
+                (np.array) records with fields mean, std_dev and bin_counts
+        """
+        bin_counts = self.get_bin_counts()
+        records = np.empty(len(self), dtype=VideoIntensityStats.record_dtype(bin_counts.shape[1]))
+        records['mean'] = self.get_means()
+        records['std_dev'] = self.get_std_devs()
+        records['bin_counts'] = bin_counts
+
+        return records
+
+    def set_records(self, records):
+        """
+        replace the frames with the columns of a structured array, without copying
+            Args:
+                records (np.array): records with fields mean, std_dev and bin_counts
+        """
+        self.set_columns(records['mean'], records['std_dev'], records['bin_counts'])
+
+    @staticmethod
+    def record_dtype(number_bins):
+        """
+        the numpy data type of the binary storage of one frame
+            Args:
+                number_bins (int): the number of bins
+            Returns:
+                (np.dtype)
+        """
+        return np.dtype([('mean', np.float64),
+                         ('std_dev', np.float64),
+                         ('bin_counts', np.int64, (number_bins,))])
 
     def append_frame(self, frame):
         """
         add a frame
+            Args:
+                frame (FrameStats): the statistics of the frame
+        """
+        self.append_frames([frame.mean], [frame.std_deviation], [frame.bin_counts])
+
+    def append_frames(self, means, std_devs, bin_counts):
+        """
+        add a block of frames
+            Args:
+                means ([float]): the means
+                std_devs ([float]): the standard deviations
+                bin_counts ([[int]]): the bin counts, shape (frames, bins)
+        """
+        bin_counts = np.asarray(bin_counts)
+        number = len(bin_counts)
+        if number == 0:
+            return
+
+        self.reserve(self._length + number, bin_counts.shape[1])
+
+        end = self._length + number
+        self._means[self._length:end] = means
+        self._std_devs[self._length:end] = std_devs
+        self._bin_counts[self._length:end] = bin_counts
+        self._length = end
+
+    def reserve(self, capacity, number_bins):
+        """
+        ensure there is space for a number of frames, doubling the allocation
+            Args:
+                capacity (int): the number of frames required
+                number_bins (int): the number of bins
+        """
+        if self._means is None:
+            size = max(capacity, VideoIntensityStats.INITIAL_CAPACITY)
+            self._means = np.empty(size, dtype=np.float64)
+            self._std_devs = np.empty(size, dtype=np.float64)
+            self._bin_counts = np.empty((size, number_bins), dtype=np.int64)
+            return
+
+        if capacity <= len(self._means):
+            return
+
+        size = max(capacity, 2*len(self._means))
+        self._means = self.grow(self._means, size)
+        self._std_devs = self.grow(self._std_devs, size)
+        self._bin_counts = self.grow(self._bin_counts, size)
+
+    def grow(self, array, size):
+        """
+        copy the used part of an array into a larger one
+            Args:
+                array (np.array): the existing array
+                size (int): the new number of frames
+            Returns:
+                (np.array)
         """
-        self._frames.append(frame)
+        new_array = np.empty((size,) + array.shape[1:], dtype=array.dtype)
+        new_array[:self._length] = array[:self._length]
+        return new_array
 
     def set_bins(self, bins):
         """
@@ -19,6 +19,12 @@ specific language governing permissions and limitations under the License.
 This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 """
 import enum
+import hashlib
+import struct
+
+import numpy as np
+
+from cgt.util import config
 
 class MarkerTypes(enum.IntEnum):
     """
@@ -137,56 +143,53 @@ def hash_framestats(stats):
 
     return hash(tuple(items))
 
-def hash_videointensitystats(stats):
+def make_digest():
     """
-    get hashcode for a complet set of video stats
+    make an empty content digest, unlike hash() digests are the same in every session
+        Returns:
+            (hashlib.blake2b)
+    """
+    return hashlib.blake2b(digest_size=config.RESULTS_DIGEST_SIZE)
+
+def digest_videointensitystats(stats):
+    """
+    get the content digest of a complete set of video stats, the columns are
+    digested in blocks of frames to limit the memory used for mapped statistics
         Return:
-            (int) hash code
+            (bytes) the digest
     """
-    items = []
-    for stat in stats.get_frames():
-        items.append(hash_framestats(stat))
+    digest = make_digest()
+    digest.update(np.asarray(stats.get_bins(), dtype='<f8').tobytes())
 
-    for s_bin in stats.get_bins():
-        items.append(hash(s_bin))
+    block = config.STATS_DIGEST_BLOCK_FRAMES
+    for column, dtype in ((stats.get_means(), '<f8'),
+                          (stats.get_std_devs(), '<f8'),
+                          (stats.get_bin_counts(), '<i8')):
+        for start in range(0, len(column), block):
+            digest.update(np.ascontiguousarray(column[start:start+block], dtype=dtype).tobytes())
 
-    return hash(tuple(items))
+    return digest.digest()
 
-def hash_graphics_region(region):
+def digest_graphics_region(region):
     """
-    get hash code for a QGraphicsRectItem
+    get the content digest of a QGraphicsRectItem
         Args:
             region (QGraphicsRectItem): the region
         Returns:
-            (int) hash code
+            (bytes) the digest
     """
     rect = region.rect()
-    tmp = (hash_qpointf(rect.topLeft()), hash_qpointf(rect.bottomRight()))
-    return hash(tmp)
+    digest = make_digest()
+    digest.update(struct.pack("<4d", rect.left(), rect.top(), rect.right(), rect.bottom()))
+    return digest.digest()
 
 def hash_results(results):
     """
-    find hash of results store
+    find the content digest of the results store, the same in every session
         Return:
-            (int) hash code
+            (str) the hexadecimal digest
     """
-    items = []
-    stats = results.get_video_statistics()
-    if stats is not None:
-        items.append(hash_videointensitystats(stats))
-
-    for marker in results.get_lines():
-        for line in marker:
-            items.append(hash_graphics_line(line))
-
-    for marker in results.get_points():
-        for point in marker:
-            items.append(hash_graphics_point(point))
-
-    for region in results.get_regions():
-        items.append(hash_graphics_region(region))
-
-    return hash(tuple(items))
+    return results.get_digest()
 
 def get_marker_type(item):
     """
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+## @package startuptimer
+# record the time taken by the stages of application start-up, so that
+# regressions can be tracked
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+"""
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+"""
+import time
+import pathlib
+import datetime
+
+class StartupTimer():
+    """
+    a list of named times, in seconds from the creation of the timer
+    """
+
+    def __init__(self):
+        """
+        set up the object, starting the clock
+        """
+        ## the start time
+        self._start = time.perf_counter()
+
+        ## the marks [(label, seconds from start)]
+        self._marks = []
+
+    def mark(self, label):
+        """
+        record the time of a stage
+            Args:
+                label (str): the name of the stage
+        """
+        self._marks.append((label, time.perf_counter() - self._start))
+
+    def get_marks(self):
+        """
+        getter for the marks
+            Returns:
+                [(str, float)] the label and time in seconds of each mark
+        """
+        return list(self._marks)
+
+    def make_report(self):
+        """
+        make a report of the marks, with the time of each stage
+            Returns:
+                (str) one line per mark
+        """
+        lines = []
+        previous = 0.0
+        for label, seconds in self._marks:
+            lines.append(f"{label:<30} {seconds:8.3f} s (+{seconds - previous:.3f})")
+            previous = seconds
+
+        return "\n".join(lines)
+
+    def save_report(self, file_name):
+        """
+        append the marks to a csv file, one row per start-up
+            Args:
+                file_name (str): the file
+        """
+        path = pathlib.Path(file_name)
+        new_file = not path.exists()
+
+        with path.open('a') as fout:
+            if new_file:
+                fout.write(",".join(["date"] + [x[0] for x in self._marks]) + "\n")
+            row = [datetime.datetime.now().isoformat(timespec='seconds')]
+            row += [f"{x[1]:.4f}" for x in self._marks]
+            fout.write(",".join(row) + "\n")
+
+## the timer of the application start-up, started when this module is first imported
+startup_timer = StartupTimer()
@@ -21,8 +21,12 @@ This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
 import sys
 import argparse
 
+# imported first so the timer starts before the other modules load
+from cgt.util.startuptimer import startup_timer
 from cgt.cgtapplication import CGTApplication
 
+startup_timer.mark("modules imported")
+
 def get_python_args():
     """
     set up to read project name from command line
@@ -42,6 +46,22 @@ def get_python_args():
                         action='store_true',
                         help="if set write ffmpeg log files to file")
 
+    parser.add_argument("-x",
+                        "--proxy_video",
+                        action='store_true',
+                        help="if set display frames from an all intra frame proxy of the video")
+
+    parser.add_argument("-w",
+                        "--raw_frames",
+                        action='store_true',
+                        help="if set decode the video once to raw frames in the project, "
+                             "which are then read without decoding")
+
+    parser.add_argument("-t",
+                        "--timing",
+                        action='store_true',
+                        help="if set print the start-up times and append them to startup_timing.csv")
+
     args = parser.parse_args()
     return args
 
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+## @package testbatch
+# unittest of the headless batch processing
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = import-error
+
+import unittest
+import argparse
+import tempfile
+import pathlib
+import shutil
+
+from cgt.batch import get_arguments, read_project, run_batch
+from cgt.gui.penstore import PenStore
+from cgt.io.writecsvreports import save_csv_project
+from cgt.model.cgtproject import CGTProject
+from cgt.model.videoanalysisresultsstore import VideoAnalysisResultsStore
+from cgt.util.scenegraphitems import list_to_g_point
+from cgt.util.utils import make_report_file_names
+from tests.makeresults import make_region
+from tests.maketestvideo import make_test, get_frame_rate, get_frame_count
+
+def make_project(dir_name, video):
+    """
+    save a project with one region, holding a point marker, of a video
+        Args:
+            dir_name (pathlib.Path): the project directory
+            video (pathlib.Path): the video
+    """
+    project = CGTProject()
+    project.init_new_project()
+    project["proj_full_path"] = str(dir_name)
+    project["proj_name"] = dir_name.name
+    project["enhanced_video"] = str(video)
+    project["frame_rate"] = get_frame_rate()
+    project["resolution"] = 1.0
+    project["resolution_units"] = "um"
+
+    results = VideoAnalysisResultsStore(None)
+    results.add_region(make_region(150, 150, 200, 200))
+    pen = PenStore().get_display_pen()
+    points = []
+    # id, ctrx, ctry, offsetx, offsety, frame, region
+    for frame, offset in [(10, "0"), (30, "20"), (60, "50")]:
+        points.append(list_to_g_point(["0", "200", "200", offset, offset, str(frame), "0"], pen))
+        results.add_key_frame(0, frame)
+    results.insert_point_marker(points)
+    project["results"] = results
+
+    dir_name.mkdir()
+    save_csv_project(project)
+
+class TestBatch(unittest.TestCase):
+    """
+    tests of the batch command
+    """
+
+    def test_default_tasks(self):
+        """
+        test all tasks are run if none is chosen
+        """
+        args = get_arguments(["proj_a", "proj_b"])
+
+        message = "projects not read"
+        self.assertEqual(args.projects, ["proj_a", "proj_b"], message)
+
+        message = "all tasks not chosen by default"
+        self.assertTrue(args.stats and args.report and args.regions, message)
+
+        message = "proxy chosen by default"
+        self.assertFalse(args.proxy, message)
+
+        args = get_arguments(["-r", "-j", "2", "proj_a"])
+
+        message = "only the report should be chosen"
+        self.assertEqual((args.stats, args.report, args.regions), (False, True, False), message)
+
+        message = "wrong number of jobs"
+        self.assertEqual(args.jobs, 2, message)
+
+    def test_empty_project(self):
+        """
+        test an empty project directory is an error
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with self.assertRaises(IOError):
+                read_project(pathlib.Path(tmp_dir), None)
+
+    def test_read_unchanged(self):
+        """
+        test a project that has just been read is not marked as changed
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project_dir = pathlib.Path(tmp_dir).joinpath("project")
+            make_project(project_dir, pathlib.Path(tmp_dir).joinpath("video.avi"))
+
+            project = read_project(project_dir, PenStore())
+
+            message = "project marked as changed on reading"
+            self.assertFalse(project.has_been_changed(), message)
+
+    @unittest.skipIf(shutil.which("ffprobe") is None, "requires ffprobe")
+    def test_process_projects(self):
+        """
+        test a generated project is processed and a broken project is reported
+        without stopping the batch, the projects are processed in worker
+        processes, as an application made in this process would outlive the test
+        """
+        tasks = argparse.Namespace(stats=True,
+                                   replace_stats=False,
+                                   report=True,
+                                   regions=True,
+                                   proxy=False,
+                                   raw_frames=False)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = pathlib.Path(tmp_dir)
+            project_dir = tmp_path.joinpath("project")
+            make_project(project_dir, make_test(tmp_path))
+            broken_dir = tmp_path.joinpath("broken")
+            broken_dir.mkdir()
+
+            outcomes = dict(run_batch([str(project_dir), str(broken_dir)], tasks, 2))
+
+            message = "project not processed"
+            self.assertIsNone(outcomes[str(project_dir)], message)
+
+            message = "broken project not reported"
+            self.assertIsNotNone(outcomes[str(broken_dir)], message)
+
+            message = "report not made"
+            self.assertTrue(make_report_file_names(project_dir)[1].exists(), message)
+
+            message = "region video not made"
+            self.assertTrue(project_dir.joinpath("region_videos", "region_0.mp4").exists(),
+                            message)
+
+            message = "statistics not saved"
+            stats = read_project(project_dir, PenStore())["results"].get_video_statistics()
+            self.assertEqual(len(stats), get_frame_count(), message)
+
+if __name__ == "__main__":
+    unittest.main()
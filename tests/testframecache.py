@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+## @package testframecache
+# unittest of the least recently used frame cache
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+import unittest
+
+from cgt.io.framecache import FrameCache
+
+class TestFrameCache(unittest.TestCase):
+    """
+    tests of the frame cache
+    """
+
+    def setUp(self):
+        """
+        make a cache with space for three 10 byte frames
+        """
+        self._cache = FrameCache(30)
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        del self._cache
+
+    def test_store_and_retrieve(self):
+        """
+        test a stored frame can be retrieved by key
+        """
+        key = FrameCache.make_key("video.mp4", 5, "rgb24")
+        self._cache.put(key, bytes(10))
+
+        message = "frame not retrieved"
+        self.assertEqual(self._cache.get(key), bytes(10), message)
+
+        message = "unknown frame returned"
+        other = FrameCache.make_key("video.mp4", 5, "gray")
+        self.assertIsNone(self._cache.get(other), message)
+
+    def test_lru_eviction(self):
+        """
+        test the least recently used frame is evicted when over budget
+        """
+        keys = [FrameCache.make_key("video.mp4", i, "rgb24") for i in range(4)]
+        for key in keys[:3]:
+            self._cache.put(key, bytes(10))
+
+        # use the first frame so the second becomes the oldest
+        self._cache.get(keys[0])
+        self._cache.put(keys[3], bytes(10))
+
+        message = "least recently used frame not evicted"
+        self.assertNotIn(keys[1], self._cache, message)
+
+        message = "recently used frame evicted"
+        self.assertIn(keys[0], self._cache, message)
+
+        message = "cache over budget"
+        self.assertLessEqual(self._cache.get_bytes_held(), 30, message)
+
+    def test_oversized_frame(self):
+        """
+        test a frame larger than the budget is not stored
+        """
+        key = FrameCache.make_key("video.mp4", 0, "rgb24")
+        self._cache.put(key, bytes(31))
+
+        message = "oversized frame stored"
+        self.assertEqual(len(self._cache), 0, message)
+
+if __name__ == "__main__":
+    unittest.main()
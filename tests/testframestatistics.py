@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+## @package testframestatistics
+# unittest of the batched frame statistics
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+import unittest
+import io
+
+import numpy as np
+
+from cgt.io.videoanalyser import VideoAnalyser, analyse_frames, read_frames
+from cgt.util.framestats import VideoIntensityStats
+
+class TestFrameStatistics(unittest.TestCase):
+    """
+    tests of the batched frame statistics
+    """
+
+    def setUp(self):
+        """
+        make a batch of random frames including the extreme gray levels
+        """
+        generator = np.random.default_rng(42)
+        self._frames = generator.integers(0, 256, size=(5, 48, 64), dtype=np.uint8)
+        self._frames[0, 0, :4] = [0, 255, 0, 255]
+        self._frames[4, :, :] = 255
+        self._bins = np.linspace(0, 256, 32)
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        del self._frames
+
+    def test_batch_matches_single_frame(self):
+        """
+        test the batched statistics equal those of the single frame method
+        """
+        stats = VideoIntensityStats(self._bins)
+        stats.append_frames(*analyse_frames(self._frames, self._bins))
+
+        message = "wrong number of frames"
+        self.assertEqual(len(stats.get_frames()), len(self._frames), message)
+
+        for frame, frame_stats in zip(self._frames, stats.get_frames()):
+            single = VideoAnalyser.make_stats(frame.tobytes(), self._bins)
+
+            message = "bin counts differ"
+            self.assertTrue(np.array_equal(frame_stats.bin_counts, single.bin_counts), message)
+
+            message = "means differ"
+            self.assertEqual(frame_stats.mean, single.mean, message)
+
+            message = "standard deviations differ"
+            self.assertAlmostEqual(frame_stats.std_deviation, single.std_deviation, 9, message)
+
+    def test_read_frames(self):
+        """
+        test a part filled batch is read from a short stream
+        """
+        stream = io.BytesIO(self._frames[:3].tobytes())
+        buffer = np.zeros((4, 48, 64), dtype=np.uint8)
+
+        message = "wrong number of frames read"
+        self.assertEqual(read_frames(stream, buffer), 3, message)
+
+        message = "frames not read correctly"
+        self.assertTrue(np.array_equal(buffer[:3], self._frames[:3]), message)
+
+    def test_storage_growth(self):
+        """
+        test frames appended singly and in blocks survive growth of the columns
+        """
+        means, std_devs, counts = analyse_frames(self._frames, self._bins)
+        stats = VideoIntensityStats(self._bins)
+        for _ in range(60):
+            stats.append_frames(means, std_devs, counts)
+        stats.append_frame(stats.get_frames()[2])
+
+        message = "wrong number of frames"
+        self.assertEqual(len(stats), 301, message)
+
+        message = "columns corrupted by growth"
+        self.assertTrue(np.array_equal(stats.get_bin_counts()[295:300], counts), message)
+        self.assertEqual(stats.get_frames()[-1].mean, means[2], message)
+
+if __name__ == "__main__":
+    unittest.main()
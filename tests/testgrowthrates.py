@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+## @package testgrowthrates
+# unittest of the least squares growth rate fitting
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+import unittest
+import itertools
+
+import numpy as np
+
+from cgt.model.velocitiescalculator import MarkerDisplacements
+from cgt.model.growthratefitter import fit_growth_rates, project_growth_rates
+from cgt.io.htmlreport import make_html_growth_rates_table
+from cgt.util.markers import MarkerTypes
+import tests.makeresults as mkres
+
+class TestGrowthRates(unittest.TestCase):
+    """
+    tests of the growth rate fitting
+    """
+
+    def test_fit(self):
+        """
+        test the fit matches numpy's polyfit, for two markers
+        """
+        # marker 0 has 4 key frames, marker 1 has 2
+        displacements = MarkerDisplacements(np.array([0, 0, 0, 1]),
+                                            np.array([0, 0, 0, 1]),
+                                            np.array([0, 10, 20, 5]),
+                                            np.array([10, 20, 40, 15]),
+                                            np.array([2.0, 3.0, 3.5, 1.0]),
+                                            None)
+        rates = fit_growth_rates(displacements, MarkerTypes.POINT, 10.0, samples=200)
+
+        times = np.array([0, 10, 20, 40])/10.0
+        distances = np.array([0.0, 2.0, 5.0, 8.5])
+        coeffs, cov = np.polyfit(times, distances, 1, cov=True)
+
+        message = "fitted rate wrong"
+        self.assertAlmostEqual(rates.rate[0], coeffs[0], places=10, msg=message)
+        self.assertAlmostEqual(rates.rate[1], 1.0, places=10, msg=message)
+
+        message = "standard error wrong"
+        self.assertAlmostEqual(rates.std_error[0], np.sqrt(cov[0, 0]), places=10, msg=message)
+
+        message = "two key frames should have no standard error"
+        self.assertTrue(np.isnan(rates.std_error[1]), message)
+
+        message = "confidence interval does not hold the rate"
+        self.assertTrue(rates.ci_low[0] <= rates.rate[0] <= rates.ci_high[0], message)
+
+    def test_two_key_frames(self):
+        """
+        test a marker with two key frames has no confidence interval, while
+        the other markers keep theirs
+        """
+        # marker 0 has 3 key frames, marker 1 has 2
+        displacements = MarkerDisplacements(np.array([0, 0, 1]),
+                                            np.array([0, 0, 1]),
+                                            np.array([0, 10, 5]),
+                                            np.array([10, 30, 15]),
+                                            np.array([2.0, 3.0, 1.0]),
+                                            None)
+        rates = fit_growth_rates(displacements, MarkerTypes.LINE, 10.0, samples=200)
+
+        message = "two key frames should have no confidence interval"
+        self.assertTrue(np.isnan(rates.ci_low[1]), message)
+        self.assertTrue(np.isnan(rates.ci_high[1]), message)
+
+        message = "three key frames should have a confidence interval"
+        self.assertFalse(np.isnan(rates.ci_low[0]), message)
+        self.assertFalse(np.isnan(rates.ci_high[0]), message)
+
+        table = make_html_growth_rates_table(rates, "um", itertools.count(1))
+        message = "missing interval not shown as a dash"
+        self.assertEqual(table.count("<td>&ndash;</td>"), 2, message)
+        self.assertNotIn("nan", table, message)
+
+    def test_project(self):
+        """
+        test the rates of every marker in a project
+        """
+        values = mkres.get_test_values()
+        rates = project_growth_rates(mkres.make_results_object(), values.fps, values.scale)
+
+        message = "wrong number of markers"
+        self.assertEqual(len(rates.rate), 2, message)
+
+        message = "line rate wrong"
+        self.assertAlmostEqual(rates.rate[0], values.line_speed, places=4, msg=message)
+
+        message = "point rate wrong"
+        self.assertAlmostEqual(rates.rate[1], values.point_speed, places=4, msg=message)
+
+if __name__ == "__main__":
+    unittest.main()
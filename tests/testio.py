@@ -23,11 +23,14 @@ import tempfile
 import pathlib
 import getpass
 
+import numpy as np
+
 from cgt.gui.penstore import PenStore
 from cgt.io.writecsvreports import save_csv_project
 from cgt.io.readcsvreports import read_csv_project
 from cgt.model.cgtproject import CGTProject
 from cgt.model.videoanalysisresultsstore import VideoAnalysisResultsStore
+from cgt.util.framestats import VideoIntensityStats
 from cgt.util.scenegraphitems import compare_lines, compare_points
 
 from tests.makeresults import make_results_object
@@ -68,6 +71,43 @@ class TestIO(unittest.TestCase):
         self.assert_file_names(pathlib.Path(self._tmp_dir.name))
         self.run_test_input()
 
+    def test_write_read_statistics(self):
+        """
+        test the video statistics are read back from the binary sidecar,
+        and that a project holding mapped statistics can be saved again
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._project["proj_full_path"] = self._tmp_dir.name
+        self._project["proj_name"] = "testing"
+
+        bins = np.linspace(0, 256, 32)
+        stats = VideoIntensityStats(bins)
+        generator = np.random.default_rng(7)
+        stats.append_frames(generator.uniform(0, 255, 20),
+                            generator.uniform(0, 50, 20),
+                            generator.integers(0, 1000, (20, 31)))
+        self._project["results"].set_video_statistics(stats)
+
+        save_csv_project(self._project)
+        sidecar = pathlib.Path(self._tmp_dir.name).joinpath("CGT_testing_video_statistics.npy")
+        self.assertTrue(sidecar.exists(), "binary statistics not written")
+
+        project = CGTProject()
+        project["results"] = VideoAnalysisResultsStore(None)
+        read_csv_project(self._project["proj_full_path"], project, PenStore())
+        save_csv_project(project)
+
+        for _ in range(2):
+            in_stats = project["results"].get_video_statistics()
+            self.assertTrue(np.array_equal(in_stats.get_means(), stats.get_means()),
+                            "means not read correctly")
+            self.assertTrue(np.array_equal(in_stats.get_bin_counts(), stats.get_bin_counts()),
+                            "bin counts not read correctly")
+
+            project = CGTProject()
+            project["results"] = VideoAnalysisResultsStore(None)
+            read_csv_project(self._project["proj_full_path"], project, PenStore())
+
     def run_test_input(self):
         """
         read and test the output files
@@ -133,11 +173,12 @@ class TestIO(unittest.TestCase):
         files = ["CGT_testing_lines.csv",
                  "CGT_testing_points.csv",
                  "CGT_testing_project_info.csv",
-                 "CGT_testing_regions.csv"]
+                 "CGT_testing_regions.csv",
+                 "CGT_testing_growth_rates.csv"]
 
         contents = [x.name for x in dir_path.iterdir()]
 
-        self.assertEqual(len(contents), 4, "wrong number of csv files")
+        self.assertEqual(len(contents), 5, "wrong number of csv files")
 
         for file in files:
             self.assertIn(file, contents, "unknown file in csv directory")
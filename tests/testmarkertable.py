@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+## @package testmarkertable
+# unittest of the marker records
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# pylint: disable = c-extension-no-member
+import unittest
+
+from cgt.model.markertable import record_from_row
+from cgt.util.markers import (ItemDataTypes,
+                              MarkerTypes,
+                              hash_graphics_line,
+                              hash_graphics_point)
+
+class TestMarkerTable(unittest.TestCase):
+    """
+    tests of the marker records
+    """
+
+    def test_line_record(self):
+        """
+        test a line record makes its item on demand, with the same hash code
+        """
+        row = [0, 20.0, 20.0, 20.0, 220.0, 50.0, 0.0, 150, 1]
+        record = record_from_row(MarkerTypes.LINE, row)
+
+        message = "graphics item made before needed"
+        self.assertFalse(record.has_item(), message)
+
+        item = record.get_item()
+        message = "line hash codes differ"
+        self.assertEqual(record.get_hash(), hash_graphics_line(item), message)
+
+        message = "item not cached"
+        self.assertIs(item, record.get_item(), message)
+
+        message = "csv data wrong"
+        self.assertEqual(record.to_list(), row[1:], message)
+
+    def test_point_record(self):
+        """
+        test a point record keeps its item consistent
+        """
+        row = [0, 0.0, 0.0, 50.0, 25.0, 200, 0]
+        record = record_from_row(MarkerTypes.POINT, row)
+        item = record.get_item()
+
+        message = "point hash codes differ"
+        self.assertEqual(record.get_hash(), hash_graphics_point(item), message)
+
+        record.set_region(3)
+        message = "region not updated in item"
+        self.assertEqual(item.data(ItemDataTypes.REGION_INDEX), 3, message)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+## @package testplaysequence
+# unittest of the frame sequence used by the play prefetcher
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+import unittest
+
+from cgt.io.frameprefetcher import PlaySequence
+
+class TestPlaySequence(unittest.TestCase):
+    """
+    tests of the play sequence
+    """
+
+    def test_forward(self):
+        """
+        test forward play wraps from the upper limit to the lower
+        """
+        sequence = PlaySequence(8, 1, 5, 10)
+        frames = [sequence.frame(step) for step in range(5)]
+
+        message = "forward sequence wrong"
+        self.assertEqual(frames, [8, 9, 5, 6, 7], message)
+
+        message = "steps to limit wrong"
+        self.assertEqual(sequence.steps_to_limit(0), 2, message)
+
+    def test_backward(self):
+        """
+        test backward play wraps from the lower limit to the upper
+        """
+        sequence = PlaySequence(6, -1, 5, 10)
+        frames = [sequence.frame(step) for step in range(5)]
+
+        message = "backward sequence wrong"
+        self.assertEqual(frames, [6, 5, 9, 8, 7], message)
+
+        message = "steps to limit wrong"
+        self.assertEqual(sequence.steps_to_limit(2), 5, message)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+## @package testprobecache
+# unittest of the store of probed video data
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = import-error
+
+import os
+import json
+import unittest
+import tempfile
+import pathlib
+
+from cgt.util import config
+from cgt.io.probecache import get_probe_cache, make_video_data
+
+class TestProbeCache(unittest.TestCase):
+    """
+    test the reading, matching and saving of probe cache entries
+    """
+
+    def setUp(self):
+        """
+        make a project directory holding a 'video' and a saved cache entry for it
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._dir = pathlib.Path(self._tmp_dir.name)
+
+        self._video = self._dir.joinpath("video.mp4")
+        self._video.write_bytes(b"not really a video")
+        stat = os.stat(self._video)
+
+        stream = {"codec_type":"video",
+                  "width":320,
+                  "height":240,
+                  "duration_ts":200,
+                  "r_frame_rate":"25/1"}
+        entries = {str(self._video.resolve()):{"size":stat.st_size,
+                                                "mtime_ns":stat.st_mtime_ns,
+                                                "stream":stream}}
+
+        with open(self._dir.joinpath(config.PROBE_CACHE_FILE), 'w') as fout:
+            json.dump(entries, fout)
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        get_probe_cache().set_directory(None)
+        get_probe_cache().clear()
+        self._tmp_dir.cleanup()
+
+    def test_cached_video_data(self):
+        """
+        test video data is made from a saved entry, without probing
+        """
+        get_probe_cache().set_directory(self._dir)
+        data = make_video_data(str(self._video), 10.0, 3)
+
+        message = "wrong width from cached probe"
+        self.assertEqual(data.get_width(), 320, message)
+
+        message = "wrong frame count from cached probe"
+        self.assertEqual(data.get_frame_count(), 200, message)
+
+        message = "wrong frame rates from cached probe"
+        self.assertEqual(data.get_frame_rate_user(), 10.0, message)
+        self.assertEqual(data.get_frame_rate_internal(), 25.0, message)
+
+    def test_save(self):
+        """
+        test the entries are saved and read back, and are not carried into
+        the file of another project
+        """
+        cache = get_probe_cache()
+        cache.set_directory(self._dir)
+        cache.save()
+        cache.clear()
+        cache.set_directory(self._dir)
+        data = make_video_data(str(self._video), 10.0, 3)
+
+        message = "saved entry not read back"
+        self.assertEqual(data.get_width(), 320, message)
+
+        out_dir = self._dir.joinpath("other")
+        out_dir.mkdir()
+        cache.set_directory(out_dir)
+        cache.save()
+
+        message = "entries not saved"
+        self.assertTrue(out_dir.joinpath(config.PROBE_CACHE_FILE).exists(), message)
+
+        with open(out_dir.joinpath(config.PROBE_CACHE_FILE), 'r') as fin:
+            entries = json.load(fin)
+
+        message = "entry of another project saved"
+        self.assertNotIn(str(self._video.resolve()), entries, message)
+
+    def test_changed_file(self):
+        """
+        test an entry is not used if the file has changed
+        """
+        cache = get_probe_cache()
+        cache.set_directory(self._dir)
+        self._video.write_bytes(b"a different length of not video")
+
+        message = "entry of a changed file used"
+        with self.assertRaises(Exception, msg=message):
+            make_video_data(str(self._video), 10.0, 3)
+
+if __name__ == "__main__":
+    unittest.main()
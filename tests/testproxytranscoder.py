@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+## @package testproxytranscoder
+# unittest of the naming and sizing of proxy videos
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = import-error
+
+import os
+import unittest
+import tempfile
+import pathlib
+import shutil
+
+from cgt.util import config
+from cgt.io.videodata import VideoData
+from cgt.io.videosource import VideoSource
+from cgt.io.proxytranscoder import ProxyTranscoder, make_proxy_path, make_proxy_size
+from tests.maketestvideo import make_test, get_frame_rate
+
+class TestProxyTranscoder(unittest.TestCase):
+    """
+    test the proxy path and size
+    """
+
+    def test_proxy_path(self):
+        """
+        test the proxy is in the project's proxy directory and a changed
+        video gets a new proxy
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video = pathlib.Path(tmp_dir).joinpath("video.mp4")
+            video.write_bytes(b"not really a video")
+
+            path = make_proxy_path(tmp_dir, video)
+
+            message = "proxy not in the proxy directory"
+            self.assertEqual(path.parent, pathlib.Path(tmp_dir).joinpath(config.PROXY_DIR), message)
+
+            message = "proxy name changed for the same video"
+            self.assertEqual(path, make_proxy_path(tmp_dir, video), message)
+
+            stat = os.stat(video)
+            os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+            message = "proxy name unchanged for a changed video"
+            self.assertNotEqual(path, make_proxy_path(tmp_dir, video), message)
+
+    def test_proxy_size(self):
+        """
+        test wide videos are reduced, keeping the aspect ratio with even dimensions
+        """
+        data = VideoData([1920, 1080, 100], [10.0, 10.0], 3)
+        max_width = config.PROXY_MAX_WIDTH
+        try:
+            config.PROXY_MAX_WIDTH = 0
+            message = "video reduced without a maximum width"
+            self.assertIsNone(make_proxy_size(data), message)
+
+            config.PROXY_MAX_WIDTH = 2000
+            message = "narrow video reduced"
+            self.assertIsNone(make_proxy_size(data), message)
+
+            config.PROXY_MAX_WIDTH = 641
+            message = "wrong reduced size"
+            self.assertEqual(make_proxy_size(data), (640, 360), message)
+        finally:
+            config.PROXY_MAX_WIDTH = max_width
+
+    def test_cancel_before_start(self):
+        """
+        test a transcode cancelled before ffmpeg starts fails without a proxy
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video = make_test(pathlib.Path(tmp_dir))
+            proxy = make_proxy_path(tmp_dir, video)
+            transcoder = ProxyTranscoder(str(video), proxy)
+            signals = []
+            transcoder.failed.connect(lambda message: signals.append("failed"))
+            transcoder.finished.connect(lambda: signals.append("finished"))
+            frames = []
+            transcoder.frames_done.connect(frames.append)
+
+            transcoder.cancel()
+            transcoder.run()
+
+            message = "cancelled transcode not reported as failed"
+            self.assertEqual(signals, ["failed", "finished"], message)
+
+            message = "ffmpeg not stopped by a cancel made before it started"
+            self.assertEqual(frames, [], message)
+
+            message = "proxy written by a cancelled transcode"
+            self.assertEqual(list(proxy.parent.iterdir()), [], message)
+
+@unittest.skipIf(shutil.which("ffprobe") is None, "requires ffprobe")
+class TestProxyFrames(unittest.TestCase):
+    """
+    test frames of a proxy are kept apart from those of its video
+    """
+
+    def test_proxy_cache_key(self):
+        """
+        test frames cached from the video are not displayed for the proxy
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video = make_test(pathlib.Path(tmp_dir))
+            proxy = video.with_name("proxy.avi")
+            shutil.copy(video, proxy)
+
+            source = VideoSource(str(video), get_frame_rate())
+            pix_fmt = VideoSource.PIX_FMT[0]
+            try:
+                source.get_cached_frame(0, pix_fmt, lambda frame: b"video")
+
+                source.set_proxy(proxy)
+                message = "frame cached from the video used for the proxy"
+                self.assertEqual(source.get_cached_frame(0, pix_fmt, lambda frame: b"proxy"),
+                                 b"proxy",
+                                 message)
+
+                source.set_proxy(None)
+                message = "frame cached from the video lost"
+                self.assertEqual(source.get_cached_frame(0, pix_fmt, lambda frame: b"proxy"),
+                                 b"video",
+                                 message)
+            finally:
+                source.get_frame_cache().clear()
+                source.close()
+
+if __name__ == "__main__":
+    unittest.main()
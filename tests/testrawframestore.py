@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+## @package testrawframestore
+# unittest of the memory mapped store of raw video frames
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = import-error
+
+import unittest
+import tempfile
+import pathlib
+
+import numpy as np
+
+from cgt.util import config
+from cgt.io.videodata import VideoData
+from cgt.io.rawframestore import RawFrameStores
+
+class TestRawFrameStore(unittest.TestCase):
+    """
+    test the provision and reading of raw frame stores
+    """
+
+    def setUp(self):
+        """
+        make a project directory holding a 'video', and enable the stores
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._dir = pathlib.Path(self._tmp_dir.name)
+
+        self._video = self._dir.joinpath("video.mp4")
+        self._video.write_bytes(b"not really a video")
+
+        # five 4x3 gray frames
+        self._video_data = VideoData([4, 3, 5], [10.0, 10.0], 1)
+
+        self._stores = RawFrameStores()
+        self._stores.set_directory(self._dir)
+
+        self._settings = (config.USE_RAW_FRAME_STORE, config.RAW_STORE_MAX_BYTES)
+        config.USE_RAW_FRAME_STORE = True
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        config.USE_RAW_FRAME_STORE, config.RAW_STORE_MAX_BYTES = self._settings
+        self._tmp_dir.cleanup()
+
+    def test_read_frames(self):
+        """
+        test frames are read from a store as written by ffmpeg
+        """
+        store = self._stores.get_store(str(self._video), self._video_data, 'gray')
+
+        message = "store complete before it is built"
+        self.assertFalse(store.is_complete(), message)
+        self.assertFalse(store.open(), message)
+
+        frames = np.arange(5*3*4, dtype=np.uint8).reshape(5, 3, 4)
+        store.get_file().parent.mkdir(parents=True)
+        store.get_file().write_bytes(frames.tobytes())
+
+        message = "store not opened"
+        self.assertTrue(store.open(), message)
+
+        message = "wrong number of frames"
+        self.assertEqual(store.get_frame_count(), 5, message)
+
+        message = "wrong frame"
+        self.assertTrue(np.array_equal(store.get_frame(3), frames[3]), message)
+
+        message = "frame outside the store"
+        self.assertIsNone(store.get_frame(5), message)
+
+        message = "run of frames not cut at the end of the store"
+        self.assertEqual(store.get_frames(3, 10).shape[0], 2, message)
+
+    def test_get_store(self):
+        """
+        test stores are only provided when enabled and small enough, and are
+        seperate for each pixel format
+        """
+        gray = self._stores.get_store(str(self._video), self._video_data, 'gray')
+        rgb = self._stores.get_store(str(self._video), self._video_data, 'rgb24')
+
+        message = "pixel formats share a store"
+        self.assertNotEqual(gray.get_file(), rgb.get_file(), message)
+
+        message = "store not in the project's store directory"
+        self.assertEqual(gray.get_file().parent, self._dir.joinpath(config.RAW_STORE_DIR), message)
+
+        config.RAW_STORE_MAX_BYTES = 5*3*4 - 1
+        message = "store provided for a video that is too big"
+        self.assertIsNone(self._stores.get_store(str(self._video), self._video_data, 'gray'),
+                          message)
+
+        config.RAW_STORE_MAX_BYTES = 5*3*4
+        config.USE_RAW_FRAME_STORE = False
+        message = "store provided when stores are not in use"
+        self.assertIsNone(self._stores.get_store(str(self._video), self._video_data, 'gray'),
+                          message)
+
+if __name__ == "__main__":
+    unittest.main()
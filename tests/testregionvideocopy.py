@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+## @package testregionvideocopy
+# unittest of the export of videos of regions, uses the maketestvideo
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+
+import unittest
+import tempfile
+import pathlib
+import shutil
+
+import PyQt5.QtCore as qc
+import PyQt5.QtWidgets as qw
+
+from cgt.io.regionvideocopy import RegionVideoCopy
+from cgt.model.videoanalysisresultsstore import VideoAnalysisResultsStore
+from cgt.util import config
+from tests.maketestvideo import make_test, get_frame_rate
+
+class CountingCopy(RegionVideoCopy):
+    """
+    a region video copy recording the regions encoded together, for each
+    pass over the frames
+    """
+
+    def __init__(self, project):
+        """
+        set up the object
+        """
+        super().__init__(project)
+
+        ## the number of encoders started for each pass
+        self.batches = []
+
+    def start_encoders(self, rects):
+        """
+        record the number of encoders and start them
+        """
+        self.batches.append(len(rects))
+        super().start_encoders(rects)
+
+class FailingCopy(RegionVideoCopy):
+    """
+    a region video copy that cannot read its frames
+    """
+
+    def copy_region_videos(self, dir_name):
+        """
+        fail to read the frames
+        """
+        raise OSError("unable to read frames")
+
+@unittest.skipIf(shutil.which("ffprobe") is None, "requires ffprobe")
+class TestRegionVideoCopy(unittest.TestCase):
+    """
+    test the concurrent encoding of region videos
+    """
+
+    def setUp(self):
+        """
+        make a test video and a project with five regions
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._dir = pathlib.Path(self._tmp_dir.name)
+        self._out_dir = self._dir.joinpath("regions")
+        self._out_dir.mkdir()
+
+        results = VideoAnalysisResultsStore(None)
+        for i in range(5):
+            results.add_region(qw.QGraphicsRectItem(qc.QRectF(i*90, 100, 80, 60)))
+
+        self._project = {"enhanced_video": str(make_test(self._dir)),
+                         "frame_rate": get_frame_rate(),
+                         "results": results}
+
+        self._settings = (config.REGION_EXPORT_STREAMING, config.REGION_ENCODE_WORKERS)
+        config.REGION_ENCODE_WORKERS = 2
+
+        self._finished = []
+        self._failed = []
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        config.REGION_EXPORT_STREAMING, config.REGION_ENCODE_WORKERS = self._settings
+        self._tmp_dir.cleanup()
+
+    def connect(self, copier):
+        """
+        record the outcome of each region
+            Args:
+                copier (RegionVideoCopy): the object copying the regions
+        """
+        copier.region_finished.connect(self._finished.append)
+        copier.region_failed.connect(lambda index, message: self._failed.append(index))
+
+    def check_videos(self):
+        """
+        check every region was saved
+        """
+        message = "region videos failed"
+        self.assertEqual(self._failed, [], message)
+
+        message = "region videos not reported as saved"
+        self.assertEqual(sorted(self._finished), list(range(5)), message)
+
+        message = "region videos not written"
+        names = sorted(x.name for x in self._out_dir.iterdir())
+        self.assertEqual(names, [f"region_{i}.mp4" for i in range(5)], message)
+
+    def test_streaming(self):
+        """
+        test streaming export encodes every region from one pass over the frames
+        """
+        config.REGION_EXPORT_STREAMING = True
+        copier = CountingCopy(self._project)
+        self.connect(copier)
+        copier.copy_region_videos(self._out_dir)
+
+        self.check_videos()
+
+        message = "regions not encoded from one pass over the frames"
+        self.assertEqual(copier.batches, [5], message)
+
+    def test_images(self):
+        """
+        test export by intermediate images, encoded by a pool of workers
+        """
+        config.REGION_EXPORT_STREAMING = False
+        copier = RegionVideoCopy(self._project)
+        self.connect(copier)
+        copier.copy_region_videos(self._out_dir)
+
+        self.check_videos()
+
+    def test_failure_finishes(self):
+        """
+        test an error stopping the export is reported and finished is still emitted
+        """
+        copier = FailingCopy(self._project)
+        copier.set_output_directory(self._out_dir)
+        signals = []
+        copier.failed.connect(lambda message: signals.append("failed"))
+        copier.finished.connect(lambda: signals.append("finished"))
+
+        copier.copy_videos()
+
+        message = "failure not reported before finishing"
+        self.assertEqual(signals, ["failed", "finished"], message)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+## @package testreportimages
+# unittest of the manifest and planner used to make report images
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = c-extension-no-member
+# pylint: disable = import-error
+
+import unittest
+import tempfile
+import pathlib
+
+import PyQt5.QtCore as qc
+import PyQt5.QtGui as qg
+
+from cgt.io.reportimagemanifest import ReportImageManifest, make_image_key, rect_key
+from cgt.io.reportimageplanner import ReportImagePlanner
+from cgt.io.imageencoder import ImageEncoder
+from cgt.io.videosource import make_select_expression
+from cgt.util import config
+
+class FrameList():
+    """
+    a source of frames for the planner, each frame is an image whose
+    width is its frame number
+    """
+
+    def __init__(self):
+        """
+        set up the object
+        """
+        ## the frame lists requested
+        self.requests = []
+
+    def stream_frames(self, frames):
+        """
+        provide the frames in order
+        """
+        self.requests.append(list(frames))
+        for frame in frames:
+            if frame < 10:
+                yield frame, qg.QImage(frame, 4, qg.QImage.Format_RGB888)
+
+class TestReportImages(unittest.TestCase):
+    """
+    tests of the report image manifest and planner
+    """
+
+    def setUp(self):
+        """
+        make a temporary images directory
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._images_dir = pathlib.Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        self._tmp_dir.cleanup()
+
+    def test_images_reused(self):
+        """
+        test images are only remade when their inputs change
+        """
+        out_file = self._images_dir.joinpath("region_0_frame_5.png")
+        key = make_image_key("region", ["video.mp4", 1, 1], 5, rect_key(qc.QRect(0, 0, 10, 20)))
+
+        def make():
+            out_file.write_bytes(b"image")
+
+        manifest = ReportImageManifest(self._images_dir)
+        message = "new image not made"
+        self.assertTrue(manifest.make_image(out_file, key, make), message)
+        manifest.save()
+
+        manifest = ReportImageManifest(self._images_dir)
+        message = "unchanged image made again"
+        self.assertFalse(manifest.make_image(out_file, key, make), message)
+
+        moved = make_image_key("region", ["video.mp4", 1, 1], 5, rect_key(qc.QRect(2, 0, 10, 20)))
+        message = "image with moved region not made again"
+        self.assertTrue(manifest.make_image(out_file, moved, make), message)
+
+        out_file.unlink()
+        message = "missing image not made again"
+        self.assertTrue(manifest.make_image(out_file, key, make), message)
+
+    def test_keys_recorded_when_saved(self):
+        """
+        test only the keys of saved images are recorded, so images that could
+        not be made are made by the next report
+        """
+        source = FrameList()
+        manifest = ReportImageManifest(self._images_dir)
+        planner = ReportImagePlanner(source, ImageEncoder("png", -1, 2), manifest)
+
+        saved_file = self._images_dir.joinpath("image_saved.png")
+        missing_file = self._images_dir.joinpath("image_missing.png")
+        missing_file.write_bytes(b"out of date image")
+
+        message = "image recorded before it is saved"
+        self.assertFalse(manifest.is_current(saved_file, "saved"), message)
+        self.assertFalse(manifest.is_current(missing_file, "missing"), message)
+
+        planner.add_image(5, saved_file, lambda image: image, "saved")
+        planner.add_image(20, missing_file, lambda image: image, "missing")
+        planner.run()
+        manifest.save()
+
+        message = "out of date image of an undecoded frame not removed"
+        self.assertFalse(missing_file.exists(), message)
+
+        manifest = ReportImageManifest(self._images_dir)
+        message = "saved image not reused"
+        self.assertTrue(manifest.is_current(saved_file, "saved"), message)
+
+        missing_file.write_bytes(b"image")
+        message = "key of image that was not made recorded"
+        self.assertFalse(manifest.is_current(missing_file, "missing"), message)
+
+    def test_planned_frames_decoded_once(self):
+        """
+        test the planner decodes the union of frames in one ordered pass
+        """
+        source = FrameList()
+        planner = ReportImagePlanner(source, ImageEncoder("png", -1, 2))
+        made = []
+        progress = []
+        for i, frame in enumerate([9, 2, 2, 5, 20]):
+            out_file = self._images_dir.joinpath(f"image_{i}.png")
+            planner.add_image(frame,
+                              out_file,
+                              lambda image, f=frame: made.append((f, image.width())) or image)
+
+        missing = planner.run(lambda saved, total: progress.append((saved, total)))
+
+        message = "frames not requested once in order"
+        self.assertEqual(source.requests, [[2, 5, 9, 20]], message)
+
+        message = "images not made from their frames"
+        self.assertEqual(made, [(2, 2), (2, 2), (5, 5), (9, 9)], message)
+
+        message = "undecoded frame not reported"
+        self.assertEqual(missing, [20], message)
+
+        message = "images not saved"
+        files = sorted(x.name for x in self._images_dir.iterdir())
+        self.assertEqual(files, ["image_0.png", "image_1.png", "image_2.png", "image_3.png"], message)
+
+        message = "wrong progress"
+        self.assertEqual(progress, [(1, 4), (2, 4), (3, 4), (4, 4)], message)
+
+    def test_encoder_settings(self):
+        """
+        test the encoder reads its default settings from config when made
+        """
+        settings = (config.REPORT_IMAGE_FORMAT, config.REPORT_IMAGE_QUALITY)
+        try:
+            config.REPORT_IMAGE_FORMAT = "jpg"
+            config.REPORT_IMAGE_QUALITY = 80
+            message = "config changed after import not used"
+            self.assertEqual(ImageEncoder().get_key(), ["jpg", 80], message)
+
+            message = "argument overridden by config"
+            self.assertEqual(ImageEncoder("png", -1).get_key(), ["png", -1], message)
+        finally:
+            config.REPORT_IMAGE_FORMAT, config.REPORT_IMAGE_QUALITY = settings
+
+    def test_select_expression(self):
+        """
+        test runs of frames are combined in the select filter
+        """
+        expression = make_select_expression([3, 4, 5, 9, 11, 12])
+
+        message = "wrong select expression"
+        self.assertEqual(expression, "between(n,3,5)+eq(n,9)+between(n,11,12)", message)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,8 +27,9 @@ import unittest
 import PyQt5.QtCore as qc
 import PyQt5.QtWidgets as qw
 
-from tests.makeresults import make_results_object
+from tests.makeresults import make_results_object, make_test_points
 from cgt.model.videoanalysisresultsstore import VideoAnalysisResultsStore
+from cgt.util.markers import hash_graphics_line, hash_graphics_point
 
 class TestResults(unittest.TestCase):
     """
@@ -91,6 +92,110 @@ class TestResults(unittest.TestCase):
         message = "key frame wrong"
         self.assertEqual(frame, frames[0], message)
 
+    def test_find_markers_by_hash(self):
+        """
+        test markers are found by their hash codes
+        """
+        line = self._store.get_lines()[0][1]
+        point = self._store.get_points()[0][2]
+
+        message = "line not found by hash"
+        self.assertEqual(self._store.find_list_for_old_line(line), 0, message)
+
+        message = "point not found by hash"
+        self.assertEqual(self._store.find_list_for_old_point(point), 0, message)
+
+    def test_remove_markers_by_hash(self):
+        """
+        test removal of markers updates the index
+        """
+        points = self._store.get_points()[0]
+        first = points[0]
+        second = make_test_points()
+        for point in second:
+            point.moveBy(5.0, 5.0)
+        self._store.insert_point_marker(second)
+
+        remaining = self._store.remove_point(hash_graphics_point(points[1]))
+        message = "wrong number of points remaining"
+        self.assertEqual(len(remaining), 2, message)
+
+        self._store.delete_marker(first)
+        message = "marker list not deleted"
+        self.assertEqual(len(self._store.get_points()), 1, message)
+
+        message = "index not renumbered after delete"
+        self.assertEqual(self._store.find_list_for_old_point(self._store.get_points()[0][0]),
+                         0,
+                         message)
+
+        line = self._store.get_lines()[0][0]
+        self._store.remove_line(hash_graphics_line(line))
+        message = "removed line still found"
+        self.assertIsNone(self._store.find_list_for_old_line(line), message)
+
+    def test_markers_for_region(self):
+        """
+        test the markers of a region are found and follow region removal
+        """
+        message = "region 0 should have points only"
+        self.assertEqual(len(self._store.get_points_for_region(0)), 1, message)
+        self.assertIsNone(self._store.get_lines_for_region(0), message)
+
+        message = "region with no markers reported as having markers"
+        self.add_region()
+        self.assertFalse(self._store.region_has_markers(2), message)
+
+        self._store.delete_marker(self._store.get_points()[0][0])
+        self._store.remove_region(0)
+
+        message = "lines not moved to renumbered region"
+        self.assertEqual(len(self._store.get_lines_for_region(0)), 1, message)
+
+        message = "key frames not moved to renumbered region"
+        self.assertEqual(self._store.get_key_frames(0), [50, 150], message)
+
+    def test_remove_region_with_markers(self):
+        """
+        test removing a region deletes its markers and renumbers the rest
+        """
+        self._store.remove_region(0)
+
+        message = "markers of removed region not deleted"
+        self.assertEqual(len(self._store.get_points()), 0, message)
+
+        message = "markers of other region deleted"
+        self.assertEqual(len(self._store.get_lines()), 1, message)
+
+        message = "index not renumbered after region removed"
+        self.assertEqual(self._store.find_list_for_old_line(self._store.get_lines()[0][0]),
+                         0,
+                         message)
+
+        message = "lines not moved to renumbered region"
+        self.assertEqual(len(self._store.get_lines_for_region(0)), 1, message)
+
+    def test_results_digest(self):
+        """
+        test the content digest is repeatable and follows changes
+        """
+        digest = self._store.get_digest()
+
+        message = "digest differs for equal stores"
+        self.assertEqual(digest, make_results_object().get_digest(), message)
+
+        second = make_test_points()
+        for point in second:
+            point.moveBy(5.0, 5.0)
+        self._store.insert_point_marker(second)
+        changed = self._store.get_digest()
+        message = "digest not changed by new marker"
+        self.assertNotEqual(digest, changed, message)
+
+        self._store.delete_marker(self._store.get_points()[1][0])
+        message = "digest not restored by removing marker"
+        self.assertEqual(digest, self._store.get_digest(), message)
+
     def add_region(self):
         """
         add a region
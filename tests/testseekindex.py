@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+## @package testseekindex
+# unittest of the index of video frames used for seeking
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+# set up linting conditions
+# pylint: disable = import-error
+
+import unittest
+import tempfile
+import pathlib
+import threading
+from fractions import Fraction
+
+import numpy as np
+
+from cgt.io.seekindex import SeekIndex, SeekIndexStore
+
+class TestSeekIndex(unittest.TestCase):
+    """
+    test the seek index
+    """
+
+    def setUp(self):
+        """
+        make an index of 100 frames, 512 time units apart, with a key frame
+        every 25 frames and an extra one at frame 60
+        """
+        pts = np.arange(100, dtype=np.int64)*512 + 1024
+        key_frames = np.zeros(100, dtype=bool)
+        key_frames[::25] = True
+        key_frames[60] = True
+
+        self._index = SeekIndex(pts, key_frames, Fraction(1, 12800))
+
+    def test_key_frames(self):
+        """
+        test the key frame before a frame is found
+        """
+        message = "wrong key frame"
+        self.assertEqual(self._index.get_key_frame_before(0), 0, message)
+        self.assertEqual(self._index.get_key_frame_before(24), 0, message)
+        self.assertEqual(self._index.get_key_frame_before(25), 25, message)
+        self.assertEqual(self._index.get_key_frame_before(59), 50, message)
+        self.assertEqual(self._index.get_key_frame_before(61), 60, message)
+        self.assertEqual(self._index.get_key_frame_before(99), 75, message)
+
+    def test_seek(self):
+        """
+        test seek times are relative to the first frame and fall between frames
+        """
+        message = "wrong frame time"
+        self.assertAlmostEqual(self._index.get_time(0), 0.0, msg=message)
+        self.assertAlmostEqual(self._index.get_time(25), 1.0, msg=message)
+
+        key_frame, time = self._index.get_seek(30)
+
+        message = "wrong seek frame"
+        self.assertEqual(key_frame, 25, message)
+
+        message = "seek time not between key frame and next"
+        self.assertTrue(self._index.get_time(25) < time < self._index.get_time(26), message)
+
+    def test_save_load(self):
+        """
+        test the index is saved and read back only for the same video file
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = pathlib.Path(tmp_dir).joinpath("index.npz")
+            self._index.save(file_name, [1234, 5678])
+
+            index = SeekIndex.load(file_name, [1234, 5678])
+
+            message = "index not read"
+            self.assertIsNotNone(index, message)
+
+            message = "time stamps changed"
+            self.assertTrue(np.array_equal(index.get_pts(), self._index.get_pts()), message)
+
+            message = "key frames changed"
+            self.assertTrue(np.array_equal(index.get_key_frames(),
+                                           self._index.get_key_frames()),
+                            message)
+
+            message = "time base changed"
+            self.assertEqual(index.get_time_base(), Fraction(1, 12800), message)
+
+            message = "index of a changed video read"
+            self.assertIsNone(SeekIndex.load(file_name, [1234, 9999]), message)
+
+    def test_find_without_building(self):
+        """
+        test a saved index is found without building, and a video that can't be
+        indexed is built once in the background and then reported as unindexed
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video = pathlib.Path(tmp_dir).joinpath("video.mp4")
+            video.write_bytes(b"not really a video")
+
+            store = SeekIndexStore()
+            store.set_directory(tmp_dir)
+
+            message = "index found before it is built"
+            self.assertIsNone(store.find_index(str(video)), message)
+
+            path, file_key = SeekIndexStore.make_file_key(str(video))
+            index_file = store.get_index_file(path)
+            index_file.parent.mkdir(parents=True)
+            self._index.save(index_file, file_key)
+
+            message = "saved index not found"
+            index = store.find_index(str(video))
+            self.assertIsNotNone(index, message)
+            self.assertTrue(np.array_equal(index.get_pts(), self._index.get_pts()), message)
+
+            index_file.unlink()
+            other = SeekIndexStore()
+            done = threading.Event()
+            results = []
+            other.build_in_background(str(video),
+                                      "1/12800",
+                                      lambda index: results.append(index) or done.set())
+
+            message = "background build did not finish"
+            self.assertTrue(done.wait(60), message)
+
+            message = "index built for a file that is not a video"
+            self.assertEqual(results, [None], message)
+            self.assertIsNone(other.find_index(str(video)), message)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+## @package teststartuptimer
+# unittest of the start-up timer
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+import unittest
+import tempfile
+import pathlib
+
+from cgt.util.startuptimer import StartupTimer
+
+class TestStartupTimer(unittest.TestCase):
+    """
+    tests of the start-up timer
+    """
+
+    def test_marks_saved(self):
+        """
+        test marks are recorded in order and appended to the log
+        """
+        timer = StartupTimer()
+        timer.mark("imports")
+        timer.mark("window")
+
+        marks = timer.get_marks()
+        message = "marks not recorded in order"
+        self.assertEqual([x[0] for x in marks], ["imports", "window"], message)
+        self.assertLessEqual(marks[0][1], marks[1][1], message)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log = pathlib.Path(tmp_dir).joinpath("timing.csv")
+            timer.save_report(log)
+            timer.save_report(log)
+            lines = log.read_text().splitlines()
+
+        message = "log should have a header and one row per save"
+        self.assertEqual(len(lines), 3, message)
+        self.assertEqual(lines[0], "date,imports,window", message)
+
+if __name__ == "__main__":
+    unittest.main()
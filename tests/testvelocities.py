@@ -23,8 +23,10 @@ specific language governing permissions and limitations under the License.
 import unittest
 
 from cgt.util.markers import MarkerTypes
+from cgt.model.markertable import record_from_item
 from cgt.model.velocitiescalculator import (ScreenDisplacement,
-                                            VelocitiesCalculator)
+                                            VelocitiesCalculator,
+                                            project_displacements)
 import tests.makeresults as mkres
 
 class TestDisplacements(unittest.TestCase):
@@ -87,8 +89,8 @@ class TestVelocities(unittest.TestCase):
         """
         initalize objects
         """
-        self._points = mkres.make_test_points()
-        self._lines = mkres.make_test_lines()
+        self._points = [record_from_item(x) for x in mkres.make_test_points()]
+        self._lines = [record_from_item(x) for x in mkres.make_test_lines()]
         self._test_values = mkres.get_test_values()
 
         self._calculator = VelocitiesCalculator([self._lines],
@@ -125,5 +127,25 @@ class TestVelocities(unittest.TestCase):
                                        places=4,
                                        msg=message)
 
+    def test_project_displacements(self):
+        """
+        ensure the displacements of a whole project are found in one call
+        """
+        results = mkres.make_results_object()
+        lines, points = project_displacements(results,
+                                              self._test_values.fps,
+                                              self._test_values.scale)
+
+        message = "wrong number of displacements"
+        self.assertEqual(len(lines.speed), 1, message)
+        self.assertEqual(len(points.speed), 2, message)
+
+        message = "wrong regions"
+        self.assertEqual(lines.region.tolist(), [1], message)
+        self.assertEqual(points.region.tolist(), [0, 0], message)
+
+        message = "line speed is wrong"
+        self.assertAlmostEqual(self._test_values.line_speed, lines.speed[0], places=4, msg=message)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+## @package testvideoanalyser
+# unittest of the serial and parallel video statistics, uses the maketestvideo
+#
+# @copyright 2021 University of Leeds, Leeds, UK.
+# @author j.h.pickering@leeds.ac.uk and j.leng@leeds.ac.uk
+'''
+Created on Mon Oct 18 2021
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+This work was funded by Joanna Leng's EPSRC funded RSE Fellowship (EP/R025819/1)
+'''
+import unittest
+import tempfile
+import pathlib
+import shutil
+
+import numpy as np
+
+from cgt.io.videoanalyser import VideoAnalyser
+from cgt.util import config
+from tests.maketestvideo import make_test, get_frame_count
+
+class LongSegmentAnalyser(VideoAnalyser):
+    """
+    an analyser whose last segment asks for more frames than the video holds
+    """
+
+    def make_segments(self, number_segments):
+        """
+        lengthen the last segment
+        """
+        segments = super().make_segments(number_segments)
+        first, count, time = segments[-1]
+        segments[-1] = (first, count + 5, time)
+
+        return segments
+
+@unittest.skipIf(shutil.which("ffprobe") is None, "requires ffprobe")
+class TestVideoAnalyser(unittest.TestCase):
+    """
+    test the statistics of a video are the same however it is read
+    """
+
+    def setUp(self):
+        """
+        make a test video and split it into three segments
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._video = str(make_test(pathlib.Path(self._tmp_dir.name)))
+
+        self._settings = (config.STATS_WORKERS, config.STATS_MIN_SEGMENT_FRAMES)
+        config.STATS_MIN_SEGMENT_FRAMES = 20
+
+    def tearDown(self):
+        """
+        clean up
+        """
+        config.STATS_WORKERS, config.STATS_MIN_SEGMENT_FRAMES = self._settings
+        self._tmp_dir.cleanup()
+
+    def analyse(self, workers, analyser_type=VideoAnalyser):
+        """
+        find the statistics of the video
+            Args:
+                workers (int): the number of worker processes
+                analyser_type (class): the type of analyser
+            Returns:
+                (VideoIntensityStats)
+        """
+        config.STATS_WORKERS = workers
+        analyser = analyser_type(self._video)
+        analyser.stats_whole_film()
+
+        return analyser.get_stats()
+
+    def assert_stats_equal(self, first, second):
+        """
+        assert two sets of statistics are equal
+        """
+        message = "wrong number of frames"
+        self.assertEqual(len(first), get_frame_count(), message)
+        self.assertEqual(len(second), get_frame_count(), message)
+
+        message = "means differ"
+        self.assertTrue(np.array_equal(first.get_means(), second.get_means()), message)
+
+        message = "standard deviations differ"
+        self.assertTrue(np.array_equal(first.get_std_devs(), second.get_std_devs()), message)
+
+        message = "bin counts differ"
+        self.assertTrue(np.array_equal(first.get_bin_counts(), second.get_bin_counts()), message)
+
+    def test_parallel_matches_serial(self):
+        """
+        test the segments analysed in parallel join to the serial statistics
+        """
+        self.assert_stats_equal(self.analyse(1), self.analyse(3))
+
+    def test_failed_segment(self):
+        """
+        test a segment with the wrong number of frames makes the video be read in one pass
+        """
+        self.assert_stats_equal(self.analyse(1), self.analyse(3, LongSegmentAnalyser))
+
+if __name__ == "__main__":
+    unittest.main()